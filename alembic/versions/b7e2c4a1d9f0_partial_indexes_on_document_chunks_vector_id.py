@@ -0,0 +1,50 @@
+"""Replace document_chunks.vector_id index with partial pending/unique indexes
+
+Revision ID: b7e2c4a1d9f0
+Revises: 9cdd8e9ab3f3
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c4a1d9f0'
+down_revision = '9cdd8e9ab3f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+    
+    if is_postgres:
+        # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+        with op.get_context().autocommit_block():
+            op.create_index('idx_vector_id_pending', 'document_chunks', ['id'], unique=False,
+                            postgresql_where=sa.text('vector_id IS NULL'),
+                            postgresql_concurrently=True)
+            op.create_index('idx_vector_id_uq', 'document_chunks', ['vector_id'], unique=True,
+                            postgresql_where=sa.text('vector_id IS NOT NULL'),
+                            postgresql_concurrently=True)
+            op.drop_index('ix_document_chunks_vector_id', table_name='document_chunks',
+                          postgresql_concurrently=True)
+    else:
+        # MySQL has no partial indexes; a unique index already allows multiple NULLs
+        op.create_index('idx_vector_id_uq', 'document_chunks', ['vector_id'], unique=True)
+        op.drop_index('ix_document_chunks_vector_id', table_name='document_chunks')
+
+
+def downgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+    
+    if is_postgres:
+        with op.get_context().autocommit_block():
+            op.create_index('ix_document_chunks_vector_id', 'document_chunks', ['vector_id'], unique=False,
+                            postgresql_concurrently=True)
+            op.drop_index('idx_vector_id_uq', table_name='document_chunks', postgresql_concurrently=True)
+            op.drop_index('idx_vector_id_pending', table_name='document_chunks', postgresql_concurrently=True)
+    else:
+        op.create_index('ix_document_chunks_vector_id', 'document_chunks', ['vector_id'], unique=False)
+        op.drop_index('idx_vector_id_uq', table_name='document_chunks')
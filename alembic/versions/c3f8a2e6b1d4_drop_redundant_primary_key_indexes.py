@@ -0,0 +1,35 @@
+"""Drop redundant indexes on primary key columns
+
+Revision ID: c3f8a2e6b1d4
+Revises: b7e2c4a1d9f0
+Create Date: 2026-10-16 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a2e6b1d4'
+down_revision = 'b7e2c4a1d9f0'
+branch_labels = None
+depends_on = None
+
+# (index name, table, column) - the primary key already provides a unique btree
+REDUNDANT_PK_INDEXES = [
+    ('ix_conversation_history_id', 'conversation_history', 'id'),
+    ('ix_document_chunks_id', 'document_chunks', 'id'),
+    ('ix_knowledge_documents_id', 'knowledge_documents', 'id'),
+    ('ix_user_documents_id', 'user_documents', 'id'),
+    ('ix_users_phone_number', 'users', 'phone_number'),
+]
+
+
+def upgrade() -> None:
+    for index_name, table_name, _ in REDUNDANT_PK_INDEXES:
+        op.drop_index(index_name, table_name=table_name)
+
+
+def downgrade() -> None:
+    for index_name, table_name, column_name in REDUNDANT_PK_INDEXES:
+        op.create_index(index_name, table_name, [column_name], unique=False)
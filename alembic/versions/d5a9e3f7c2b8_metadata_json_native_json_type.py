@@ -0,0 +1,56 @@
+"""Store metadata_json as native JSON (JSONB on PostgreSQL)
+
+Revision ID: d5a9e3f7c2b8
+Revises: c3f8a2e6b1d4
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a9e3f7c2b8'
+down_revision = 'c3f8a2e6b1d4'
+branch_labels = None
+depends_on = None
+
+TABLES = ['conversation_history', 'document_chunks', 'knowledge_documents']
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+    
+    for table_name in TABLES:
+        if is_postgres:
+            op.alter_column(table_name, 'metadata_json',
+                            existing_type=sa.Text(), type_=postgresql.JSONB(),
+                            existing_nullable=True,
+                            postgresql_using='metadata_json::jsonb')
+        else:
+            op.alter_column(table_name, 'metadata_json',
+                            existing_type=sa.Text(), type_=sa.JSON(),
+                            existing_nullable=True)
+    
+    if is_postgres:
+        op.create_index('ix_kd_meta_gin', 'knowledge_documents', ['metadata_json'],
+                        unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+    
+    if is_postgres:
+        op.drop_index('ix_kd_meta_gin', table_name='knowledge_documents')
+    
+    for table_name in TABLES:
+        if is_postgres:
+            op.alter_column(table_name, 'metadata_json',
+                            existing_type=postgresql.JSONB(), type_=sa.Text(),
+                            existing_nullable=True,
+                            postgresql_using='metadata_json::text')
+        else:
+            op.alter_column(table_name, 'metadata_json',
+                            existing_type=sa.JSON(), type_=sa.Text(),
+                            existing_nullable=True)
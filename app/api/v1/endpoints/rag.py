@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Q
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 from app.core.database import get_db
+from app.core.unit_of_work import UnitOfWork, get_uow
 from app.core.config import get_settings
 from app.services.rag.rag_service import RAGService
 from app.tables.knowledge_documents import KnowledgeDocumentRepository, DocumentType, DocumentStatus
@@ -390,12 +391,11 @@ async def get_document(
 @router.delete("/documents/{document_id}", tags=["rag"])
 async def delete_document(
     document_id: int,
-    db: Session = Depends(get_db),
+    uow: UnitOfWork = Depends(get_uow),
 ):
     """Delete a document from the knowledge base"""
     try:
-        doc_repo = KnowledgeDocumentRepository(db)
-        doc = doc_repo.get_by_id(document_id)
+        doc = uow.documents.get_by_id(document_id)
         
         if not doc:
             raise HTTPException(
@@ -404,9 +404,7 @@ async def delete_document(
             )
         
         # Delete chunks from vector store
-        from app.tables.document_chunks import DocumentChunkRepository
-        chunk_repo = DocumentChunkRepository(db)
-        chunks = chunk_repo.get_by_document(document_id)
+        chunks = uow.chunks.get_by_document(document_id)
         
         if chunks:
             from app.services.rag.vector_store import get_vector_store
@@ -419,11 +417,9 @@ async def delete_document(
                 vector_store.delete_vectors(vector_ids)
                 vector_store.save()
         
-        # Delete chunks from database
-        chunk_repo.delete_by_document(document_id)
-        
-        # Delete document
-        doc_repo.delete(document_id)
+        # Delete chunks and document from database (committed together by the unit of work)
+        uow.chunks.delete_by_document(document_id)
+        uow.documents.delete(document_id)
         
         return {"message": f"Document {document_id} deleted successfully"}
     except HTTPException:
@@ -454,8 +450,7 @@ async def assign_document_to_user(
     try:
         # Verify user exists
         user_repo = UserRepository(db)
-        user = user_repo.get_by_phone(request.user_phone_number)
-        if not user:
+        if not user_repo.exists_by_phone(request.user_phone_number):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"User with phone number {request.user_phone_number} not found"
@@ -478,6 +473,7 @@ async def assign_document_to_user(
             assigned_by=request.assigned_by,
             notes=request.notes,
         )
+        db.commit()
         
         return {
             "id": mapping.id,
@@ -505,22 +501,18 @@ async def get_user_documents(
     """Get all documents assigned to a user"""
     try:
         user_doc_repo = UserDocumentRepository(db)
-        mappings = user_doc_repo.get_user_documents(user_phone_number)
-        
-        doc_repo = KnowledgeDocumentRepository(db)
-        documents = []
-        for mapping in mappings:
-            doc = doc_repo.get_by_id(mapping.document_id)
-            if doc:
-                documents.append({
-                    "document_id": doc.id,
-                    "title": doc.title,
-                    "description": doc.description,
-                    "document_type": doc.document_type.value if doc.document_type else "unknown",
-                    "assigned_by": mapping.assigned_by,
-                    "notes": mapping.notes,
-                    "assigned_at": mapping.created_at.isoformat() if mapping.created_at else None,
-                })
+        documents = [
+            {
+                "document_id": doc.id,
+                "title": doc.title,
+                "description": doc.description,
+                "document_type": doc.document_type.value if doc.document_type else "unknown",
+                "assigned_by": mapping.assigned_by,
+                "notes": mapping.notes,
+                "assigned_at": mapping.created_at.isoformat() if mapping.created_at else None,
+            }
+            for mapping, doc in user_doc_repo.get_user_documents_joined(user_phone_number)
+        ]
         
         return {"user_phone_number": user_phone_number, "documents": documents}
     except Exception as e:
@@ -540,6 +532,7 @@ async def unassign_document_from_user(
     try:
         user_doc_repo = UserDocumentRepository(db)
         success = user_doc_repo.delete(mapping_id)
+        db.commit()
         
         if not success:
             raise HTTPException(
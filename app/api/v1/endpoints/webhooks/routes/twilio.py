@@ -1,12 +1,12 @@
 """
 Twilio WhatsApp webhook routes
 """
-import json
 import logging
 from fastapi import APIRouter, Request, HTTPException, status, Header
 from fastapi.responses import Response
 
 from app.core.config import get_settings
+from app.utils import json as fast_json
 from app.core import database  # Import module to access SessionLocal after init
 from app.services.integrations.twilio_service import TwilioIntegrationService
 from app.services.whatsapp_service import WhatsAppService
@@ -17,6 +17,8 @@ from app.tables.users import UserRepository
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_SEP = "=" * 80
+
 router = APIRouter()
 twilio_service = TwilioIntegrationService()
 whatsapp_service = WhatsAppService()
@@ -40,17 +42,19 @@ async def twilio_whatsapp_webhook(
         form_data = await request.form()
         form_dict = dict(form_data)
         
-        # Log raw payload received
-        logger.info("=" * 80)
-        logger.info("📥 TWILIO WEBHOOK RECEIVED")
-        logger.info("=" * 80)
-        logger.info(f"🔗 URL: {request.url}")
-        logger.info(f"🌐 Method: {request.method}")
-        logger.info(f"📋 Headers:")
-        for key, value in request.headers.items():
-            logger.info(f"   {key}: {value}")
-        logger.info(f"\n📦 Raw Form Data (as received):")
-        logger.info(json.dumps(form_dict, indent=2, ensure_ascii=False))
+        # Log raw payload received (headers + pretty JSON are only built when INFO is on)
+        log_info = logger.isEnabledFor(logging.INFO)
+        if log_info:
+            logger.info(_SEP)
+            logger.info("📥 TWILIO WEBHOOK RECEIVED")
+            logger.info(_SEP)
+            logger.info("🔗 URL: %s", request.url)
+            logger.info("🌐 Method: %s", request.method)
+            logger.info("📋 Headers:")
+            for key, value in request.headers.items():
+                logger.info("   %s: %s", key, value)
+            logger.info("\n📦 Raw Form Data (as received):")
+            logger.info(fast_json.dumps(form_dict, indent=True))
         
         # Verify request signature using integration service
         if x_twilio_signature and settings.TWILIO_AUTH_TOKEN:
@@ -66,8 +70,9 @@ async def twilio_whatsapp_webhook(
         message_data = twilio_service.parse_webhook_payload(form_dict)
         
         # Log parsed message data
-        logger.info(f"\n📨 Parsed Message Data:")
-        logger.info(json.dumps(message_data, indent=2, ensure_ascii=False))
+        if log_info:
+            logger.info("\n📨 Parsed Message Data:")
+            logger.info(fast_json.dumps(message_data, indent=True))
         
         # Send typing indicator immediately (user will see "typing..." status)
         # Note: Typing indicators may not work for all message types or trial accounts
@@ -75,7 +80,7 @@ async def twilio_whatsapp_webhook(
         if message_sid:
             result = twilio_service.send_typing_indicator(message_sid)
             if result.get("success"):
-                logger.info(f"⌨️  Typing indicator sent for message: {message_sid}")
+                logger.info("⌨️  Typing indicator sent for message: %s", message_sid)
             else:
                 # Log as debug since this is optional and may fail for valid reasons
                 logger.debug(
@@ -91,45 +96,47 @@ async def twilio_whatsapp_webhook(
         body = message_data.get("body", "")
         
         # Extract phone number (remove whatsapp: prefix)
-        phone_number = from_number.replace("whatsapp:", "") if from_number.startswith("whatsapp:") else from_number
+        phone_number = from_number.removeprefix("whatsapp:")
         
-        logger.info(f"\n📝 Processing message directly with RAG pipeline...")
-        logger.info(f"📤 From: {from_number}")
-        logger.info(f"💬 Message: {body}")
+        logger.info("\n📝 Processing message directly with RAG pipeline...")
+        logger.info("📤 From: %s", from_number)
+        logger.info("💬 Message: %s", body)
         
-        # Get database session (ensure database is initialized)
-        database.init_database()
+        # Get database session (initialized at app startup; lazy fallback otherwise)
+        if database.SessionLocal is None:
+            database.init_database()
         if database.SessionLocal is None:
             raise RuntimeError("Database not initialized. Check DATABASE_URL configuration.")
         
         db = database.SessionLocal()
         try:
-            # Get or create user
-            user_repo = UserRepository(db)
-            user = user_repo.get_by_phone(phone_number)
-            if not user:
-                logger.info(f"Creating new user for phone number: {phone_number}")
-                user = user_repo.create(phone_number=phone_number)
-            
-            # Get user's name if available
-            user_name = user.name if user and user.name else None
-            if user_name:
-                logger.info(f"User name found: {user_name}")
-            
-            # Use RAG service for intelligent responses (same pipeline as /api/v1/rag/chat endpoint)
-            rag_service = RAGService(db)
-            rag_result = rag_service.query(
-                user_phone_number=phone_number,
-                query=body,
-                user_name=user_name,  # Pass user name for personalized responses
-            )
+            # User upsert and conversation writes share one transaction / one COMMIT
+            with db.begin():
+                # Get or create user
+                user_repo = UserRepository(db)
+                user = user_repo.get_by_phone(phone_number)
+                if not user and user_repo.create_if_missing(phone_number):
+                    logger.info("Created new user for phone number: %s", phone_number)
+                
+                # Get user's name if available
+                user_name = user.name if user and user.name else None
+                if user_name:
+                    logger.info("User name found: %s", user_name)
+                
+                # Use RAG service for intelligent responses (same pipeline as /api/v1/rag/chat endpoint)
+                rag_service = RAGService(db, autocommit=False)
+                rag_result = rag_service.query(
+                    user_phone_number=phone_number,
+                    query=body,
+                    user_name=user_name,  # Pass user name for personalized responses
+                )
             
             response_text = rag_result.get("response", "I didn't understand that.")
-            logger.info(f"✅ Generated response: {response_text[:100]}")
+            logger.info("✅ Generated response: %.100s", response_text)
             
             # Send response directly via Twilio
-            whatsapp_number = from_number if from_number.startswith("whatsapp:") else f"whatsapp:{phone_number}"
-            logger.info(f"📤 Sending response to {whatsapp_number}...")
+            whatsapp_number = f"whatsapp:{phone_number}"
+            logger.info("📤 Sending response to %s...", whatsapp_number)
             
             send_result = twilio_service.send_message(
                 to=whatsapp_number,
@@ -137,17 +144,19 @@ async def twilio_whatsapp_webhook(
             )
             
             if send_result.get('split'):
-                logger.info(f"✅ Response sent successfully in {send_result.get('chunks', 1)} chunks: {send_result.get('message_sid')}")
-                logger.info(f"   All message SIDs: {', '.join(send_result.get('message_sids', []))}")
+                logger.info("✅ Response sent successfully in %s chunks: %s",
+                            send_result.get('chunks', 1), send_result.get('message_sid'))
+                if log_info:
+                    logger.info("   All message SIDs: %s", ", ".join(send_result.get('message_sids', [])))
             else:
-                logger.info(f"✅ Response sent successfully: {send_result.get('message_sid')}")
-            logger.info("=" * 80)
+                logger.info("✅ Response sent successfully: %s", send_result.get('message_sid'))
+            logger.info(_SEP)
             
         except Exception as e:
             logger.error(f"❌ Error processing message with RAG: {str(e)}", exc_info=True)
             # Send error message to user
             try:
-                whatsapp_number = from_number if from_number.startswith("whatsapp:") else f"whatsapp:{phone_number}"
+                whatsapp_number = f"whatsapp:{phone_number}"
                 twilio_service.send_message(
                     to=whatsapp_number,
                     message="I'm sorry, I encountered an error processing your message. Please try again.",
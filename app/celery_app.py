@@ -3,8 +3,10 @@ Celery application configuration
 """
 import logging
 from celery import Celery
-from celery.signals import worker_process_init
+from kombu import Exchange, Queue
+from celery.signals import worker_process_init, task_postrun
 from app.core.config import get_settings
+from app.core.database import init_database, remove_scoped_session
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -33,14 +35,26 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    task_ignore_result=True,  # Fire-and-forget by default; opt in per task if a caller awaits results
 )
 
-# Optional: Configure task routes
-# Note: whatsapp_tasks will use default "celery" queue
+# Queues: WhatsApp messages get their own queue so slow RAG calls never sit
+# behind (or in front of) other work. It stays durable with persistent
+# delivery: the webhook answers Twilio 200 as soon as the message is queued,
+# so Twilio never re-delivers and a message lost here is gone for good.
+celery_app.conf.task_default_queue = "celery"
+celery_app.conf.task_queues = (
+    Queue("whatsapp", Exchange("whatsapp"), routing_key="whatsapp"),
+    Queue("celery"),
+    Queue("webhooks"),
+    Queue("onboarding"),
+)
+
+# Task routes
 celery_app.conf.task_routes = {
+    "app.tasks.whatsapp_tasks.*": {"queue": "whatsapp"},
     "app.tasks.webhook_tasks.*": {"queue": "webhooks"},
     "app.tasks.onboarding_tasks.*": {"queue": "onboarding"},
-    # whatsapp_tasks uses default queue (no routing needed)
 }
 
 
@@ -54,7 +68,6 @@ def init_worker_process(**kwargs):
         logger.info("🔧 Initializing Celery worker process...")
         
         # Initialize database
-        from app.core.database import init_database
         init_database()
         logger.info("✅ Database initialized in Celery worker")
         
@@ -72,3 +85,8 @@ def init_worker_process(**kwargs):
         logger.error(f"❌ Failed to initialize Celery worker process: {e}", exc_info=True)
         # Don't raise - let tasks handle initialization if needed
 
+
+@task_postrun.connect
+def cleanup_task_session(**kwargs):
+    """Release the task's scoped DB session (rolls back anything left uncommitted)"""
+    remove_scoped_session()
@@ -44,6 +44,9 @@ class Settings(BaseSettings):
     
     # Database (if needed)
     DATABASE_URL: Optional[str] = None
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # Per-transaction statement timeout for UnitOfWork (PostgreSQL); 0 disables
+    DB_POOL_SIZE: int = 10  # Persistent connections per process (the gevent worker sizes it to its concurrency)
+    DB_MAX_OVERFLOW: int = 20  # Extra connections allowed above DB_POOL_SIZE under burst
     
     # Redis (for Celery)
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -59,6 +62,9 @@ class Settings(BaseSettings):
     CELERY_TIMEZONE: str = "UTC"
     CELERY_ENABLE_UTC: bool = True
     CELERY_WORKER_CONCURRENCY: int = 4  # Number of worker processes/threads per Celery worker instance
+    CELERY_WORKER_POOL: str = "prefork"  # General worker (celery/webhooks/onboarding queues: CPU-bound PDF/OCR/embedding)
+    CELERY_WHATSAPP_POOL: str = "gevent"  # Dedicated worker for the I/O-bound whatsapp queue
+    CELERY_GEVENT_CONCURRENCY: int = 200  # Greenlets in the whatsapp worker when CELERY_WHATSAPP_POOL=gevent
     
     # Webhooks
     WEBHOOK_SECRET: Optional[str] = None
@@ -96,11 +102,14 @@ class Settings(BaseSettings):
     GROQ_MODEL_NAME: str = "llama-3.3-70b-versatile"  # Groq model name
     TEXT_ENHANCEMENT_ENABLED: bool = True  # Enable LLM text enhancement before chunking
     TEXT_ENHANCEMENT_TEMPERATURE: float = 0.3  # Low temperature to prevent hallucination
+    TEXT_ENHANCEMENT_MAX_CONCURRENCY: int = 4  # Parallel LLM calls when a long text is enhanced in portions
     
     # Embedding Settings (dynamic - can be changed via config)
     EMBEDDING_PROVIDER: str = "sentence-transformers"  # sentence-transformers, openai, etc.
     EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"  # Default sentence-transformers model
     EMBEDDING_API_KEY: Optional[str] = None  # For API-based embeddings
+    EMBEDDING_BATCH_WINDOW_MS: int = 0  # Coalesce concurrent single-query embeds under the gevent pool; 0 disables
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
     
     # Vector Store Settings
     VECTOR_STORE_TYPE: str = "faiss"  # faiss, pinecone, weaviate, etc.
@@ -113,12 +122,25 @@ class Settings(BaseSettings):
     RAG_TOP_K: int = 10  # Number of relevant chunks to retrieve
     RAG_SIMILARITY_THRESHOLD: float = 0.1  # Minimum similarity score for retrieval
     
+    # RAG Response Cache (Redis; exact-match + semantic, per user)
+    RAG_RESPONSE_CACHE_ENABLED: bool = True
+    RAG_RESPONSE_CACHE_TTL_SECONDS: int = 60 * 60  # 1 hour
+    RAG_SEMANTIC_CACHE_THRESHOLD: float = 0.95  # Cosine similarity needed to reuse an answer
+    RAG_SEMANTIC_CACHE_MAX_ENTRIES: int = 50  # Recent query embeddings kept per user
+    
     # Document Processing
     DOCUMENTS_STORAGE_PATH: str = "./data/documents"  # Local filesystem path
     OCR_ENABLED: bool = True
     OCR_LANGUAGE: str = "eng"  # Tesseract language code
+    OCR_CACHE_ENABLED: bool = True  # Reuse raw OCR text for identical image bytes (<storage>/ocr_cache)
     USE_DEEPDOCTECTION: bool = False  # Use DeepDocDetection for layout-aware PDF/image parsing
     
+    # Website Scraping
+    SCRAPE_CACHE_SIZE: int = 1000  # In-memory LRU entries (URL -> ETag/Last-Modified + result)
+    SCRAPE_CACHE_TTL_SECONDS: int = 24 * 60 * 60  # TTL for persisted scrape results in Redis
+    SCRAPE_MAX_CONCURRENCY_PER_HOST: int = 2  # Concurrent in-flight requests per origin
+    SCRAPE_MAX_REQUESTS_PER_SECOND_PER_HOST: float = 5.0  # Request rate per origin
+    
     # Conversation/Memory Settings
     CONVERSATION_HISTORY_LIMIT: int = 10  # Number of previous messages to include in context
     SESSION_TIMEOUT_HOURS: int = 24  # Session timeout in hours
@@ -2,9 +2,10 @@
 Database connection and session management
 """
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from sqlalchemy.pool import QueuePool
 from app.core.config import get_settings
+from app.utils import json as fast_json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,17 +14,27 @@ settings = get_settings()
 # Create database engine
 engine = None
 SessionLocal = None
+# Thread-local session registry for Celery tasks; removed after each task (task_postrun)
+ScopedSession = None
+
+
+def _bind_sessions(bound_engine) -> None:
+    """Create the session factories for the given engine"""
+    global SessionLocal, ScopedSession
+    
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=bound_engine)
+    ScopedSession = scoped_session(SessionLocal)
 
 
 def init_database():
     """Initialize database connection"""
-    global engine, SessionLocal
+    global engine, SessionLocal, ScopedSession
     
     if not settings.DATABASE_URL:
         logger.warning("DATABASE_URL not configured. Database features will be unavailable.")
         # Use in-memory SQLite as fallback (not recommended for production)
         engine = create_engine("sqlite:///:memory:", echo=False)
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        _bind_sessions(engine)
         logger.info("✅ Database connection initialized (using in-memory SQLite fallback)")
         return
     
@@ -35,17 +46,20 @@ def init_database():
         engine = create_engine(
             settings.DATABASE_URL,
             poolclass=QueuePool,
-            pool_size=10,
-            max_overflow=20,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
             pool_pre_ping=True,  # Verify connections before using
             echo=sql_echo,  # Only log SQL if explicitly enabled
+            query_cache_size=1200,  # Bounded LRU of compiled statements (default 500)
+            json_serializer=fast_json.dumps,  # orjson for JSON metadata columns
+            json_deserializer=fast_json.loads,
         )
         
         # Suppress SQLAlchemy engine logging unless explicitly enabled
         if not sql_echo:
             logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
         
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        _bind_sessions(engine)
         logger.info("✅ Database connection initialized")
     except Exception as e:
         logger.error(f"❌ Failed to initialize database: {str(e)}")
@@ -53,13 +67,14 @@ def init_database():
         logger.warning("Falling back to in-memory SQLite")
         try:
             engine = create_engine("sqlite:///:memory:", echo=False)
-            SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            _bind_sessions(engine)
             logger.info("✅ Fallback database connection initialized")
         except Exception as fallback_error:
             logger.error(f"❌ Failed to initialize fallback database: {str(fallback_error)}")
             # Set to None so get_db() can raise proper error
             engine = None
             SessionLocal = None
+            ScopedSession = None
 
 
 def get_db() -> Session:
@@ -77,6 +92,12 @@ def get_db() -> Session:
         db.close()
 
 
+def remove_scoped_session() -> None:
+    """Close the current thread's scoped session and return its connection to the pool"""
+    if ScopedSession is not None:
+        ScopedSession.remove()
+
+
 def create_tables():
     """Create all database tables"""
     if engine is None:
@@ -36,6 +36,12 @@ class ForbiddenError(AppException):
         super().__init__(message, status_code=status.HTTP_403_FORBIDDEN)
 
 
+class TransientError(AppException):
+    """Temporary upstream failure (5xx, rate limit, connection error) - safe to retry"""
+    def __init__(self, message: str = "Temporary upstream failure"):
+        super().__init__(message, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
 class WebhookError(AppException):
     """Webhook processing error"""
     def __init__(self, message: str = "Webhook processing failed"):
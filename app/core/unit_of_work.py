@@ -0,0 +1,84 @@
+"""
+Unit of Work - one session and one transaction per request
+"""
+import logging
+from functools import cached_property
+from typing import Callable, Iterator
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core import database
+from app.core.config import get_settings
+from app.tables.conversation_history import ConversationHistoryRepository
+from app.tables.document_chunks import DocumentChunkRepository
+from app.tables.knowledge_documents import KnowledgeDocumentRepository
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class UnitOfWork:
+    """
+    Owns a single Session and lazily creates repositories bound to it.
+    
+    Repositories created here only flush; the transaction is committed once
+    when the unit of work exits without an error, and rolled back otherwise.
+    
+    Usage:
+        with UnitOfWork(SessionLocal) as uow:
+            uow.chunks.delete_by_document(document_id)
+            uow.documents.delete(document_id)
+    """
+    
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+        self.session: Session = None
+    
+    def __enter__(self) -> "UnitOfWork":
+        self.session = self.session_factory()
+        
+        # Bound runaway queries for the whole transaction (PostgreSQL only)
+        timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+        if timeout_ms and self.session.get_bind().dialect.name == "postgresql":
+            self.session.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            self.session.close()
+    
+    def commit(self) -> None:
+        """Commit the unit of work"""
+        self.session.commit()
+    
+    def rollback(self) -> None:
+        """Roll back the unit of work"""
+        self.session.rollback()
+    
+    @cached_property
+    def conversation(self) -> ConversationHistoryRepository:
+        return ConversationHistoryRepository(self.session, autocommit=False)
+    
+    @cached_property
+    def chunks(self) -> DocumentChunkRepository:
+        return DocumentChunkRepository(self.session, autocommit=False)
+    
+    @cached_property
+    def documents(self) -> KnowledgeDocumentRepository:
+        return KnowledgeDocumentRepository(self.session, autocommit=False)
+
+
+def get_uow() -> Iterator[UnitOfWork]:
+    """
+    Get a unit of work (dependency for FastAPI)
+    Usage: uow: UnitOfWork = Depends(get_uow)
+    """
+    if database.SessionLocal is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+    
+    with UnitOfWork(database.SessionLocal) as uow:
+        yield uow
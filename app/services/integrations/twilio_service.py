@@ -5,6 +5,7 @@ import re
 import logging
 from typing import Dict, Any, Optional, List
 from app.core.config import get_settings
+from app.core.exceptions import TransientError
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -26,6 +27,7 @@ class TwilioIntegrationService:
     
     def __init__(self):
         self.validator = None
+        self._client = None  # Lazily created REST client; reuses its HTTP keep-alive session
         if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN:
             try:
                 from twilio.request_validator import RequestValidator
@@ -298,6 +300,27 @@ class TwilioIntegrationService:
         
         return chunks
     
+    @staticmethod
+    def _build_http_client():
+        """
+        Twilio HTTP client backed by one pooled keep-alive requests.Session
+        
+        Retries only cover connection failures and idempotent methods, so a
+        message POST is never sent twice.
+        """
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        from twilio.http.http_client import TwilioHttpClient
+        
+        http_client = TwilioHttpClient(pool_connections=True)
+        # pool_maxsize bounds reusable keep-alive sockets per host; sized for a gevent worker
+        # where many greenlets send at once (overflow connections are opened and discarded)
+        http_client.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=20, pool_maxsize=100, max_retries=Retry(total=3, backoff_factor=0.3)),
+        )
+        return http_client
+    
     def send_message(
         self,
         to: str,
@@ -317,8 +340,15 @@ class TwilioIntegrationService:
             
         Returns:
             Message sending result with list of all message SIDs if split
+            
+        Raises:
+            TransientError: Twilio 5xx / 429 or a connection failure before any
+                            chunk was sent, so retrying cannot duplicate a message
         """
+        message_sids = []
         try:
+            from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+            from twilio.base.exceptions import TwilioRestException
             from twilio.rest import Client
             
             if not settings.TWILIO_ACCOUNT_SID or not settings.TWILIO_AUTH_TOKEN:
@@ -327,7 +357,13 @@ class TwilioIntegrationService:
             if not settings.TWILIO_WHATSAPP_NUMBER:
                 raise ValueError("Twilio WhatsApp number not configured")
             
-            client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+            if self._client is None:
+                self._client = Client(
+                    settings.TWILIO_ACCOUNT_SID,
+                    settings.TWILIO_AUTH_TOKEN,
+                    http_client=self._build_http_client(),
+                )
+            client = self._client
             
             # Split message if it exceeds the limit
             message_chunks = self._split_message_at_sentences(message)
@@ -335,7 +371,6 @@ class TwilioIntegrationService:
             if len(message_chunks) > 1:
                 logger.info(f"Message exceeds {TWILIO_MESSAGE_LIMIT} characters, splitting into {len(message_chunks)} chunks")
             
-            message_sids = []
             first_chunk = True
             
             for i, chunk in enumerate(message_chunks, 1):
@@ -345,19 +380,28 @@ class TwilioIntegrationService:
                 if len(message_chunks) > 1:
                     logger.debug(f"Sending chunk {i}/{len(message_chunks)} ({len(chunk)} characters)")
                 
-                if chunk_media_url:
-                    message_obj = client.messages.create(
-                        body=chunk,
-                        media_url=[chunk_media_url],
-                        from_=settings.TWILIO_WHATSAPP_NUMBER,
-                        to=to,
-                    )
-                else:
-                    message_obj = client.messages.create(
-                        body=chunk,
-                        from_=settings.TWILIO_WHATSAPP_NUMBER,
-                        to=to,
-                    )
+                try:
+                    if chunk_media_url:
+                        message_obj = client.messages.create(
+                            body=chunk,
+                            media_url=[chunk_media_url],
+                            from_=settings.TWILIO_WHATSAPP_NUMBER,
+                            to=to,
+                        )
+                    else:
+                        message_obj = client.messages.create(
+                            body=chunk,
+                            from_=settings.TWILIO_WHATSAPP_NUMBER,
+                            to=to,
+                        )
+                except TwilioRestException as e:
+                    if not message_sids and (e.status == 429 or e.status >= 500):
+                        raise TransientError(f"Twilio returned {e.status}: {e.msg}") from e
+                    raise
+                except (RequestsConnectionError, Timeout) as e:
+                    if not message_sids:
+                        raise TransientError(f"Twilio connection failed: {e}") from e
+                    raise
                 
                 message_sids.append(message_obj.sid)
                 first_chunk = False
@@ -379,6 +423,9 @@ class TwilioIntegrationService:
             return result
         except ImportError:
             raise ValueError("Twilio SDK not installed")
+        except TransientError as e:
+            logger.warning(f"Transient error sending WhatsApp message: {e.message}")
+            raise
         except Exception as e:
             logger.error(f"Error sending WhatsApp message: {str(e)}", exc_info=True)
             raise
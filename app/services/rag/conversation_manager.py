@@ -15,9 +15,9 @@ settings = get_settings()
 class ConversationManager:
     """Manage conversation history and context"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, autocommit: bool = True):
         self.db = db
-        self.history_repo = ConversationHistoryRepository(db)
+        self.history_repo = ConversationHistoryRepository(db, autocommit=autocommit)
         self.history_limit = settings.CONVERSATION_HISTORY_LIMIT
         self.session_timeout_hours = settings.SESSION_TIMEOUT_HOURS
         logger.info("Initialized ConversationManager")
@@ -34,17 +34,12 @@ class ConversationManager:
                    metadata: Optional[Dict[str, Any]] = None) -> None:
         """Add a message to conversation history"""
         try:
-            metadata_json = None
-            if metadata:
-                import json
-                metadata_json = json.dumps(metadata)
-            
             self.history_repo.create(
                 user_phone_number=user_phone_number,
                 session_id=session_id,
                 message_type=message_type,
                 message=message,
-                metadata_json=metadata_json,
+                metadata_json=metadata or None,  # Stored as native JSON, no manual serialization
             )
             logger.debug(f"Added {message_type} message to conversation history")
         except Exception as e:
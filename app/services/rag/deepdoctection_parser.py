@@ -18,6 +18,25 @@ except ImportError:
     logger.warning("deepdoctection not available. Install with: pip install deepdoctection")
 
 
+def _reading_order_int(reading_order) -> int:
+    """Reading order as an int for sorting; 999999 when missing or non-numeric (e.g. "table")"""
+    if isinstance(reading_order, int):
+        return reading_order
+    if isinstance(reading_order, str):
+        # Checked up front: "table" / "" are common and int() would raise for them
+        value = reading_order.strip()
+        digits = value[1:] if value[:1] in ("+", "-") else value
+        if digits.isdecimal():
+            return int(value)
+        return 999999
+    if reading_order is None:
+        return 999999
+    try:
+        return int(reading_order)
+    except (ValueError, TypeError, OverflowError):
+        return 999999
+
+
 class Chunk:
     """
     Represents a contiguous layout-aware chunk.
@@ -226,10 +245,7 @@ class DeepDocDetectionParser:
         """Extract relevant metadata from a block"""
         reading_order = block[4]
         # Convert reading_order to int if possible, otherwise use a large number for sorting
-        try:
-            reading_order_int = int(reading_order) if reading_order not in (None, "table", "") else 999999
-        except (ValueError, TypeError):
-            reading_order_int = 999999
+        reading_order_int = _reading_order_int(reading_order)
         
         # Try to extract bbox (bounding box) Y coordinate for vertical positioning
         bbox_y = None
@@ -308,14 +324,6 @@ class DeepDocDetectionParser:
             for page in doc:
                 page_chunks = self._get_page_data(page)
                 
-                # Get the last reading_order value from existing blocks to position tables
-                max_reading_order = 0
-                if page_chunks:
-                    max_reading_order = max(
-                        (chunk.get("reading_order_int", 0) for chunk in page_chunks),
-                        default=0
-                    )
-                
                 # Create table blocks and extract their bounding boxes
                 table_blocks = []
                 if page.tables:
@@ -376,9 +384,10 @@ class DeepDocDetectionParser:
                 if use_bbox_sorting:
                     # Sort ALL blocks by bbox_y (vertical position) - smaller Y = higher on page = earlier
                     # Items with no bbox_y go to the end, but try to preserve their relative order
+                    # Secondary sort by original reading_order (one bbox_y lookup per block)
                     all_page_blocks.sort(key=lambda x: (
-                        x.get("bbox_y") if x.get("bbox_y") is not None else 999999,
-                        x.get("reading_order_int", 999999)  # Secondary sort by original reading_order
+                        999999 if (bbox_y := x.get("bbox_y")) is None else bbox_y,
+                        x.get("reading_order_int", 999999)
                     ))
                     
                     # Now assign sequential reading_order based on sorted position
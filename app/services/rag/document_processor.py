@@ -7,6 +7,7 @@ import re
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from app.core.config import get_settings
+from app.services.rag import ocr_cache
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 logger = logging.getLogger(__name__)
@@ -413,6 +414,25 @@ class DocumentProcessor:
         return self._ocr_image(file_path)
     
     def _ocr_image(self, file_path: str) -> str:
+        """
+        OCR an image (reusing cached raw text for identical bytes), then enhance it
+        """
+        cache_key = None
+        if settings.OCR_CACHE_ENABLED:
+            cache_key = ocr_cache.cache_key(file_path, self.ocr_language)
+            text = ocr_cache.get(cache_key)
+            if text is not None:
+                logger.info(f"Using cached OCR text for {file_path} ({len(text)} characters)")
+                return self.enhance_text(text, document_title=Path(file_path).stem)
+        
+        text = self._run_tesseract(file_path)
+        if cache_key is not None:
+            ocr_cache.put(cache_key, text)
+        
+        # Enhance OCR text using LLM (if enhancer is available)
+        return self.enhance_text(text, document_title=Path(file_path).stem)
+    
+    def _run_tesseract(self, file_path: str) -> str:
         """
         Perform OCR on image with automatic orientation correction
         
@@ -424,11 +444,14 @@ class DocumentProcessor:
         """
         try:
             from PIL import Image, ImageOps, ImageChops
-            import pytesseract
-            import re
+            from app.services.rag import tesseract_engine
             
-            # Open image
-            image = Image.open(file_path)
+            # Open image, decoding JPEGs straight to grayscale (Tesseract binarizes anyway;
+            # draft() is a no-op for other formats). The file is closed once pixels are loaded.
+            with Image.open(file_path) as source:
+                source.draft("L", source.size)
+                source.load()
+                image = source
             
             # Step 1: Fix orientation based on EXIF data (common in mobile photos)
             try:
@@ -437,6 +460,7 @@ class DocumentProcessor:
                 logger.info("Applied EXIF orientation correction")
             except Exception as e:
                 logger.debug(f"EXIF orientation correction not needed or failed: {str(e)}")
+            unrotated_image = image  # Kept for the fallback in step 6 instead of decoding again
             
             # Step 2: Use Tesseract's OSD (Orientation and Script Detection) to detect rotation
             try:
@@ -445,19 +469,10 @@ class DocumentProcessor:
                 osd_image = image
                 
                 # Get orientation detection result
-                osd_result = pytesseract.image_to_osd(osd_image)
-                logger.info(f"Tesseract OSD result: {osd_result}")
+                osd_result = tesseract_engine.detect_orientation(osd_image)
                 
-                # Extract rotation angle from OSD output
-                # Format: "Rotate: 270" or "Rotate: 90" etc.
-                rotate_match = re.search(r"Rotate:\s*(\d+)", osd_result)
-                orientation_match = re.search(r"Orientation in degrees:\s*(\d+)", osd_result)
-                confidence_match = re.search(r"Orientation confidence:\s*([\d.]+)", osd_result)
-                
-                if rotate_match:
-                    rotation_angle = int(rotate_match.group(1))
-                    orientation_deg = int(orientation_match.group(1)) if orientation_match else None
-                    confidence = float(confidence_match.group(1)) if confidence_match else None
+                if osd_result is not None:
+                    rotation_angle, orientation_deg, confidence = osd_result
                     
                     # Only rotate if confidence is reasonable and angle is not 0
                     if rotation_angle != 0 and (confidence is None or confidence > 0.3):
@@ -506,21 +521,20 @@ class DocumentProcessor:
                 logger.warning(f"Failed to save processed image: {str(e)}")
             
             # Step 5: Perform OCR on the corrected image
-            text = pytesseract.image_to_string(image, lang=self.ocr_language)
+            text = tesseract_engine.image_to_string(image, self.ocr_language)
             
             # Step 6: If text extraction yields very little, try alternative approach
             if len(text.strip()) < 5:
                 logger.warning(f"OCR yielded little text ({len(text.strip())} chars), trying without OSD rotation...")
                 # Try original image without OSD rotation (in case OSD was wrong)
                 try:
-                    original_image = Image.open(file_path)
-                    original_image = ImageOps.exif_transpose(original_image)
+                    original_image = unrotated_image
                     # Convert to grayscale after EXIF correction
                     if original_image.mode != 'L':
                         original_image = original_image.convert("L")
                     # Invert image (same as main processing)
                     original_image = ImageChops.invert(original_image)
-                    alt_text = pytesseract.image_to_string(original_image, lang=self.ocr_language)
+                    alt_text = tesseract_engine.image_to_string(original_image, self.ocr_language)
                     
                     if len(alt_text.strip()) > len(text.strip()):
                         logger.info(f"Using text from original orientation ({len(alt_text.strip())} chars)")
@@ -528,35 +542,42 @@ class DocumentProcessor:
                 except Exception as e:
                     logger.debug(f"Alternative OCR attempt failed: {str(e)}")
             
-            # Step 6: Enhance OCR text using LLM (if enhancer is available)
-            if self.text_enhancer and text.strip():
-                logger.info("🔄 Enhancing OCR text using LLM for better structure...")
-                try:
-                    # Get image filename for context
-                    image_name = Path(file_path).stem
-                    enhanced_text = self.text_enhancer.enhance_ocr_text(
-                        text=text,
-                        document_title=image_name,
-                        source_type="image_ocr"
-                    )
-                    
-                    if enhanced_text != text:
-                        logger.info(f"✨ OCR text enhanced: {len(text)} → {len(enhanced_text)} characters")
-                        text = enhanced_text
-                    else:
-                        logger.info("ℹ️  OCR text enhancement skipped or unchanged")
-                except Exception as e:
-                    logger.warning(f"⚠️  OCR text enhancement failed: {str(e)}")
-                    logger.warning("   Using original OCR text without enhancement")
-            
             return text
                 
         except ImportError:
-            raise ImportError("pytesseract and Pillow are required. Install with: pip install pytesseract Pillow")
+            raise ImportError("tesserocr (or pytesseract) and Pillow are required. Install with: pip install tesserocr Pillow")
         except Exception as e:
             logger.error(f"Error performing OCR: {str(e)}")
             raise
     
+    def enhance_text(self, text: str, document_title: Optional[str] = None,
+                     source_type: str = "image_ocr") -> str:
+        """
+        Enhance already-extracted OCR text with the LLM text enhancer
+        
+        Returns the text unchanged if no enhancer is configured or enhancement fails,
+        so callers holding raw OCR output can enhance it without running OCR again.
+        """
+        if not self.text_enhancer or not text.strip():
+            return text
+        
+        logger.info("🔄 Enhancing OCR text using LLM for better structure...")
+        try:
+            enhanced_text = self.text_enhancer.enhance_ocr_text(
+                text=text,
+                document_title=document_title,
+                source_type=source_type
+            )
+            
+            if enhanced_text != text:
+                logger.info(f"✨ OCR text enhanced: {len(text)} → {len(enhanced_text)} characters")
+                return enhanced_text
+            logger.info("ℹ️  OCR text enhancement skipped or unchanged")
+        except Exception as e:
+            logger.warning(f"⚠️  OCR text enhancement failed: {str(e)}")
+            logger.warning("   Using original OCR text without enhancement")
+        return text
+    
     def _detect_mime_type(self, file_path: str) -> str:
         """Detect MIME type from file extension"""
         import mimetypes
@@ -3,10 +3,14 @@ Embedding Service - Abstracted embedding provider interface
 Supports multiple providers (sentence-transformers, OpenAI, etc.)
 """
 import logging
-from typing import List, Optional
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
 from abc import ABC, abstractmethod
 import numpy as np
 from app.core.config import get_settings
+from app.utils.helpers import is_gevent_patched
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -96,6 +100,72 @@ class SentenceTransformersEmbeddingService(EmbeddingService):
         return self._dimension or settings.VECTOR_DIMENSION
 
 
+class BatchingEmbeddingService(EmbeddingService):
+    """
+    Micro-batches concurrent embed() calls into one embed_batch() call
+    
+    Only helps when several requests run at once in a process, so
+    get_embedding_service() applies it only under the gevent pool. The first
+    caller in a window becomes the leader: it waits up to ``window`` seconds
+    (or until ``max_batch`` texts are queued), encodes the whole batch and
+    resolves every waiter's future. embed_batch() calls go straight to the
+    wrapped service.
+    """
+    
+    def __init__(self, inner: EmbeddingService, window: float = 0.05, max_batch: int = 32):
+        self.inner = inner
+        self.window = window
+        self.max_batch = max_batch
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[str, Future]] = []
+        self._leader_active = False
+    
+    def embed(self, text: str) -> np.ndarray:
+        """Generate embedding for a single text, batched with concurrent callers"""
+        future = Future()
+        with self._cond:
+            self._pending.append((text, future))
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+            is_leader = not self._leader_active
+            self._leader_active = True
+        
+        if is_leader:
+            self._flush()
+        return future.result()
+    
+    def _flush(self) -> None:
+        with self._cond:
+            deadline = time.monotonic() + self.window
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            # Take everything queued: followers have no other way to get served
+            batch, self._pending = self._pending, []
+            self._leader_active = False
+        
+        try:
+            embeddings = self.inner.embed_batch([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        for (_, future), embedding in zip(batch, embeddings):
+            future.set_result(embedding)
+    
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings for multiple texts"""
+        return self.inner.embed_batch(texts)
+    
+    @property
+    def dimension(self) -> int:
+        """Get embedding dimension"""
+        return self.inner.dimension
+
+
 def get_embedding_service(provider: Optional[str] = None,
                          model_name: Optional[str] = None,
                          load_immediately: bool = True) -> EmbeddingService:
@@ -113,6 +183,15 @@ def get_embedding_service(provider: Optional[str] = None,
     provider = provider or settings.EMBEDDING_PROVIDER
     
     if provider.lower() == "sentence-transformers":
-        return SentenceTransformersEmbeddingService(model_name=model_name, load_immediately=load_immediately)
+        service = SentenceTransformersEmbeddingService(model_name=model_name, load_immediately=load_immediately)
     else:
         raise ValueError(f"Unsupported embedding provider: {provider}. Supported: sentence-transformers")
+    
+    # Waiting for a batch is pure latency when tasks never overlap (prefork, API workers)
+    if settings.EMBEDDING_BATCH_WINDOW_MS > 0 and is_gevent_patched():
+        service = BatchingEmbeddingService(
+            service,
+            window=settings.EMBEDDING_BATCH_WINDOW_MS / 1000,
+            max_batch=settings.EMBEDDING_BATCH_MAX_SIZE,
+        )
+    return service
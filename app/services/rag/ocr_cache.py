@@ -0,0 +1,59 @@
+"""
+OCR cache - raw Tesseract output on disk, keyed by image content and OCR config
+"""
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Bump when the image preprocessing in DocumentProcessor._ocr_image changes
+OCR_PIPELINE_VERSION = "1"
+
+_READ_SIZE = 1 << 20
+
+
+def _cache_dir() -> Path:
+    return Path(settings.DOCUMENTS_STORAGE_PATH) / "ocr_cache"
+
+
+def cache_key(file_path: str, language: str) -> str:
+    """BLAKE2b of the file bytes plus the OCR language and pipeline version"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(_READ_SIZE), b""):
+            digest.update(block)
+    digest.update(f"\0{language}\0{OCR_PIPELINE_VERSION}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get(key: str) -> Optional[str]:
+    """Return cached raw OCR text, or None on miss"""
+    if not settings.OCR_CACHE_ENABLED:
+        return None
+    try:
+        return (_cache_dir() / f"{key}.txt").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f"OCR cache read failed: {e}")
+        return None
+
+
+def put(key: str, text: str) -> None:
+    """Store raw OCR text (written to a temp file, then renamed into place)"""
+    if not settings.OCR_CACHE_ENABLED:
+        return
+    try:
+        cache_dir = _cache_dir()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        path = cache_dir / f"{key}.txt"
+        tmp_path = cache_dir / f"{key}.{os.getpid()}.tmp"
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.debug(f"OCR cache write failed: {e}")
@@ -4,6 +4,7 @@ RAG Service - Main service that orchestrates RAG functionality
 import logging
 import os
 import uuid
+import numpy as np
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
 from app.services.rag.llm_service import get_llm_service
@@ -26,7 +27,13 @@ settings = get_settings()
 class RAGService:
     """Main RAG service that handles queries and document management"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, autocommit: bool = True):
+        """
+        Args:
+            db: Database session
+            autocommit: Commit after each repository write; pass False when the
+                        caller wraps the work in its own transaction (db.begin())
+        """
         self.db = db
         
         # Use singleton instances (initialized at app startup)
@@ -36,18 +43,19 @@ class RAGService:
         self.text_enhancer = TextEnhancer()  # For enhancing text before chunking
         self.document_processor = DocumentProcessor(text_enhancer=self.text_enhancer)  # Pass enhancer for OCR text enhancement
         self.website_scraper = WebsiteScraper()
-        self.conversation_manager = ConversationManager(db)
+        self.conversation_manager = ConversationManager(db, autocommit=autocommit)
         
         # Initialize repositories
-        self.knowledge_doc_repo = KnowledgeDocumentRepository(db)
+        self.knowledge_doc_repo = KnowledgeDocumentRepository(db, autocommit=autocommit)
         self.user_doc_repo = UserDocumentRepository(db)
-        self.chunk_repo = DocumentChunkRepository(db)
+        self.chunk_repo = DocumentChunkRepository(db, autocommit=autocommit)
         self.user_repo = UserRepository(db)
         
         logger.info("✅ Initialized RAGService")
     
     def query(self, user_phone_number: str, query: str,
-             session_id: Optional[str] = None, user_name: Optional[str] = None) -> Dict[str, Any]:
+             session_id: Optional[str] = None, user_name: Optional[str] = None,
+             query_embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """
         Process a user query using RAG
         
@@ -55,6 +63,7 @@ class RAGService:
             user_phone_number: User's phone number
             query: User's query/question
             session_id: Optional session ID (auto-generated if not provided)
+            query_embedding: Optional precomputed embedding of the query (skips embedding it again)
             
         Returns:
             Dictionary with response and metadata
@@ -83,17 +92,19 @@ class RAGService:
             logger.info(f"   User accessible documents: {user_docs}")
             
             # Retrieve relevant chunks
-            relevant_chunks = self._retrieve_relevant_chunks(query, user_phone_number, user_docs)
+            relevant_chunks = self._retrieve_relevant_chunks(query, user_phone_number, user_docs,
+                                                             query_embedding=query_embedding)
             
             # Print detailed chunk information for debugging
             logger.info(f"📄 Retrieved {len(relevant_chunks)} relevant chunks:")
-            for i, chunk in enumerate(relevant_chunks, 1):
-                logger.info(f"   Chunk {i}:")
-                logger.info(f"      - Chunk ID: {chunk.get('chunk_id')}")
-                logger.info(f"      - Document ID: {chunk.get('document_id')}")
-                logger.info(f"      - Similarity: {chunk.get('similarity', 0):.4f}")
-                logger.info(f"      - Text preview: {chunk.get('text', '')[:200]}...")
-                logger.info(f"      - Metadata: {chunk.get('metadata', {})}")
+            if logger.isEnabledFor(logging.INFO):
+                for i, chunk in enumerate(relevant_chunks, 1):
+                    logger.info(f"   Chunk {i}:")
+                    logger.info(f"      - Chunk ID: {chunk.get('chunk_id')}")
+                    logger.info(f"      - Document ID: {chunk.get('document_id')}")
+                    logger.info(f"      - Similarity: {chunk.get('similarity', 0):.4f}")
+                    logger.info(f"      - Text preview: {chunk.get('text', '')[:200]}...")
+                    logger.info(f"      - Metadata: {chunk.get('metadata', {})}")
             
             if len(relevant_chunks) == 0:
                 logger.warning("⚠️  No relevant chunks found! This may indicate:")
@@ -144,7 +155,8 @@ class RAGService:
             raise
     
     def _retrieve_relevant_chunks(self, query: str, user_phone_number: str,
-                                  user_document_ids: List[int]) -> List[Dict[str, Any]]:
+                                  user_document_ids: List[int],
+                                  query_embedding: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """Retrieve relevant chunks from vector store"""
         try:
             # Check if vector store has any vectors
@@ -155,8 +167,9 @@ class RAGService:
                 logger.warning("FAISS vector store is empty. No documents have been indexed.")
                 return []
             
-            # Generate query embedding
-            query_embedding = self.embedding_service.embed(query)
+            # Generate query embedding (unless the caller already has one)
+            if query_embedding is None:
+                query_embedding = self.embedding_service.embed(query)
             
             # Search vector store
             # Filter by user's accessible documents
@@ -196,7 +209,8 @@ class RAGService:
                     continue
                 else:
                     logger.info(f"   │  ✅ Found chunk in DB: chunk_id={chunk.id}, document_id={chunk.document_id}")
-                    logger.info(f"   │  Chunk text preview: {chunk.chunk_text[:100]}...")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"   │  Chunk text preview: {chunk.chunk_text[:100]}...")
                 
                 # Check if user has access to this document
                 if chunk.user_phone_number:
@@ -0,0 +1,142 @@
+"""
+Response cache for RAG answers - exact-match and semantic tiers backed by Redis
+"""
+import logging
+from typing import Dict, Any, Optional
+import numpy as np
+from app.core.config import get_settings
+from app.utils import json as fast_json
+from app.utils.helpers import hash_string
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_redis_client = None
+
+
+def _get_redis():
+    """Get a Redis client for the response cache (None if unavailable)"""
+    global _redis_client
+    if _redis_client is None:
+        try:
+            from redis import Redis
+            _redis_client = Redis.from_url(settings.REDIS_URL)
+        except Exception as e:
+            logger.warning(f"Redis unavailable for RAG response cache: {e}")
+            _redis_client = False
+    return _redis_client or None
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class ResponseCache:
+    """
+    Two-tier cache of RAG responses, scoped per user
+
+    1. Exact match: SHA256 of "<phone>:<normalized query>" -> cached result.
+    2. Semantic: the user's most recent query embeddings are kept in a capped
+       Redis list; a new query whose cosine similarity with one of them reaches
+       the threshold reuses that answer.
+
+    Entries are per phone number because accessible documents and the
+    personalised greeting differ between users. Any Redis error is treated as
+    a miss, so the cache can never break message handling.
+    """
+
+    def __init__(self, embedding_service=None):
+        self.embedding_service = embedding_service
+        self.ttl = settings.RAG_RESPONSE_CACHE_TTL_SECONDS
+        self.threshold = settings.RAG_SEMANTIC_CACHE_THRESHOLD
+        self.max_entries = settings.RAG_SEMANTIC_CACHE_MAX_ENTRIES
+        self._last_embedding = None  # (query, vector) so get() + set() embed a query once
+
+    @staticmethod
+    def _exact_key(phone_number: str, query: str) -> str:
+        return f"rag:resp:{hash_string(f'{phone_number}:{_normalize_query(query)}')}"
+
+    @staticmethod
+    def _semantic_key(phone_number: str) -> str:
+        return f"rag:sem:{hash_string(phone_number)}"
+
+    def embed(self, query: str) -> Optional[np.ndarray]:
+        """
+        Unit-length embedding of a query (None without an embedding service)
+
+        The vector computed by a missed get() is reused, so callers can hand
+        it to RAGService.query instead of embedding the query a second time.
+        """
+        if self.embedding_service is None:
+            return None
+        last = self._last_embedding
+        if last is not None and last[0] == query:
+            return last[1]
+        vector = np.asarray(self.embedding_service.embed(query), dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        vector = vector / norm if norm else None
+        self._last_embedding = (query, vector)
+        return vector
+
+    def get(self, phone_number: str, query: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result for this user's query, or None on miss"""
+        if not settings.RAG_RESPONSE_CACHE_ENABLED:
+            return None
+        redis_client = _get_redis()
+        if redis_client is None:
+            return None
+
+        try:
+            raw = redis_client.get(self._exact_key(phone_number, query))
+            if raw is not None:
+                logger.debug(f"RAG response cache hit (exact) for {phone_number}")
+                return fast_json.loads(raw)
+
+            query_vector = self.embed(query)
+            if query_vector is None:
+                return None
+
+            best_score, best_result = -1.0, None
+            for entry in redis_client.lrange(self._semantic_key(phone_number), 0, -1):
+                item = fast_json.loads(entry)
+                cached_vector = np.frombuffer(bytes.fromhex(item["embedding"]), dtype=np.float32)
+                if cached_vector.shape != query_vector.shape:
+                    continue
+                score = float(np.dot(query_vector, cached_vector))
+                if score > best_score:
+                    best_score, best_result = score, item["result"]
+
+            if best_result is not None and best_score >= self.threshold:
+                logger.debug(f"RAG response cache hit (semantic, {best_score:.3f}) for {phone_number}")
+                return best_result
+        except Exception as e:
+            logger.debug(f"RAG response cache lookup failed: {e}")
+        return None
+
+    def set(self, phone_number: str, query: str, result: Dict[str, Any],
+            query_vector: Optional[np.ndarray] = None) -> None:
+        """Store a result in both cache tiers (query_vector: output of embed(), if already computed)"""
+        if not settings.RAG_RESPONSE_CACHE_ENABLED:
+            return
+        redis_client = _get_redis()
+        if redis_client is None:
+            return
+
+        try:
+            payload = fast_json.dumps(result)
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.setex(self._exact_key(phone_number, query), self.ttl, payload)
+
+            if query_vector is None:
+                query_vector = self.embed(query)
+            if query_vector is not None:
+                semantic_key = self._semantic_key(phone_number)
+                pipe.lpush(semantic_key, fast_json.dumps({
+                    "embedding": query_vector.tobytes().hex(),
+                    "result": result,
+                }))
+                pipe.ltrim(semantic_key, 0, self.max_entries - 1)
+                pipe.expire(semantic_key, self.ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"RAG response cache store failed: {e}")
@@ -40,6 +40,11 @@ def initialize_rag_services():
         raise
 
 
+def rag_services_initialized() -> bool:
+    """Whether initialize_rag_services() has already run in this process"""
+    return _embedding_service is not None and _vector_store is not None
+
+
 def get_embedding_service_instance() -> EmbeddingService:
     """Get the singleton embedding service instance"""
     if _embedding_service is None:
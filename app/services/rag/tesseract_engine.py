@@ -0,0 +1,77 @@
+"""
+Tesseract access - in-process through tesserocr when installed, pytesseract otherwise
+
+pytesseract starts the tesseract CLI (and reloads the trained data) for every call;
+tesserocr keeps one initialised API per thread, so the model stays loaded between images.
+"""
+import logging
+import re
+import threading
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from tesserocr import PyTessBaseAPI, PSM
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+_local = threading.local()
+
+
+def _get_api(lang: str, psm) -> "PyTessBaseAPI":
+    """Per-thread API instance for (lang, psm); tesseract APIs are not thread-safe"""
+    apis = getattr(_local, "apis", None)
+    if apis is None:
+        apis = _local.apis = {}
+    api = apis.get((lang, psm))
+    if api is None:
+        api = apis[(lang, psm)] = PyTessBaseAPI(lang=lang, psm=psm)
+    return api
+
+
+def image_to_string(image, lang: str) -> str:
+    """OCR a PIL image with automatic page segmentation (tesseract's default)"""
+    if not TESSEROCR_AVAILABLE:
+        import pytesseract
+        return pytesseract.image_to_string(image, lang=lang)
+    
+    api = _get_api(lang, PSM.AUTO)
+    api.SetImage(image)
+    return api.GetUTF8Text()
+
+
+def detect_orientation(image) -> Optional[Tuple[int, Optional[int], Optional[float]]]:
+    """
+    Run orientation detection (OSD) on a PIL image
+    
+    Returns (clockwise rotation needed, orientation in degrees, confidence),
+    or None if tesseract could not determine the orientation.
+    """
+    if not TESSEROCR_AVAILABLE:
+        import pytesseract
+        osd_result = pytesseract.image_to_osd(image)
+        logger.info(f"Tesseract OSD result: {osd_result}")
+        
+        # Format: "Rotate: 270" or "Rotate: 90" etc.
+        rotate_match = re.search(r"Rotate:\s*(\d+)", osd_result)
+        if not rotate_match:
+            return None
+        orientation_match = re.search(r"Orientation in degrees:\s*(\d+)", osd_result)
+        confidence_match = re.search(r"Orientation confidence:\s*([\d.]+)", osd_result)
+        return (
+            int(rotate_match.group(1)),
+            int(orientation_match.group(1)) if orientation_match else None,
+            float(confidence_match.group(1)) if confidence_match else None,
+        )
+    
+    api = _get_api("osd", PSM.OSD_ONLY)
+    api.SetImage(image)
+    osd = api.DetectOrientationScript()
+    logger.info(f"Tesseract OSD result: {osd}")
+    if not osd:
+        return None
+    orientation_deg = osd["orient_deg"]
+    # Same relation tesseract uses for the "Rotate:" line of its OSD output
+    return (360 - orientation_deg) % 360, orientation_deg, osd["orient_conf"]
@@ -3,7 +3,8 @@ Text Enhancer - Uses LLM to improve extracted text before chunking
 Designed to prevent hallucination by using strict prompts and low temperature
 """
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 from app.core.config import get_settings
 from app.services.rag.llm_service import get_llm_service
 
@@ -36,6 +37,29 @@ class TextEnhancer:
             self.llm_service = None
             logger.info("ℹ️  Text enhancement is disabled")
     
+    def _generate_all(self, prompts: List[str], system_prompt: str, temperature: float,
+                      max_tokens: List[int]) -> List[str]:
+        """
+        Run one LLM call per prompt, up to TEXT_ENHANCEMENT_MAX_CONCURRENCY at a time
+        
+        Results keep the order of prompts; the first failure is raised to the caller.
+        """
+        def generate(args):
+            prompt, prompt_max_tokens = args
+            return self.llm_service.generate(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=prompt_max_tokens,
+            )
+        
+        jobs = list(zip(prompts, max_tokens))
+        workers = min(settings.TEXT_ENHANCEMENT_MAX_CONCURRENCY, len(jobs))
+        if workers <= 1:
+            return [generate(job) for job in jobs]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(generate, jobs))
+    
     def enhance_text(self, text: str, document_title: Optional[str] = None,
                      document_type: Optional[str] = None) -> str:
         """
@@ -137,12 +161,10 @@ Return ONLY the cleaned, properly formatted text. Do not add explanations or com
             else:
                 # Process in chunks and combine
                 logger.info(f"   Text is large ({len(text)} chars), processing in chunks...")
-                enhanced_chunks = []
                 chunk_size = max_chunk_size
-                
-                for i in range(0, len(text), chunk_size):
-                    chunk_text = text[i:i + chunk_size]
-                    chunk_prompt = f"""Clean and enhance this portion of a document.
+                chunk_texts = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+                chunk_prompts = [
+                    f"""Clean and enhance this portion of a document.
 
 {context_str}
 
@@ -150,14 +172,15 @@ Extracted Text Portion:
 {chunk_text}
 
 Return only the cleaned text for this portion."""
-
-                    enhanced_chunk = self.llm_service.generate(
-                        prompt=chunk_prompt,
-                        system_prompt=system_prompt,
-                        temperature=self.temperature,
-                        max_tokens=min(len(chunk_text) * 2, 8000),
-                    )
-                    enhanced_chunks.append(enhanced_chunk)
+                    for chunk_text in chunk_texts
+                ]
+                
+                enhanced_chunks = self._generate_all(
+                    chunk_prompts,
+                    system_prompt=system_prompt,
+                    temperature=self.temperature,
+                    max_tokens=[min(len(chunk_text) * 2, 8000) for chunk_text in chunk_texts],
+                )
                 
                 enhanced_text = "\n\n".join(enhanced_chunks)
             
@@ -319,12 +342,10 @@ Return ONLY the corrected, structured text without any explanations or commentar
             else:
                 # Process in chunks and combine
                 logger.info(f"   OCR text is large ({len(text)} chars), processing in chunks...")
-                enhanced_chunks = []
                 chunk_size = max_chunk_size
-                
-                for i in range(0, len(text), chunk_size):
-                    chunk_text = text[i:i + chunk_size]
-                    chunk_prompt = f"""AGGRESSIVELY correct this portion of OCR-extracted text by fixing OCR errors and making educated guesses.
+                chunk_texts = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+                chunk_prompts = [
+                    f"""AGGRESSIVELY correct this portion of OCR-extracted text by fixing OCR errors and making educated guesses.
 
 {context_str}
 
@@ -339,17 +360,18 @@ Fix OCR errors aggressively:
 - Remove duplicates and artifacts
 
 Return only the corrected text for this portion."""
-
-                    # Use slightly higher temperature for OCR text
-                    ocr_temperature = min(self.temperature + 0.1, 0.4)
-                    
-                    enhanced_chunk = self.llm_service.generate(
-                        prompt=chunk_prompt,
-                        system_prompt=system_prompt,
-                        temperature=ocr_temperature,
-                        max_tokens=min(len(chunk_text) * 2, 8000),
-                    )
-                    enhanced_chunks.append(enhanced_chunk)
+                    for chunk_text in chunk_texts
+                ]
+                
+                # Use slightly higher temperature for OCR text
+                ocr_temperature = min(self.temperature + 0.1, 0.4)
+                
+                enhanced_chunks = self._generate_all(
+                    chunk_prompts,
+                    system_prompt=system_prompt,
+                    temperature=ocr_temperature,
+                    max_tokens=[min(len(chunk_text) * 2, 8000) for chunk_text in chunk_texts],
+                )
                 
                 enhanced_text = "\n\n".join(enhanced_chunks)
             
@@ -223,7 +223,7 @@ class FAISSVectorStore(VectorStore):
                     "index_to_id": self._index_to_id,
                     "metadata": self._metadata,
                     "next_index": self._next_index,
-                }, f)
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
         except Exception as e:
             logger.error(f"Error saving metadata: {str(e)}")
     
@@ -2,14 +2,81 @@
 Website Scraper - Scrapes content from websites
 """
 import logging
+import re
+import threading
+import time
 from typing import Dict, Any, Optional
+from urllib.parse import urlparse
 import httpx
 from bs4 import BeautifulSoup
+from cachetools import LRUCache
 from app.core.config import get_settings
+from app.utils import json as fast_json
+from app.utils.helpers import hash_string
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Whitespace around line breaks (including blank lines) collapsed to a single newline
+_WS_RE = re.compile(r'[^\S\n]*\n\s*')
+
+# Process-wide cache of {url: {"etag", "last_modified", "result"}} shared by all scraper instances
+_scrape_cache: LRUCache = LRUCache(maxsize=settings.SCRAPE_CACHE_SIZE)
+_redis_client = None
+
+
+def _get_redis():
+    """Get a Redis client for the persistent scrape cache (None if unavailable)"""
+    global _redis_client
+    if _redis_client is None:
+        try:
+            from redis import Redis
+            _redis_client = Redis.from_url(settings.REDIS_URL)
+        except Exception as e:
+            logger.warning(f"Redis unavailable for scrape cache: {e}")
+            _redis_client = False
+    return _redis_client or None
+
+
+class _HostRateLimiter:
+    """Token bucket limiting requests per second to a single host (thread-safe)"""
+    
+    def __init__(self, max_rate: float, time_period: float = 1.0):
+        self.max_rate = max_rate
+        self.rate = max_rate / time_period
+        self._tokens = max_rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Block until a request token is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.max_rate, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Per-host concurrency and rate limits, shared across scraper instances and threads
+_host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_host_limiters: Dict[str, _HostRateLimiter] = {}
+_host_lock = threading.Lock()
+
+
+def _get_host_limits(url: str) -> tuple[threading.BoundedSemaphore, _HostRateLimiter]:
+    """Get (or create) the semaphore and rate limiter for the URL's host"""
+    host = urlparse(url).netloc
+    with _host_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(settings.SCRAPE_MAX_CONCURRENCY_PER_HOST)
+            _host_limiters[host] = _HostRateLimiter(settings.SCRAPE_MAX_REQUESTS_PER_SECOND_PER_HOST)
+        return _host_semaphores[host], _host_limiters[host]
+
 
 class WebsiteScraper:
     """Scrape content from websites"""
@@ -21,6 +88,45 @@ class WebsiteScraper:
         }
         logger.info("Initialized WebsiteScraper")
     
+    def _get_cached(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get cached scrape entry from the in-memory LRU, falling back to Redis"""
+        entry = _scrape_cache.get(url)
+        if entry is not None:
+            return entry
+        
+        redis_client = _get_redis()
+        if redis_client is None:
+            return None
+        try:
+            raw = redis_client.get(f"scrape:{hash_string(url)}")
+        except Exception as e:
+            logger.debug(f"Scrape cache lookup failed for {url}: {e}")
+            return None
+        if raw is None:
+            return None
+        
+        entry = fast_json.loads(raw)
+        _scrape_cache[url] = entry
+        return entry
+    
+    def _set_cached(self, url: str, etag: Optional[str], last_modified: Optional[str],
+                    result: Dict[str, Any]) -> None:
+        """Store scrape result with its validators in the LRU and Redis"""
+        entry = {"etag": etag, "last_modified": last_modified, "result": result}
+        _scrape_cache[url] = entry
+        
+        redis_client = _get_redis()
+        if redis_client is None:
+            return
+        try:
+            redis_client.set(
+                f"scrape:{hash_string(url)}",
+                fast_json.dumps(entry),
+                ex=settings.SCRAPE_CACHE_TTL_SECONDS,
+            )
+        except Exception as e:
+            logger.debug(f"Scrape cache store failed for {url}: {e}")
+    
     def scrape_url(self, url: str) -> Dict[str, Any]:
         """
         Scrape content from a URL
@@ -34,8 +140,25 @@ class WebsiteScraper:
         try:
             logger.info(f"Scraping URL: {url}")
             
-            # Check if URL is accessible
-            response = httpx.get(url, headers=self.headers, timeout=self.timeout, follow_redirects=True)
+            # Conditional GET using validators from a previous scrape
+            headers = dict(self.headers)
+            cached = self._get_cached(url)
+            if cached:
+                if cached.get("etag"):
+                    headers["If-None-Match"] = cached["etag"]
+                if cached.get("last_modified"):
+                    headers["If-Modified-Since"] = cached["last_modified"]
+            
+            # Check if URL is accessible (paced per host to avoid throttling/bans)
+            host_semaphore, host_limiter = _get_host_limits(url)
+            with host_semaphore:
+                host_limiter.acquire()
+                response = httpx.get(url, headers=headers, timeout=self.timeout, follow_redirects=True)
+            
+            # Page unchanged since last scrape - reuse the parsed result
+            if response.status_code == 304 and cached:
+                logger.info(f"✅ URL not modified, using cached scrape: {url}")
+                return cached["result"]
             
             # Check for authentication required
             if response.status_code == 401:
@@ -66,12 +189,11 @@ class WebsiteScraper:
             description = meta_desc.get('content') if meta_desc else None
             
             # Clean up text (remove excessive whitespace)
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
-            cleaned_text = '\n'.join(lines)
+            cleaned_text = _WS_RE.sub('\n', text).strip()
             
             logger.info(f"✅ Successfully scraped URL: {url} ({len(cleaned_text)} characters)")
             
-            return {
+            result = {
                 "url": url,
                 "title": title_text,
                 "description": description,
@@ -80,6 +202,13 @@ class WebsiteScraper:
                 "content_type": response.headers.get("content-type", ""),
             }
             
+            etag = response.headers.get("etag")
+            last_modified = response.headers.get("last-modified")
+            if etag or last_modified:
+                self._set_cached(url, etag, last_modified, result)
+            
+            return result
+            
         except httpx.HTTPError as e:
             logger.error(f"HTTP error scraping URL {url}: {str(e)}")
             raise ValueError(f"Failed to access URL: {str(e)}")
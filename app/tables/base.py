@@ -1,6 +1,11 @@
 """
 Shared database base for all tables
 """
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
+
+# Native JSON column type for metadata: JSONB on PostgreSQL, JSON elsewhere (MySQL)
+MetadataJSON = JSON().with_variant(JSONB(), "postgresql")
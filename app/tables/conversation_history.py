@@ -6,7 +6,7 @@ from datetime import datetime, timedelta
 from sqlalchemy import Column, String, DateTime, Text, Integer, Index
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from app.tables.base import Base
+from app.tables.base import Base, MetadataJSON
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,12 +20,12 @@ class ConversationHistory(Base):
         Index('idx_user_created', 'user_phone_number', 'created_at'),
     )
     
-    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_phone_number = Column(String(20), nullable=False, index=True)
     session_id = Column(String(100), nullable=False, index=True)  # Session identifier
     message_type = Column(String(20), nullable=False)  # 'user' or 'assistant'
     message = Column(Text, nullable=False)  # The actual message content
-    metadata_json = Column(Text, nullable=True)  # JSON string for additional metadata (e.g., sources used)
+    metadata_json = Column(MetadataJSON, nullable=True)  # Additional metadata (e.g., sources used), native JSON/JSONB
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -44,8 +44,16 @@ class ConversationHistory(Base):
 class ConversationHistoryRepository:
     """Repository for Conversation History table operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, autocommit: bool = True):
         self.db = db
+        self.autocommit = autocommit  # False when a UnitOfWork owns the transaction
+    
+    def _commit(self) -> None:
+        """Commit, or only flush when the caller controls the transaction"""
+        if self.autocommit:
+            self.db.commit()
+        else:
+            self.db.flush()
     
     def get_by_id(self, history_id: int) -> Optional[ConversationHistory]:
         """Get conversation history by ID"""
@@ -56,7 +64,7 @@ class ConversationHistoryRepository:
             raise
     
     def create(self, user_phone_number: str, session_id: str, message_type: str,
-               message: str, metadata_json: Optional[str] = None) -> ConversationHistory:
+               message: str, metadata_json: Optional[Dict[str, Any]] = None) -> ConversationHistory:
         """Create a new conversation history entry"""
         try:
             history = ConversationHistory(
@@ -67,8 +75,9 @@ class ConversationHistoryRepository:
                 metadata_json=metadata_json,
             )
             self.db.add(history)
-            self.db.commit()
-            self.db.refresh(history)
+            # The flush populates the id (lastrowid / INSERT ... RETURNING) and Python-side
+            # defaults; sessions don't expire on commit, so no extra refresh SELECT is needed
+            self._commit()
             return history
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -104,7 +113,7 @@ class ConversationHistoryRepository:
                 ConversationHistory.user_phone_number == user_phone_number,
                 ConversationHistory.session_id == session_id
             ).delete()
-            self.db.commit()
+            self._commit()
             return count
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -118,7 +127,7 @@ class ConversationHistoryRepository:
             count = self.db.query(ConversationHistory).filter(
                 ConversationHistory.created_at < cutoff_date
             ).delete()
-            self.db.commit()
+            self._commit()
             return count
         except SQLAlchemyError as e:
             self.db.rollback()
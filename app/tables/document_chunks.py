@@ -1,12 +1,12 @@
 """
 Document Chunks table - Stores metadata about document chunks for vector search
 """
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey, Index
+from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey, Index, text, update, case
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from app.tables.base import Base
+from app.tables.base import Base, MetadataJSON
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,17 +18,24 @@ class DocumentChunk(Base):
     __table_args__ = (
         Index('idx_document_chunk', 'document_id', 'chunk_index'),
         Index('idx_user_document', 'user_phone_number', 'document_id'),
+        # Partial index for the "not yet pushed to the vector DB" scan (PostgreSQL only)
+        Index('idx_vector_id_pending', 'id',
+              postgresql_where=text('vector_id IS NULL')).ddl_if(dialect='postgresql'),
+        # Unique lookup index for get_by_vector_id; NULLs are excluded on PostgreSQL
+        # and allowed multiple times by MySQL unique indexes
+        Index('idx_vector_id_uq', 'vector_id', unique=True,
+              postgresql_where=text('vector_id IS NOT NULL')),
     )
     
-    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     document_id = Column(Integer, ForeignKey("knowledge_documents.id"), nullable=False, index=True)
     user_phone_number = Column(String(20), nullable=True, index=True)  # NULL for global docs, set for user-specific
     chunk_index = Column(Integer, nullable=False)  # Order of chunk in document
     chunk_text = Column(Text, nullable=False)  # The actual chunk text
     chunk_start = Column(Integer, nullable=True)  # Start position in original document
     chunk_end = Column(Integer, nullable=True)  # End position in original document
-    vector_id = Column(String(200), nullable=True, index=True)  # ID in vector database
-    metadata_json = Column(Text, nullable=True)  # JSON string for additional metadata
+    vector_id = Column(String(200), nullable=True)  # ID in vector database (indexed via __table_args__)
+    metadata_json = Column(MetadataJSON, nullable=True)  # Additional metadata (native JSON/JSONB)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -50,8 +57,16 @@ class DocumentChunk(Base):
 class DocumentChunkRepository:
     """Repository for Document Chunk table operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, autocommit: bool = True):
         self.db = db
+        self.autocommit = autocommit  # False when a UnitOfWork owns the transaction
+    
+    def _commit(self) -> None:
+        """Commit, or only flush when the caller controls the transaction"""
+        if self.autocommit:
+            self.db.commit()
+        else:
+            self.db.flush()
     
     def get_by_id(self, chunk_id: int) -> Optional[DocumentChunk]:
         """Get document chunk by ID"""
@@ -84,10 +99,20 @@ class DocumentChunkRepository:
             logger.error(f"Error getting chunk by vector_id {vector_id}: {str(e)}")
             raise
     
+    def get_pending_embedding(self, limit: int = 500) -> List[DocumentChunk]:
+        """Get chunks that have not been pushed to the vector database yet"""
+        try:
+            return self.db.query(DocumentChunk).filter(
+                DocumentChunk.vector_id.is_(None)
+            ).order_by(DocumentChunk.id.asc()).limit(limit).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting chunks pending embedding: {str(e)}")
+            raise
+    
     def create(self, document_id: int, chunk_index: int, chunk_text: str,
                chunk_start: Optional[int] = None, chunk_end: Optional[int] = None,
                user_phone_number: Optional[str] = None, vector_id: Optional[str] = None,
-               metadata_json: Optional[str] = None) -> DocumentChunk:
+               metadata_json: Optional[Dict[str, Any]] = None) -> DocumentChunk:
         """Create a new document chunk"""
         try:
             chunk = DocumentChunk(
@@ -101,8 +126,9 @@ class DocumentChunkRepository:
                 metadata_json=metadata_json,
             )
             self.db.add(chunk)
-            self.db.commit()
-            self.db.refresh(chunk)
+            # The flush populates the id (lastrowid / INSERT ... RETURNING) and Python-side
+            # defaults; sessions don't expire on commit, so no extra refresh SELECT is needed
+            self._commit()
             return chunk
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -120,7 +146,7 @@ class DocumentChunkRepository:
                 query = query.filter(DocumentChunk.user_phone_number.is_(None))
             
             count = query.delete()
-            self.db.commit()
+            self._commit()
             return count
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -135,10 +161,40 @@ class DocumentChunkRepository:
                 return None
             
             chunk.vector_id = vector_id
-            self.db.commit()
+            self._commit()
             self.db.refresh(chunk)
             return chunk
         except SQLAlchemyError as e:
             self.db.rollback()
             logger.error(f"Error updating vector_id for chunk {chunk_id}: {str(e)}")
             raise
+    
+    def bulk_update_vector_ids(self, pairs: List[Tuple[int, str]]) -> int:
+        """
+        Update vector IDs for many chunks in a single UPDATE statement
+        
+        Args:
+            pairs: List of (chunk_id, vector_id) tuples
+            
+        Returns:
+            Number of rows updated
+        """
+        if not pairs:
+            return 0
+        
+        try:
+            # UPDATE ... SET vector_id = CASE id WHEN ... END WHERE id IN (...)
+            # works on both MySQL and PostgreSQL, unlike UPDATE ... FROM (VALUES ...)
+            vector_ids = dict(pairs)
+            result = self.db.execute(
+                update(DocumentChunk)
+                .where(DocumentChunk.id.in_(vector_ids.keys()))
+                .values(vector_id=case(vector_ids, value=DocumentChunk.id))
+                .execution_options(synchronize_session=False)
+            )
+            self._commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Error bulk updating vector_ids for {len(pairs)} chunks: {str(e)}")
+            raise
@@ -3,10 +3,10 @@ Knowledge Documents table - Company-wide knowledge base documents
 """
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Text, Integer, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Text, Integer, Index, Enum as SQLEnum
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from app.tables.base import Base
+from app.tables.base import Base, MetadataJSON
 import enum
 import logging
 
@@ -38,8 +38,12 @@ class DocumentStatus(str, enum.Enum):
 class KnowledgeDocument(Base):
     """Knowledge Document table model"""
     __tablename__ = "knowledge_documents"
+    __table_args__ = (
+        # GIN index for server-side filtering on metadata fields (PostgreSQL only)
+        Index('ix_kd_meta_gin', 'metadata_json', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
     
-    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String(500), nullable=False)
     description = Column(Text, nullable=True)
     document_type = Column(SQLEnum(DocumentType), nullable=False)
@@ -48,7 +52,7 @@ class KnowledgeDocument(Base):
     file_size = Column(Integer, nullable=True)  # Size in bytes
     mime_type = Column(String(100), nullable=True)
     status = Column(SQLEnum(DocumentStatus), default=DocumentStatus.PENDING, nullable=False)
-    metadata_json = Column(Text, nullable=True)  # JSON string for additional metadata
+    metadata_json = Column(MetadataJSON, nullable=True)  # Additional metadata (native JSON/JSONB)
     created_by = Column(String(100), nullable=True)  # User who added the document
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -79,8 +83,16 @@ class KnowledgeDocument(Base):
 class KnowledgeDocumentRepository:
     """Repository for Knowledge Document table operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, autocommit: bool = True):
         self.db = db
+        self.autocommit = autocommit  # False when a UnitOfWork owns the transaction
+    
+    def _commit(self) -> None:
+        """Commit, or only flush when the caller controls the transaction"""
+        if self.autocommit:
+            self.db.commit()
+        else:
+            self.db.flush()
     
     def get_by_id(self, document_id: int) -> Optional[KnowledgeDocument]:
         """Get document by ID"""
@@ -94,7 +106,7 @@ class KnowledgeDocumentRepository:
                file_path: Optional[str] = None, source_url: Optional[str] = None,
                description: Optional[str] = None, file_size: Optional[int] = None,
                mime_type: Optional[str] = None, created_by: Optional[str] = None,
-               metadata_json: Optional[str] = None, status: Optional[DocumentStatus] = None) -> KnowledgeDocument:
+               metadata_json: Optional[Dict[str, Any]] = None, status: Optional[DocumentStatus] = None) -> KnowledgeDocument:
         """Create a new knowledge document"""
         try:
             # Use default status if not provided
@@ -114,8 +126,9 @@ class KnowledgeDocumentRepository:
                 status=status,
             )
             self.db.add(doc)
-            self.db.commit()
-            self.db.refresh(doc)
+            # The flush populates the id (lastrowid / INSERT ... RETURNING) and Python-side
+            # defaults; sessions don't expire on commit, so no extra refresh SELECT is needed
+            self._commit()
             return doc
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -134,7 +147,7 @@ class KnowledgeDocumentRepository:
                     setattr(doc, key, value)
             
             doc.updated_at = datetime.utcnow()
-            self.db.commit()
+            self._commit()
             self.db.refresh(doc)
             return doc
         except SQLAlchemyError as e:
@@ -150,7 +163,7 @@ class KnowledgeDocumentRepository:
                 return False
             
             self.db.delete(doc)
-            self.db.commit()
+            self._commit()
             return True
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -1,16 +1,23 @@
 """
 User Documents table - Maps user-specific documents to users
 """
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, Integer, Boolean, ForeignKey, UniqueConstraint, insert, select, update, delete, lambda_stmt, case, bindparam
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session, relationship
 from sqlalchemy.exc import SQLAlchemyError
 from app.tables.base import Base
+from app.tables.knowledge_documents import KnowledgeDocument
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT statement for bulk_create
+BULK_INSERT_BATCH_SIZE = 1000
+
 
 class UserDocument(Base):
     """User Document mapping table model"""
@@ -19,7 +26,7 @@ class UserDocument(Base):
         UniqueConstraint('user_phone_number', 'document_id', name='uq_user_document'),
     )
     
-    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_phone_number = Column(String(20), ForeignKey("users.phone_number"), nullable=False, index=True)
     document_id = Column(Integer, ForeignKey("knowledge_documents.id"), nullable=False, index=True)
     assigned_by = Column(String(100), nullable=True)  # HR/admin who assigned the document
@@ -44,8 +51,38 @@ class UserDocument(Base):
         }
 
 
+# Marks update() fields that were not passed, so an explicit None can still mean NULL
+_UNSET = object()
+
+_USER_DOCUMENT_UPDATABLE_FIELDS = ("assigned_by", "notes")
+
+
+def _set_if_passed(field: str, column):
+    """CASE WHEN :set_<field> THEN :v_<field> ELSE <column> END"""
+    return case(
+        (bindparam(f"set_{field}", type_=Boolean), bindparam(f"v_{field}", type_=column.type)),
+        else_=column,
+    )
+
+
+# One statement shape for every combination of fields; flags pick the columns to change
+_UPDATE_USER_DOCUMENT_STMT = (
+    update(UserDocument)
+    .where(UserDocument.id == bindparam("pk"))
+    .values({
+        **{field: _set_if_passed(field, getattr(UserDocument, field))
+           for field in _USER_DOCUMENT_UPDATABLE_FIELDS},
+        "updated_at": bindparam("now", type_=DateTime),
+    })
+)
+
+
 class UserDocumentRepository:
-    """Repository for User Document table operations"""
+    """
+    Repository for User Document table operations
+    
+    Write methods only flush; the caller owns the transaction and commits.
+    """
     
     def __init__(self, db: Session):
         self.db = db
@@ -53,7 +90,9 @@ class UserDocumentRepository:
     def get_by_id(self, mapping_id: int) -> Optional[UserDocument]:
         """Get user document mapping by ID"""
         try:
-            return self.db.query(UserDocument).filter(UserDocument.id == mapping_id).first()
+            # lambda_stmt caches the compiled SELECT; closure variables become bound parameters
+            stmt = lambda_stmt(lambda: select(UserDocument).where(UserDocument.id == mapping_id))
+            return self.db.execute(stmt).scalars().first()
         except SQLAlchemyError as e:
             logger.error(f"Error getting user document mapping {mapping_id}: {str(e)}")
             raise
@@ -61,10 +100,11 @@ class UserDocumentRepository:
     def get_by_user_and_document(self, user_phone_number: str, document_id: int) -> Optional[UserDocument]:
         """Get mapping by user and document"""
         try:
-            return self.db.query(UserDocument).filter(
+            stmt = lambda_stmt(lambda: select(UserDocument).where(
                 UserDocument.user_phone_number == user_phone_number,
-                UserDocument.document_id == document_id
-            ).first()
+                UserDocument.document_id == document_id,
+            ))
+            return self.db.execute(stmt).scalars().first()
         except SQLAlchemyError as e:
             logger.error(f"Error getting user document mapping: {str(e)}")
             raise
@@ -72,13 +112,25 @@ class UserDocumentRepository:
     def get_user_documents(self, user_phone_number: str) -> List[UserDocument]:
         """Get all documents assigned to a user"""
         try:
-            return self.db.query(UserDocument).filter(
+            stmt = lambda_stmt(lambda: select(UserDocument).where(
                 UserDocument.user_phone_number == user_phone_number
-            ).all()
+            ))
+            return list(self.db.execute(stmt).scalars().all())
         except SQLAlchemyError as e:
             logger.error(f"Error getting user documents for {user_phone_number}: {str(e)}")
             raise
     
+    def get_user_documents_joined(self, user_phone_number: str) -> List[Tuple[UserDocument, KnowledgeDocument]]:
+        """Get a user's document mappings together with their documents in one JOIN query"""
+        try:
+            stmt = lambda_stmt(lambda: select(UserDocument, KnowledgeDocument)
+                               .join(KnowledgeDocument, UserDocument.document_id == KnowledgeDocument.id)
+                               .where(UserDocument.user_phone_number == user_phone_number))
+            return [tuple(row) for row in self.db.execute(stmt).all()]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting joined user documents for {user_phone_number}: {str(e)}")
+            raise
+    
     def get_document_users(self, document_id: int) -> List[UserDocument]:
         """Get all users assigned to a document"""
         try:
@@ -89,76 +141,108 @@ class UserDocumentRepository:
             logger.error(f"Error getting document users for {document_id}: {str(e)}")
             raise
     
-    def create(self, user_phone_number: str, document_id: int,
-               assigned_by: Optional[str] = None, notes: Optional[str] = None) -> UserDocument:
-        """Create a new user document mapping"""
-        try:
-            # Check if mapping already exists
-            existing = self.get_by_user_and_document(user_phone_number, document_id)
-            if existing:
-                return existing
-            
-            mapping = UserDocument(
-                user_phone_number=user_phone_number,
-                document_id=document_id,
-                assigned_by=assigned_by,
-                notes=notes,
+    def _insert_ignore_duplicates(self, rows: List[Dict[str, Any]]):
+        """Build an INSERT that skips rows violating uq_user_document, for the bound dialect"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return pg_insert(UserDocument).values(rows).on_conflict_do_nothing(constraint="uq_user_document")
+        if dialect == "mysql":
+            # No-op update on duplicate key; unlike INSERT IGNORE this doesn't hide other errors
+            stmt = mysql_insert(UserDocument).values(rows)
+            return stmt.on_duplicate_key_update(user_phone_number=stmt.inserted.user_phone_number)
+        if dialect == "sqlite":
+            return sqlite_insert(UserDocument).values(rows).on_conflict_do_nothing(
+                index_elements=["user_phone_number", "document_id"]
             )
-            self.db.add(mapping)
-            self.db.commit()
-            self.db.refresh(mapping)
-            return mapping
+        return insert(UserDocument).values(rows)
+    
+    def bulk_create(self, mappings: List[Dict[str, Any]]) -> int:
+        """
+        Create many user document mappings, skipping ones that already exist
+        
+        Args:
+            mappings: List of dicts with user_phone_number, document_id and
+                      optional assigned_by / notes
+            
+        Returns:
+            Affected row count reported by the driver (duplicate handling varies by dialect)
+        """
+        if not mappings:
+            return 0
+        
+        try:
+            affected = 0
+            for start in range(0, len(mappings), BULK_INSERT_BATCH_SIZE):
+                rows = [
+                    {
+                        "user_phone_number": m["user_phone_number"],
+                        "document_id": m["document_id"],
+                        "assigned_by": m.get("assigned_by"),
+                        "notes": m.get("notes"),
+                    }
+                    for m in mappings[start:start + BULK_INSERT_BATCH_SIZE]
+                ]
+                result = self.db.execute(self._insert_ignore_duplicates(rows))
+                affected += max(result.rowcount, 0)
+            return affected
         except SQLAlchemyError as e:
-            self.db.rollback()
-            logger.error(f"Error creating user document mapping: {str(e)}")
+            logger.error(f"Error bulk creating {len(mappings)} user document mappings: {str(e)}")
             raise
     
+    def create(self, user_phone_number: str, document_id: int,
+               assigned_by: Optional[str] = None, notes: Optional[str] = None) -> UserDocument:
+        """Create a new user document mapping (returns the existing one if already assigned)"""
+        self.bulk_create([{
+            "user_phone_number": user_phone_number,
+            "document_id": document_id,
+            "assigned_by": assigned_by,
+            "notes": notes,
+        }])
+        return self.get_by_user_and_document(user_phone_number, document_id)
+    
     def update(self, mapping_id: int, **kwargs) -> Optional[UserDocument]:
-        """Update user document mapping by ID"""
+        """
+        Update user document mapping by ID
+        
+        Single fixed-shape UPDATE. Fields that are not passed keep their value;
+        an explicit None sets the column to NULL. Unknown keys are ignored.
+        Only flushes: the caller commits.
+        """
         try:
-            mapping = self.get_by_id(mapping_id)
-            if not mapping:
+            params = {"pk": mapping_id, "now": datetime.utcnow()}
+            for field in _USER_DOCUMENT_UPDATABLE_FIELDS:
+                value = kwargs.get(field, _UNSET)
+                params[f"set_{field}"] = value is not _UNSET
+                params[f"v_{field}"] = None if value is _UNSET else value
+            result = self.db.execute(_UPDATE_USER_DOCUMENT_STMT, params,
+                                     execution_options={"synchronize_session": False})
+            if result.rowcount == 0:
                 return None
-            
-            for key, value in kwargs.items():
-                if hasattr(mapping, key):
-                    setattr(mapping, key, value)
-            
-            mapping.updated_at = datetime.utcnow()
-            self.db.commit()
-            self.db.refresh(mapping)
-            return mapping
+            return self.db.get(UserDocument, mapping_id, populate_existing=True)
         except SQLAlchemyError as e:
-            self.db.rollback()
             logger.error(f"Error updating user document mapping {mapping_id}: {str(e)}")
             raise
     
     def delete(self, mapping_id: int) -> bool:
         """Delete user document mapping by ID"""
         try:
-            mapping = self.get_by_id(mapping_id)
-            if not mapping:
-                return False
-            
-            self.db.delete(mapping)
-            self.db.commit()
-            return True
+            # Single DELETE; rowcount tells us whether the mapping existed
+            stmt = lambda_stmt(lambda: delete(UserDocument).where(UserDocument.id == mapping_id))
+            result = self.db.execute(stmt, execution_options={"synchronize_session": False})
+            return result.rowcount > 0
         except SQLAlchemyError as e:
-            self.db.rollback()
             logger.error(f"Error deleting user document mapping {mapping_id}: {str(e)}")
             raise
     
     def delete_by_user_and_document(self, user_phone_number: str, document_id: int) -> bool:
         """Delete mapping by user and document"""
         try:
-            mapping = self.get_by_user_and_document(user_phone_number, document_id)
-            if not mapping:
-                return False
-            
-            self.db.delete(mapping)
-            self.db.commit()
-            return True
+            stmt = lambda_stmt(lambda: delete(UserDocument).where(
+                UserDocument.user_phone_number == user_phone_number,
+                UserDocument.document_id == document_id,
+            ))
+            result = self.db.execute(stmt, execution_options={"synchronize_session": False})
+            return result.rowcount > 0
         except SQLAlchemyError as e:
-            self.db.rollback()
             logger.error(f"Error deleting user document mapping: {str(e)}")
             raise
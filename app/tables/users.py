@@ -1,9 +1,12 @@
 """
 Users table - User information with phone number as primary key
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Text, Boolean
+from sqlalchemy import Column, String, DateTime, Text, Boolean, insert, select, update, delete, literal, lambda_stmt, case, bindparam
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from app.tables.base import Base
@@ -16,7 +19,7 @@ class User(Base):
     """User table model"""
     __tablename__ = "users"
     
-    phone_number = Column(String(20), primary_key=True, index=True)
+    phone_number = Column(String(20), primary_key=True)
     name = Column(String(255), nullable=True)
     email = Column(String(255), nullable=True, unique=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -37,8 +40,38 @@ class User(Base):
         }
 
 
+# Marks update() fields that were not passed, so an explicit None can still mean NULL
+_UNSET = object()
+
+_USER_UPDATABLE_FIELDS = ("name", "email", "is_active", "metadata_json")
+
+
+def _set_if_passed(field: str, column):
+    """CASE WHEN :set_<field> THEN :v_<field> ELSE <column> END"""
+    return case(
+        (bindparam(f"set_{field}", type_=Boolean), bindparam(f"v_{field}", type_=column.type)),
+        else_=column,
+    )
+
+
+# One statement shape for every combination of fields; flags pick the columns to change
+_UPDATE_USER_STMT = (
+    update(User)
+    .where(User.phone_number == bindparam("pk"))
+    .values({
+        **{field: _set_if_passed(field, getattr(User, field)) for field in _USER_UPDATABLE_FIELDS},
+        "updated_at": bindparam("now", type_=DateTime),
+    })
+)
+
+
 class UserRepository:
-    """Repository for User table operations"""
+    """
+    Repository for User table operations
+    
+    Write methods only flush; the caller owns the transaction and commits
+    (e.g. with db.begin(): ...) so several writes share a single COMMIT.
+    """
     
     def __init__(self, db: Session):
         self.db = db
@@ -46,15 +79,38 @@ class UserRepository:
     def get_by_phone(self, phone_number: str) -> Optional[User]:
         """Get user by phone number"""
         try:
-            return self.db.query(User).filter(User.phone_number == phone_number).first()
+            # lambda_stmt caches the compiled SELECT; phone_number is extracted as a bound parameter
+            stmt = lambda_stmt(lambda: select(User).where(User.phone_number == phone_number))
+            return self.db.execute(stmt).scalars().first()
         except SQLAlchemyError as e:
             logger.error(f"Error getting user by phone {phone_number}: {str(e)}")
             raise
     
+    def exists_by_phone(self, phone_number: str) -> bool:
+        """Check whether a user exists without loading any columns"""
+        try:
+            stmt = lambda_stmt(lambda: select(literal(1)).where(User.phone_number == phone_number).limit(1))
+            return self.db.execute(stmt).scalar() is not None
+        except SQLAlchemyError as e:
+            logger.error(f"Error checking user existence for {phone_number}: {str(e)}")
+            raise
+    
+    def get_names_by_phones(self, phone_numbers: List[str]) -> Dict[str, Optional[str]]:
+        """Get {phone_number: name} for the users that exist, selecting only those two columns"""
+        if not phone_numbers:
+            return {}
+        try:
+            stmt = select(User.phone_number, User.name).where(User.phone_number.in_(phone_numbers))
+            return {phone: name for phone, name in self.db.execute(stmt)}
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting user names for {len(phone_numbers)} phone numbers: {str(e)}")
+            raise
+    
     def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
         try:
-            return self.db.query(User).filter(User.email == email).first()
+            stmt = lambda_stmt(lambda: select(User).where(User.email == email))
+            return self.db.execute(stmt).scalars().first()
         except SQLAlchemyError as e:
             logger.error(f"Error getting user by email {email}: {str(e)}")
             raise
@@ -70,46 +126,73 @@ class UserRepository:
                 metadata_json=metadata_json,
             )
             self.db.add(user)
-            self.db.commit()
-            self.db.refresh(user)
+            self.db.flush()  # Caller owns the transaction and commits
             return user
         except SQLAlchemyError as e:
-            self.db.rollback()
+            logger.error(f"Error creating user {phone_number}: {str(e)}")
+            raise
+    
+    def create_if_missing(self, phone_number: str, name: Optional[str] = None) -> bool:
+        """
+        Insert a user unless one with this phone number already exists
+        
+        One round-trip and safe against concurrent workers racing on a sender's
+        first message (no IntegrityError), unlike get_by_phone + create.
+        
+        Returns:
+            True if a new row was inserted (only indicative on MySQL, where the
+            driver's FOUND_ROWS flag also reports a matched duplicate as 1)
+        """
+        try:
+            values = {"phone_number": phone_number, "name": name}
+            dialect = self.db.get_bind().dialect.name
+            if dialect == "postgresql":
+                stmt = pg_insert(User).values(**values).on_conflict_do_nothing(index_elements=["phone_number"])
+            elif dialect == "mysql":
+                # No-op update on duplicate key; unlike INSERT IGNORE this doesn't hide other errors
+                stmt = mysql_insert(User).values(**values)
+                stmt = stmt.on_duplicate_key_update(phone_number=stmt.inserted.phone_number)
+            elif dialect == "sqlite":
+                stmt = sqlite_insert(User).values(**values).on_conflict_do_nothing(index_elements=["phone_number"])
+            else:
+                stmt = insert(User).values(**values)
+            return self.db.execute(stmt).rowcount == 1
+        except SQLAlchemyError as e:
             logger.error(f"Error creating user {phone_number}: {str(e)}")
             raise
     
     def update(self, phone_number: str, **kwargs) -> Optional[User]:
-        """Update user by phone number"""
+        """
+        Update user by phone number
+        
+        Emits one fixed-shape UPDATE regardless of which fields are passed, so
+        only a single compiled statement is cached. Fields that are not passed
+        keep their value; an explicit None sets the column to NULL. Unknown
+        keys are ignored. Only flushes: the caller commits.
+        """
         try:
-            user = self.get_by_phone(phone_number)
-            if not user:
+            params = {"pk": phone_number, "now": datetime.utcnow()}
+            for field in _USER_UPDATABLE_FIELDS:
+                value = kwargs.get(field, _UNSET)
+                params[f"set_{field}"] = value is not _UNSET
+                params[f"v_{field}"] = None if value is _UNSET else value
+            result = self.db.execute(_UPDATE_USER_STMT, params,
+                                     execution_options={"synchronize_session": False})
+            if result.rowcount == 0:
                 return None
-            
-            for key, value in kwargs.items():
-                if hasattr(user, key):
-                    setattr(user, key, value)
-            
-            user.updated_at = datetime.utcnow()
-            self.db.commit()
-            self.db.refresh(user)
-            return user
+            return self.db.get(User, phone_number, populate_existing=True)
         except SQLAlchemyError as e:
-            self.db.rollback()
             logger.error(f"Error updating user {phone_number}: {str(e)}")
             raise
     
     def delete(self, phone_number: str) -> bool:
         """Delete user by phone number"""
         try:
-            user = self.get_by_phone(phone_number)
-            if not user:
-                return False
-            
-            self.db.delete(user)
-            self.db.commit()
-            return True
+            # Single DELETE; rowcount tells us whether the user existed
+            stmt = lambda_stmt(lambda: delete(User).where(User.phone_number == phone_number))
+            result = self.db.execute(stmt, execution_options={"synchronize_session": False})
+            return result.rowcount > 0
         except SQLAlchemyError as e:
-            self.db.rollback()
             logger.error(f"Error deleting user {phone_number}: {str(e)}")
             raise
     
@@ -8,7 +8,7 @@ from app.celery_app import celery_app
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task(name="app.tasks.onboarding_tasks.process_document")
+@celery_app.task(name="app.tasks.onboarding_tasks.process_document", ignore_result=True)
 def process_document(document_id: str, document_type: str) -> Dict[str, Any]:
     """
     Process uploaded document
@@ -37,7 +37,7 @@ def process_document(document_id: str, document_type: str) -> Dict[str, Any]:
     }
 
 
-@celery_app.task(name="app.tasks.onboarding_tasks.send_notification")
+@celery_app.task(name="app.tasks.onboarding_tasks.send_notification", ignore_result=True)
 def send_notification(
     user_id: str,
     notification_type: str,
@@ -2,13 +2,23 @@
 Webhook processing tasks
 """
 import logging
+from types import MappingProxyType
 from typing import Any, Dict
 from app.celery_app import celery_app
 
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task(name="app.tasks.webhook_tasks.process_webhook_async", bind=True, max_retries=3)
+@celery_app.task(
+    name="app.tasks.webhook_tasks.process_webhook_async",
+    bind=True,
+    max_retries=3,
+    ignore_result=True,
+    autoretry_for=(Exception,),
+    retry_backoff=60,  # ~60s, 120s, 240s ... capped, with full jitter
+    retry_backoff_max=600,
+    retry_jitter=True,
+)
 def process_webhook_async(
     self,
     event: str,
@@ -41,8 +51,8 @@ def process_webhook_async(
     except Exception as exc:
         logger.error(f"Webhook processing failed: {str(exc)}", exc_info=True)
         
-        # Retry on failure
-        raise self.retry(exc=exc, countdown=60 * (self.request.retries + 1))
+        # Retried by autoretry_for with exponential backoff + jitter
+        raise
 
 
 def _process_webhook_by_event(
@@ -61,16 +71,8 @@ def _process_webhook_by_event(
     Returns:
         Processing result
     """
-    # Route to specific handler based on event type
-    event_handlers = {
-        "user.created": _handle_user_created,
-        "user.updated": _handle_user_updated,
-        "document.uploaded": _handle_document_uploaded,
-        "onboarding.completed": _handle_onboarding_completed,
-    }
-    
-    handler = event_handlers.get(event, _handle_default_webhook)
-    return handler(event, data, headers)
+    # Route to specific handler based on event type (table built once at import)
+    return _EVENT_HANDLERS.get(event, _handle_default_webhook)(event, data, headers)
 
 
 def _handle_user_created(event: str, data: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
@@ -106,3 +108,11 @@ def _handle_default_webhook(event: str, data: Dict[str, Any], headers: Dict[str,
     logger.warning(f"Unknown webhook event: {event}")
     return {"action": "unknown_event", "event": event, "data": data}
 
+
+# Event type -> handler; read-only and built once at import
+_EVENT_HANDLERS = MappingProxyType({
+    "user.created": _handle_user_created,
+    "user.updated": _handle_user_updated,
+    "document.uploaded": _handle_document_uploaded,
+    "onboarding.completed": _handle_onboarding_completed,
+})
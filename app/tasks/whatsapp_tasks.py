@@ -2,13 +2,240 @@
 WhatsApp message processing Celery tasks
 """
 import logging
-from typing import Dict, Any
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, Tuple
+from cachetools import TTLCache
 from app.celery_app import celery_app
+from app.core import database  # module, not SessionLocal: the factories are set after import
+from app.core.config import get_settings
+from app.core.exceptions import TransientError
+from app.services.integrations.twilio_service import TwilioIntegrationService
+from app.services.rag.rag_service import RAGService
+from app.services.rag.response_cache import ResponseCache
+from app.services.rag.singletons import (
+    get_embedding_service_instance,
+    initialize_rag_services,
+    rag_services_initialized,
+)
+from app.tables.users import UserRepository
+from app.utils.helpers import is_gevent_patched
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
+# Process-local cache of known senders: phone_number -> {"exists": True, "name": ...}
+# Only plain values are cached (never ORM rows, which are bound to a session).
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
 
-@celery_app.task(bind=True, max_retries=3)
+
+class _PhoneLookupBatcher:
+    """
+    Coalesce concurrent user lookups into one SELECT ... WHERE phone_number IN (...)
+    
+    Only helps when the worker runs several tasks at once, so batching is used
+    only under the gevent pool; elsewhere each lookup queries directly instead
+    of waiting out the window for a batch of one. The first caller in a window
+    becomes the leader: it waits up to ``window`` seconds (or until
+    ``max_batch`` lookups are queued), runs the query on its own session and
+    resolves every waiter's future. Results are plain dicts in the same shape
+    as ``_user_cache`` entries, or None when the user is unknown.
+    """
+    
+    def __init__(self, window: float = 0.05, max_batch: int = 64):
+        self.window = window
+        self.max_batch = max_batch
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Future] = {}
+        self._leader_active = False
+    
+    def lookup(self, db, phone_number: str) -> Optional[Dict[str, Any]]:
+        if not is_gevent_patched():
+            names = UserRepository(db).get_names_by_phones([phone_number])
+            return {"exists": True, "name": names[phone_number]} if phone_number in names else None
+        
+        with self._cond:
+            future = self._pending.get(phone_number)
+            if future is None:
+                future = Future()
+                self._pending[phone_number] = future
+                if len(self._pending) >= self.max_batch:
+                    self._cond.notify_all()
+            is_leader = not self._leader_active
+            self._leader_active = True
+        
+        if is_leader:
+            self._flush(db)
+        return future.result()
+    
+    def _flush(self, db) -> None:
+        with self._cond:
+            deadline = time.monotonic() + self.window
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._pending = self._pending, {}
+            self._leader_active = False
+        
+        try:
+            # Only phone_number + name are selected; metadata_json etc. never leave the DB
+            names = UserRepository(db).get_names_by_phones(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                future.set_exception(e)
+            return
+        
+        for phone_number, future in batch.items():
+            if phone_number in names:
+                future.set_result({"exists": True, "name": names[phone_number]})
+            else:
+                future.set_result(None)
+
+
+_phone_lookup_batcher = _PhoneLookupBatcher()
+
+# Set once the DB session factories and RAG singletons are known to be ready
+_WORKER_READY = False
+_worker_ready_lock = threading.Lock()
+
+
+def _ensure_worker_ready() -> None:
+    """
+    Make sure the database and RAG services are initialized in this process
+    
+    Normally done once per worker process by init_worker_process
+    (worker_process_init). That signal only fires for prefork children, so
+    under the gevent pool (and in eager mode) the first task does it here; the
+    lock keeps concurrent greenlets from loading the model twice. After the
+    first success every call is a single global check.
+    """
+    global _WORKER_READY
+    if _WORKER_READY:
+        return
+    
+    with _worker_ready_lock:
+        if _WORKER_READY:
+            return
+        
+        if database.SessionLocal is None:
+            database.init_database()
+            if database.SessionLocal is None:
+                error_msg = "Database not initialized. Check DATABASE_URL configuration."
+                logger.error(f"❌ {error_msg}")
+                raise RuntimeError(error_msg)
+        
+        if not rag_services_initialized():
+            try:
+                initialize_rag_services()
+            except Exception as rag_init_error:
+                logger.error(f"❌ Failed to initialize RAG services: {rag_init_error}", exc_info=True)
+                raise RuntimeError(f"RAG services initialization failed: {rag_init_error}") from rag_init_error
+        
+        _WORKER_READY = True
+
+
+# Exact-match + semantic answer cache; built after the embedding model is loaded
+_response_cache: Optional[ResponseCache] = None
+
+
+def _get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(embedding_service=get_embedding_service_instance())
+    return _response_cache
+
+
+# One Twilio service per worker process so its REST client (and the TCP/TLS
+# connection behind it) is reused across messages
+_twilio_service = None
+
+
+def _get_twilio_service():
+    global _twilio_service
+    if _twilio_service is None:
+        _twilio_service = TwilioIntegrationService()
+    return _twilio_service
+
+
+_redis_client = None
+
+# Idempotency markers per Twilio MessageSid. "processing" only lives a little
+# longer than a task may run: a redelivery that finds it retries after it
+# expires, so a message whose worker died is still answered. "done" is kept
+# for a day to swallow duplicate deliveries.
+_MESSAGE_KEY_PREFIX = "wa:msg:"
+_PROCESSING_TTL_SECONDS = 150
+_DONE_TTL_SECONDS = 86400
+
+
+def _get_redis():
+    """Get a Redis client for message de-duplication (None if unavailable)"""
+    global _redis_client
+    if _redis_client is None:
+        try:
+            from redis import Redis
+            _redis_client = Redis.from_url(settings.REDIS_URL)
+        except Exception as e:
+            logger.warning(f"Redis unavailable for WhatsApp message de-duplication: {e}")
+            _redis_client = False
+    return _redis_client or None
+
+
+def _claim_message(message_sid: Optional[str]) -> Tuple[Optional[str], int]:
+    """
+    Mark a message as being processed
+    
+    Returns (None, 0) when the claim was taken. Otherwise returns the existing
+    marker ("done" or "processing") and the seconds left before it expires.
+    Fails open: without a MessageSid or a reachable Redis the message is processed.
+    """
+    redis_client = _get_redis()
+    if not message_sid or redis_client is None:
+        return None, 0
+    key = f"{_MESSAGE_KEY_PREFIX}{message_sid}"
+    try:
+        if redis_client.set(key, "processing", nx=True, ex=_PROCESSING_TTL_SECONDS):
+            return None, 0
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.ttl(key)
+        state, ttl = pipe.execute()
+        if state is None:
+            # Expired between SET and GET: nobody holds it any more
+            return _claim_message(message_sid)
+        return state.decode(), max(ttl, 0)
+    except Exception as e:
+        logger.debug(f"Message de-duplication check failed: {e}")
+        return None, 0
+
+
+def _finish_message(message_sid: Optional[str], done: bool) -> None:
+    """Record a processed message, or release the claim so a retry can take it"""
+    redis_client = _get_redis()
+    if not message_sid or redis_client is None:
+        return
+    key = f"{_MESSAGE_KEY_PREFIX}{message_sid}"
+    try:
+        if done:
+            redis_client.set(key, "done", ex=_DONE_TTL_SECONDS)
+        else:
+            redis_client.delete(key)
+    except Exception as e:
+        logger.debug(f"Message de-duplication update failed: {e}")
+
+
+@celery_app.task(
+    bind=True,
+    ignore_result=True,
+    acks_late=True,
+    reject_on_worker_lost=True,  # Requeue if the worker dies mid-message instead of dropping it
+    time_limit=120,
+    soft_time_limit=100,
+    max_retries=3,  # Only used to wait out another delivery's "processing" claim
+)
 def process_whatsapp_message(
     self,
     message_data: Dict[str, Any],
@@ -22,29 +249,44 @@ def process_whatsapp_message(
     Returns:
         Processing result
     """
+    message_sid = message_data.get("message_sid")
+    claim_state, claim_ttl = _claim_message(message_sid)
+    if claim_state == "done":
+        logger.info("Skipping duplicate WhatsApp message %s", message_sid)
+        return {"success": True, "message_sid": message_sid, "deduped": True}
+    if claim_state is not None:
+        # Still "processing": either another worker has it, or this is the
+        # redelivery of a message whose worker died. Try again once the claim
+        # has expired; by then it is either done (skipped) or free to take.
+        logger.info("WhatsApp message %s is already in flight, retrying in %ss", message_sid, claim_ttl + 1)
+        raise self.retry(countdown=claim_ttl + 1)
+    
     try:
         from_number = message_data.get("from_number", "unknown")
         body = message_data.get("body", "")
-        message_sid = message_data.get("message_sid")
         
-        logger.info("=" * 80)
-        logger.info(f"🔄 Processing WhatsApp message from {from_number}: {body[:100]}")
-        logger.info(f"   Message SID: {message_sid}")
+        started = time.perf_counter()
+        logger.debug("🔄 Processing WhatsApp message %s from %s", message_sid, from_number)
         
         # Extract phone number (remove whatsapp: prefix)
-        phone_number = from_number.replace("whatsapp:", "") if from_number.startswith("whatsapp:") else from_number
+        phone_number = from_number.removeprefix("whatsapp:")
         
         # Process message based on content
-        logger.info(f"📝 Processing message content...")
         result = _process_message_content(body, phone_number, message_data)
-        logger.info(f"   Generated response: {result.get('response', 'No response')[:100]}")
         
         # Send response to user
-        logger.info(f"📤 Sending response to user...")
         _handle_message_response(phone_number, body, result)
+        _finish_message(message_sid, done=True)
         
-        logger.info(f"✅ WhatsApp message processed successfully: {message_sid}")
-        logger.info("=" * 80)
+        # One structured record per message instead of a banner of INFO lines
+        logger.info(
+            "whatsapp.processed sid=%s from=%s body_len=%d response_len=%d duration_ms=%.1f",
+            message_sid,
+            from_number,
+            len(body),
+            len(result.get("response") or ""),
+            (time.perf_counter() - started) * 1000,
+        )
         
         return {
             "success": True,
@@ -54,10 +296,35 @@ def process_whatsapp_message(
         }
         
     except Exception as exc:
+        # Release the claim so a redelivery (or a manual re-run) is not mistaken for a duplicate
+        _finish_message(message_sid, done=False)
         logger.error(f"WhatsApp message processing failed: {str(exc)}", exc_info=True)
-        
-        # Retry on failure
-        raise self.retry(exc=exc, countdown=60 * (self.request.retries + 1))
+        raise
+
+
+@celery_app.task(
+    bind=True,
+    ignore_result=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    autoretry_for=(TransientError,),  # Only upstream hiccups; bugs fail fast
+    retry_backoff=2,  # 2s, 4s, 8s ... capped at 240s, with full jitter (~30 min over 11 tries)
+    retry_backoff_max=240,
+    retry_jitter=True,
+    max_retries=11,
+)
+def send_whatsapp_response(self, phone_number: str, response_text: str) -> None:
+    """
+    Send an already generated reply, retrying Twilio 5xx / rate limits
+    
+    Only the send is retried: the RAG query, LLM call and conversation
+    history writes have already run once and are not repeated.
+    
+    Args:
+        phone_number: Recipient phone number
+        response_text: Reply to send
+    """
+    _send_response(phone_number, response_text)
 
 
 def _process_message_content(
@@ -78,73 +345,63 @@ def _process_message_content(
         Processing result
     """
     try:
-        # Initialize database session
-        from app.core.database import SessionLocal, init_database
-        from app.services.rag.rag_service import RAGService
-        from app.tables.users import UserRepository
-        
-        # Initialize database (required for Celery worker - runs in separate process)
-        logger.info("Initializing database connection...")
-        init_database()
-        
-        # Verify SessionLocal is initialized
-        if SessionLocal is None:
-            error_msg = "Database not initialized. Check DATABASE_URL configuration."
-            logger.error(f"❌ {error_msg}")
-            raise RuntimeError(error_msg)
-        
-        logger.info("✅ Database connection initialized in Celery worker")
-        
-        # Initialize RAG services (required for Celery worker - runs in separate process)
-        # These must be initialized before creating RAGService
-        logger.info("Initializing RAG services...")
-        from app.services.rag.singletons import initialize_rag_services
-        try:
-            initialize_rag_services()
-            logger.info("✅ RAG services initialized in Celery worker")
-        except RuntimeError as e:
-            # If services are already initialized, that's fine
-            if "not initialized" not in str(e):
-                logger.warning(f"RAG services initialization warning: {e}")
-                # Try to continue - services might work anyway
-        except Exception as rag_init_error:
-            logger.error(f"❌ Failed to initialize RAG services: {rag_init_error}", exc_info=True)
-            raise RuntimeError(f"RAG services initialization failed: {rag_init_error}") from rag_init_error
-        
-        # Create database session
-        logger.info("Creating database session...")
-        db = SessionLocal()
-        try:
-            # Verify user exists, create if not
-            user_repo = UserRepository(db)
-            user = user_repo.get_by_phone(phone_number)
-            if not user:
-                # Create user if doesn't exist
-                logger.info(f"Creating new user for phone number: {phone_number}")
-                user = user_repo.create(phone_number=phone_number)
+        _ensure_worker_ready()
+        
+        # Thread-scoped session; released by the task_postrun signal in celery_app
+        db = database.ScopedSession()
+        # User upsert and conversation writes share one transaction / one COMMIT
+        with db.begin():
+            # Verify user exists, create if not (cache hit skips the SELECT)
+            cached_user = _user_cache.get(phone_number)
+            if cached_user is None:
+                # Concurrent misses are batched into a single IN (...) query
+                cached_user = _phone_lookup_batcher.lookup(db, phone_number)
+                if cached_user is None:
+                    # Create user if doesn't exist (race-safe against parallel workers)
+                    if UserRepository(db).create_if_missing(phone_number):
+                        logger.info("Created new user for phone number: %s", phone_number)
+                    # Not cached until the transaction has committed
+                    _user_cache.pop(phone_number, None)
+                else:
+                    _user_cache[phone_number] = cached_user
+            user_name = cached_user.get("name") if cached_user else None
             
             # Get user's name if available
-            user_name = user.name if user and user.name else None
             if user_name:
-                logger.info(f"User name found: {user_name}")
+                logger.debug("User name found: %s", user_name)
             
             # Use RAG service for intelligent responses (same pipeline as /api/v1/rag/chat endpoint)
-            rag_service = RAGService(db)
-            rag_result = rag_service.query(
-                user_phone_number=phone_number,
-                query=body,
-                user_name=user_name,  # Pass user name for personalized responses
-            )
-            
-            return {
-                "action": "rag_query",
-                "response": rag_result.get("response", "I didn't understand that."),
-                "intent": "rag_query",
-                "session_id": rag_result.get("session_id"),
-                "sources": rag_result.get("sources", []),
-            }
-        finally:
-            db.close()
+            rag_service = RAGService(db, autocommit=False)
+            response_cache = _get_response_cache()
+            rag_result = response_cache.get(phone_number, body)
+            if rag_result is not None:
+                # Repeat question: skip retrieval + LLM but keep the conversation history complete
+                # The cached session_id may be up to a TTL old; always use the current one
+                manager = rag_service.conversation_manager
+                session_id = manager.get_session_id(phone_number)
+                manager.add_message(phone_number, session_id, "user", body)
+                manager.add_message(phone_number, session_id, "assistant", rag_result.get("response", ""),
+                                    metadata={"sources": rag_result.get("sources", []), "cached": True})
+                rag_result = {**rag_result, "session_id": session_id}
+            else:
+                # Reuse the embedding the cache lookup already computed
+                query_embedding = response_cache.embed(body)
+                rag_result = rag_service.query(
+                    user_phone_number=phone_number,
+                    query=body,
+                    user_name=user_name,  # Pass user name for personalized responses
+                    query_embedding=query_embedding,
+                )
+                if rag_result.get("response"):
+                    response_cache.set(phone_number, body, rag_result, query_vector=query_embedding)
+        
+        return {
+            "action": "rag_query",
+            "response": rag_result.get("response", "I didn't understand that."),
+            "intent": "rag_query",
+            "session_id": rag_result.get("session_id"),
+            "sources": rag_result.get("sources", []),
+        }
     except Exception as e:
         logger.error(f"Error processing message with RAG: {str(e)}", exc_info=True)
         # Fallback to simple response
@@ -163,27 +420,40 @@ def _handle_message_response(
     """
     Handle sending response to WhatsApp message
     
+    A transient Twilio failure hands the reply text to send_whatsapp_response,
+    which retries just the send.
+    
     Args:
         phone_number: Recipient phone number
         original_message: Original message received
         result: Processing result with response text
     """
+    response_text = result.get("response")
+    if not response_text:
+        logger.warning(f"No response text generated for message: {original_message}")
+        return
+    
+    try:
+        _send_response(phone_number, response_text)
+    except TransientError as e:
+        logger.warning(f"Sending WhatsApp response hit a transient error, retrying the send: {e.message}")
+        send_whatsapp_response.apply_async((phone_number, response_text), countdown=2)
+
+
+def _send_response(phone_number: str, response_text: str) -> None:
+    """
+    Send a reply through Twilio
+    
+    Raises:
+        TransientError: Twilio 5xx / rate limit before anything was sent
+    """
     try:
-        from app.services.integrations.twilio_service import TwilioIntegrationService
-        
-        twilio_service = TwilioIntegrationService()
-        
-        response_text = result.get("response")
-        if not response_text:
-            logger.warning(f"No response text generated for message: {original_message}")
-            return
+        twilio_service = _get_twilio_service()
         
         # Format phone number for WhatsApp
-        whatsapp_number = phone_number
-        if not whatsapp_number.startswith("whatsapp:"):
-            whatsapp_number = f"whatsapp:{whatsapp_number}"
+        whatsapp_number = f"whatsapp:{phone_number.removeprefix('whatsapp:')}"
         
-        logger.info(f"📤 Sending WhatsApp response to {whatsapp_number}: {response_text[:100]}")
+        logger.debug("📤 Sending WhatsApp response to %s: %.100s", whatsapp_number, response_text)
         
         # Send response using integration service
         send_result = twilio_service.send_message(
@@ -191,8 +461,11 @@ def _handle_message_response(
             message=response_text,
         )
         
-        logger.info(f"✅ Response sent successfully to {whatsapp_number}: {send_result.get('message_sid')}")
+        logger.debug("✅ Response sent successfully to %s: %s", whatsapp_number, send_result.get("message_sid"))
         
+    except TransientError:
+        # Nothing was sent - the caller retries the send
+        raise
     except ValueError as e:
         # Configuration errors (missing credentials, etc.)
         logger.error(f"❌ Configuration error sending WhatsApp response: {str(e)}")
@@ -201,4 +474,3 @@ def _handle_message_response(
     except Exception as e:
         logger.error(f"❌ Failed to send WhatsApp response: {str(e)}", exc_info=True)
         # Don't raise - we don't want to fail the task if response sending fails
-
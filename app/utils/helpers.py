@@ -1,20 +1,36 @@
 """
 Helper utility functions
 """
+import os
+import sys
+import base64
 import hashlib
-import secrets
-from typing import Any, Dict
+from typing import Any, Dict, Union
 from datetime import datetime
 
 
+_b64encode = base64.urlsafe_b64encode
+
+
 def generate_id() -> str:
-    """Generate a unique ID"""
-    return secrets.token_urlsafe(16)
+    """Generate a unique ID (128 random bits, same format as secrets.token_urlsafe(16))"""
+    return _b64encode(os.urandom(16))[:22].decode("ascii")
+
+
+def hash_bytes(data: Union[bytes, bytearray, memoryview]) -> str:
+    """Hash bytes using SHA256 (accepts memoryview/bytearray without copying)"""
+    return hashlib.sha256(data).hexdigest()
 
 
 def hash_string(value: str) -> str:
     """Hash a string using SHA256"""
-    return hashlib.sha256(value.encode()).hexdigest()
+    return hash_bytes(value.encode("utf-8"))
+
+
+def is_gevent_patched() -> bool:
+    """True when gevent has monkey-patched threading (e.g. a Celery -P gevent worker)"""
+    monkey = sys.modules.get("gevent.monkey")
+    return monkey is not None and monkey.is_module_patched("threading")
 
 
 def format_datetime(dt: datetime) -> str:
@@ -24,13 +40,10 @@ def format_datetime(dt: datetime) -> str:
 
 def safe_get(data: Dict[str, Any], *keys, default: Any = None) -> Any:
     """Safely get nested dictionary value"""
-    result = data
     for key in keys:
-        if isinstance(result, dict):
-            result = result.get(key)
-        else:
+        if not isinstance(data, dict):
             return default
-        if result is None:
+        data = data.get(key)
+        if data is None:
             return default
-    return result if result is not None else default
-
+    return data if data is not None else default
@@ -0,0 +1,35 @@
+"""
+Fast JSON helpers backed by orjson (falls back to the standard library)
+"""
+import json as _stdlib_json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize an object to a JSON string
+    
+    datetime, date and UUID values are serialized natively (ISO 8601 / canonical form).
+    
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with 2-space indentation
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option).decode()
+    return _stdlib_json.dumps(obj, indent=2 if indent else None, ensure_ascii=False, default=str)
+
+
+def loads(value: str | bytes) -> Any:
+    """Deserialize a JSON string or bytes"""
+    if orjson is not None:
+        return orjson.loads(value)
+    return _stdlib_json.loads(value)
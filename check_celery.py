@@ -12,20 +12,31 @@ print("=" * 60)
 print("🔍 Celery Diagnostic Check")
 print("=" * 60)
 
-# Check Redis connection
+# Check Redis connection and queue depths (one pipelined round trip)
 print("\n1. Checking Redis connection...")
+queue_names = [queue.name for queue in celery_app.conf.task_queues]
 try:
-    from redis import Redis
-    redis_client = Redis.from_url(settings.REDIS_URL)
-    redis_client.ping()
+    from redis import ConnectionPool, Redis
+    pool = ConnectionPool.from_url(settings.CELERY_BROKER_URL, max_connections=4)
+    redis_client = Redis(connection_pool=pool)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.ping()
+    for name in queue_names:
+        pipe.llen(name)
+    _, *queue_depths = pipe.execute()
     print("   ✅ Redis is accessible")
+    if settings.REDIS_URL != settings.CELERY_BROKER_URL:
+        Redis.from_url(settings.REDIS_URL).ping()
+        print("   ✅ Cache Redis (REDIS_URL) is accessible")
 except Exception as e:
     print(f"   ❌ Redis connection failed: {e}")
-    print("   Please ensure Redis is running and REDIS_URL is correct")
+    print("   Please ensure Redis is running and REDIS_URL / CELERY_BROKER_URL are correct")
     sys.exit(1)
 
 # Check Celery broker
 print("\n2. Checking Celery broker...")
+for name, depth in zip(queue_names, queue_depths):
+    print(f"   📬 Queue '{name}': {depth} pending")
 try:
     inspect = celery_app.control.inspect()
     active_workers = inspect.active()
@@ -34,7 +45,7 @@ try:
     else:
         print("   ⚠️  No active Celery workers found")
         print("   Please start Celery worker with:")
-        print("   celery -A app.celery_app worker --loglevel=info")
+        print("   celery -A app.celery_app worker --loglevel=info -Q " + ",".join(queue_names))
 except Exception as e:
     print(f"   ⚠️  Could not check workers: {e}")
 
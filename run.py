@@ -23,6 +23,30 @@ PROJECT_ROOT = Path(__file__).parent.absolute()
 sys.path.insert(0, str(PROJECT_ROOT))
 
 
+def get_available_cpus() -> int:
+    """
+    Number of CPUs this process may actually use.
+    
+    multiprocessing.cpu_count() reports the host's cores even inside a
+    container limited with --cpus / a Kubernetes CPU limit. Use the CPU
+    affinity mask, capped by the cgroup v2 quota when one is set.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS/Windows
+        cpus = multiprocessing.cpu_count()
+    
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    
+    return cpus
+
+
 def get_worker_count() -> int:
     """
     Calculate optimal number of workers based on CPU cores.
@@ -44,8 +68,8 @@ def get_worker_count() -> int:
         except (ValueError, TypeError):
             pass
     
-    # Auto-detect CPU cores
-    cpu_count = multiprocessing.cpu_count()
+    # Auto-detect CPU cores (container-aware)
+    cpu_count = get_available_cpus()
     
     # For I/O-bound apps, use 75% of cores (reserve some for other services)
     # Minimum 2 workers, maximum 8 workers for stability
@@ -54,29 +78,15 @@ def get_worker_count() -> int:
     return workers
 
 
-def start_celery_worker() -> subprocess.Popen | None:
+def _spawn_celery_worker(name: str, pool: str, concurrency: str, queues: str,
+                         env: dict[str, str]) -> subprocess.Popen | None:
     """
-    Start Celery worker process
+    Start one Celery worker subprocess
     
     Returns:
-        Celery worker process or None if not started
+        Celery worker process or None if it failed to start
     """
-    settings = get_settings()
-    # Check both environment variable and settings (settings loads from .env automatically)
-    start_celery_env = os.getenv("START_CELERY")
-    if start_celery_env is not None:
-        start_celery = start_celery_env.lower() == "true"
-    else:
-        start_celery = settings.START_CELERY
-    
-    if not start_celery:
-        return None
-    
     try:
-        print("🔄 Starting Celery worker...")
-        # Get concurrency from settings or environment variable
-        celery_concurrency = os.getenv("CELERY_CONCURRENCY", str(settings.CELERY_WORKER_CONCURRENCY))
-        
         # Use unbuffered output so logs appear immediately
         process = subprocess.Popen(
             [
@@ -88,21 +98,90 @@ def start_celery_worker() -> subprocess.Popen | None:
                 "app.celery_app",
                 "worker",
                 "--loglevel=info",
-                f"--concurrency={celery_concurrency}",
+                "-n",
+                f"{name}@%h",  # Distinct node names so both workers can run on one host
+                "-P",
+                pool,
+                "-Q",
+                queues,
+                "--prefetch-multiplier=1",
+                "-O",
+                "fair",  # Hand tasks only to idle processes (no head-of-line blocking)
+                f"--concurrency={concurrency}",
                 "--without-gossip",
                 "--without-mingle",
                 "--without-heartbeat",
             ],
             stdout=None,  # Don't capture - let it go to console
             stderr=None,  # Don't capture - let it go to console
+            env=env,
         )
-        print(f"   ✅ Celery worker started (PID: {process.pid})")
+        print(f"   ✅ Celery {name} worker started (PID: {process.pid}, pool: {pool}, concurrency: {concurrency})")
         return process
     except Exception as e:
-        print(f"   ⚠️  Failed to start Celery worker: {e}")
+        print(f"   ⚠️  Failed to start Celery {name} worker: {e}")
         return None
 
 
+def start_celery_workers() -> dict[str, subprocess.Popen | None]:
+    """
+    Start the Celery worker processes
+    
+    WhatsApp messages get their own worker (gevent by default): the pipeline
+    mostly waits on the DB, the LLM and Twilio. The celery/webhooks/onboarding
+    queues carry CPU-bound PDF/OCR/embedding work, which would block a gevent
+    hub for every in-flight message, so they stay on a prefork worker.
+    
+    Returns:
+        Worker processes by name (empty if Celery is disabled)
+    """
+    settings = get_settings()
+    # Check both environment variable and settings (settings loads from .env automatically)
+    start_celery_env = os.getenv("START_CELERY")
+    if start_celery_env is not None:
+        start_celery = start_celery_env.lower() == "true"
+    else:
+        start_celery = settings.START_CELERY
+    
+    if not start_celery:
+        return {}
+    
+    print("🔄 Starting Celery workers...")
+    workers: dict[str, subprocess.Popen | None] = {}
+    
+    # General worker: pool and concurrency from settings or environment variables
+    celery_pool = os.getenv("CELERY_POOL", settings.CELERY_WORKER_POOL)
+    celery_concurrency = os.getenv("CELERY_CONCURRENCY", str(settings.CELERY_WORKER_CONCURRENCY))
+    workers["celery"] = _spawn_celery_worker(
+        "default", celery_pool, celery_concurrency, "celery,webhooks,onboarding", os.environ.copy()
+    )
+    
+    # WhatsApp worker
+    whatsapp_pool = os.getenv("CELERY_WHATSAPP_POOL", settings.CELERY_WHATSAPP_POOL)
+    if whatsapp_pool == "gevent":
+        whatsapp_concurrency = int(os.getenv("CELERY_WHATSAPP_CONCURRENCY", settings.CELERY_GEVENT_CONCURRENCY))
+    else:
+        whatsapp_concurrency = int(os.getenv("CELERY_WHATSAPP_CONCURRENCY", settings.CELERY_WORKER_CONCURRENCY))
+    
+    whatsapp_env = os.environ.copy()
+    if whatsapp_pool == "gevent":
+        # Every greenlet holds a DB session across the RAG + LLM call, so the
+        # pool must offer at least one connection per greenlet or checkouts time out
+        pool_size = int(whatsapp_env.get("DB_POOL_SIZE", whatsapp_concurrency))
+        max_overflow = int(whatsapp_env.get("DB_MAX_OVERFLOW", settings.DB_MAX_OVERFLOW))
+        if pool_size + max_overflow < whatsapp_concurrency:
+            max_overflow = whatsapp_concurrency - pool_size
+            print(f"   ⚠️  Raising DB_MAX_OVERFLOW to {max_overflow} for the whatsapp worker "
+                  f"(DB_POOL_SIZE + DB_MAX_OVERFLOW must cover {whatsapp_concurrency} greenlets)")
+        whatsapp_env["DB_POOL_SIZE"] = str(pool_size)
+        whatsapp_env["DB_MAX_OVERFLOW"] = str(max_overflow)
+    
+    workers["celery-whatsapp"] = _spawn_celery_worker(
+        "whatsapp", whatsapp_pool, str(whatsapp_concurrency), "whatsapp", whatsapp_env
+    )
+    return workers
+
+
 def cleanup_processes(processes: dict[str, subprocess.Popen | None]) -> None:
     """Gracefully terminate all subprocesses."""
     print("\n🛑 Shutting down processes...")
@@ -133,7 +212,7 @@ def signal_handler(signum, frame, processes: dict[str, subprocess.Popen | None])
 if __name__ == "__main__":
     settings = get_settings()
     workers = get_worker_count()
-    cpu_count = multiprocessing.cpu_count()
+    cpu_count = get_available_cpus()
     
     # Check if Celery should be started (prefer .env/settings, fallback to env var)
     start_celery_env = os.getenv("START_CELERY")
@@ -161,13 +240,12 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, lambda s, f: signal_handler(s, f, processes))
     signal.signal(signal.SIGTERM, lambda s, f: signal_handler(s, f, processes))
     
-    # Start Celery worker if enabled
+    # Start Celery workers if enabled
     if start_celery:
-        celery_process = start_celery_worker()
-        processes["celery"] = celery_process
+        processes.update(start_celery_workers())
         
         # Give Celery a moment to start
-        if celery_process:
+        if any(processes.values()):
             time.sleep(2)
     
     try:
@@ -1,13 +1,12 @@
-import pickle
 from pathlib import Path
 
 # IMPORTANT: import class definitions used during pickling
-from layout_aware_pdf_parser import ParsedDoc, Chunk
+from layout_aware_pdf_parser import ParsedDoc, Chunk, load_parsed_doc
 
 PKL_PATH = Path("./parsed_output/Attendance.pkl")
 
-with open(PKL_PATH, "rb") as f:
-    doc = pickle.load(f)
+# Handles zstd/gzip-compressed files as well as older plain pickles
+doc = load_parsed_doc(str(PKL_PATH))
 
 print("\n" + "=" * 100)
 print("DOCUMENT METADATA")
@@ -1,14 +1,33 @@
 import os
+import gzip
+import queue
 import pickle
 import logging
-from typing import List, Dict, Tuple
+import threading
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import attrgetter
+from sys import intern
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+import numpy as np
 import torch
 
 import deepdoctection as dd
-from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 
-import torch
-# torch.device("cpu")
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # table HTML is parsed with lxml instead
+    LexborHTMLParser = None
+
+try:
+    import zstandard as zstd
+except ImportError:  # gzip fallback keeps the script usable without the extra package
+    zstd = None
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_MAGIC = b"\x1f\x8b"
 
 # ---------------------------
 # Logging Configuration
@@ -23,13 +42,34 @@ logger = logging.getLogger(__name__)
 # ---------------------------
 # Analyzer Initialization
 # ---------------------------
-def init_analyzer(doc_lang: str = "en"):
+def get_device() -> str:
+    """
+    Inference device for the layout models: CUDA when available, else CPU.
+    """
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def init_analyzer(doc_lang: str = "en", device: str = None):
     """
-    Initialize DeepDocDetection analyzer.
+    Initialize DeepDocDetection analyzer on the given (or best available) device.
     """
-    logger.info("Initializing DeepDocDetection analyzer")
-    analyzer = dd.get_dd_analyzer()
-    return analyzer
+    device = device or get_device()
+    logger.info(f"Initializing DeepDocDetection analyzer on {device}")
+    try:
+        return dd.get_dd_analyzer(config_overwrite=[f"DEVICE={device}"])
+    except Exception as e:
+        # Older configs without a DEVICE key: deepdoctection picks the device itself
+        logger.warning(f"Could not set analyzer device to {device} ({e}); using default device selection")
+        return dd.get_dd_analyzer()
+
+
+def inference_context(device: str):
+    """
+    FP16 autocast on CUDA (layout detection is conv/attention heavy); no-op on CPU.
+    """
+    if device == "cuda":
+        return torch.autocast(device_type="cuda", dtype=torch.float16)
+    return nullcontext()
 
 
 # ---------------------------
@@ -44,18 +84,35 @@ def load_doc(path: str, analyzer):
     df.reset_state()
     return iter(df)
 
+@lru_cache(maxsize=4096)
 def table_html_to_semantic_text(table_html: str) -> str:
     """
     Convert HTML table to embedding-friendly semantic text.
+
+    Memoized: repeated header/footer tables across pages are parsed once.
     """
-    soup = BeautifulSoup(table_html, "html.parser")
-    rows = soup.find_all("tr")
+    if not table_html or not table_html.strip():
+        return ""
+
+    # No rows, no cells: skip building a tree at all
+    if "<tr" not in table_html and "<TR" not in table_html:
+        return ""
 
     lines = []
-    for row in rows:
-        cells = [cell.get_text(strip=True) for cell in row.find_all(["td", "th"])]
-        if cells:
-            lines.append(" | ".join(cells))
+    if LexborHTMLParser is not None:
+        # selectolax (lexbor, C): no Python object per tag while parsing
+        for row in LexborHTMLParser(table_html).css("tr"):
+            # strip=True strips each text node before joining, like the lxml path below
+            cells = [cell.text(deep=True, separator="", strip=True) for cell in row.css("td, th")]
+            if cells:
+                lines.append(" | ".join(cells))
+    else:
+        root = lxml_html.fromstring(table_html)
+        for row in root.iter("tr"):
+            # Same text as BeautifulSoup's get_text(strip=True): strip each text node, then join
+            cells = ["".join(t.strip() for t in cell.itertext()) for cell in row.iter("td", "th")]
+            if cells:
+                lines.append(" | ".join(cells))
 
     if not lines:
         return ""
@@ -65,86 +122,334 @@ def table_html_to_semantic_text(table_html: str) -> str:
 # ---------------------------
 # Page & Block Parsing
 # ---------------------------
-def get_block_data(block) -> Dict:
+def _index_y(bbox):
+    if isinstance(bbox, (list, tuple)) and len(bbox) >= 2:
+        return bbox[1]  # Usually (x, y, width, height) or similar
+    return None
+
+
+# Ways a layout item / table exposes its top Y coordinate, in order of preference
+_BBOX_Y_CANDIDATES = (
+    attrgetter("bbox.uly"),
+    attrgetter("bbox.upper_left.y"),
+    lambda o: _index_y(o.bbox),
+    attrgetter("block.bbox.uly"),
+    lambda o: _index_y(o.block.bbox),
+    attrgetter("location.uly"),
+    attrgetter("location.y"),
+)
+
+# type -> candidate that worked last time, or _NO_BBOX when none did;
+# deepdoctection returns homogeneous objects
+_NO_BBOX = object()
+_bbox_y_getters: Dict[type, Callable] = {}
+
+
+def _try_get(getter: Callable, obj):
+    try:
+        return getter(obj)
+    except (AttributeError, IndexError, TypeError):
+        return None
+
+
+def get_bbox_y(obj):
+    """
+    Top Y coordinate of a layout item or table, or None.
+
+    The accessor that worked is cached per type, so only the first object of
+    a kind (or one missing that attribute) is probed against every candidate.
+    Types for which no candidate works are remembered too and short-circuit
+    to None, which is the usual case for deepdoctection versions that don't
+    expose boxes.
+    """
+    cls = type(obj)
+    getter = _bbox_y_getters.get(cls)
+    if getter is _NO_BBOX:
+        return None
+    if getter is not None:
+        bbox_y = _try_get(getter, obj)
+        if bbox_y is not None:
+            return bbox_y
+
+    for candidate in _BBOX_Y_CANDIDATES:
+        bbox_y = _try_get(candidate, obj)
+        if bbox_y is not None:
+            _bbox_y_getters[cls] = candidate
+            return bbox_y
+    if getter is None:
+        _bbox_y_getters[cls] = _NO_BBOX
+    return None
+
+
+def _reading_order_int(reading_order) -> int:
+    """Reading order as an int for sorting; 999999 when missing or non-numeric (e.g. "table")"""
+    if isinstance(reading_order, int):
+        return reading_order
+    if isinstance(reading_order, str):
+        # Checked up front: "table" / "" are common and int() would raise for them
+        value = reading_order.strip()
+        digits = value[1:] if value[:1] in ("+", "-") else value
+        if digits.isdecimal():
+            return int(value)
+        return 999999
+    if reading_order is None:
+        return 999999
+    try:
+        return int(reading_order)
+    except (ValueError, TypeError, OverflowError):
+        return 999999
+
+
+def get_block_data(block) -> Tuple[Dict, Optional[float]]:
     """
     Extract relevant metadata from a block.
+
+    Returns (block_data, bbox_y); the Y coordinate is only needed for
+    ordering the page, so it is kept out of the block dict.
     """
     reading_order = block[4]
     # Convert reading_order to int if possible, otherwise use a large number for sorting
-    try:
-        reading_order_int = int(reading_order) if reading_order not in (None, "table", "") else 999999
-    except (ValueError, TypeError):
-        reading_order_int = 999999
+    reading_order_int = _reading_order_int(reading_order)
     
-    # Try to extract bbox (bounding box) Y coordinate for vertical positioning
-    bbox_y = None
-    try:
-        # Block format: (doc_id, image_id, page_num, annotation_id, reading_order, ..., layout_item)
-        # Try multiple ways to access bbox
-        if len(block) > 5:
-            layout_item = block[-2]  # Second to last is the layout item
-            
-            # Try direct bbox attribute
-            if hasattr(layout_item, 'bbox'):
-                bbox = layout_item.bbox
-                if bbox:
-                    if hasattr(bbox, 'uly'):
-                        bbox_y = bbox.uly
-                    elif hasattr(bbox, 'upper_left'):
-                        bbox_y = bbox.upper_left.y
-                    elif isinstance(bbox, (list, tuple)) and len(bbox) >= 2:
-                        bbox_y = bbox[1]  # Usually (x, y, width, height) or similar
-            
-            # Try nested bbox
-            if bbox_y is None and hasattr(layout_item, 'block'):
-                block_obj = layout_item.block
-                if hasattr(block_obj, 'bbox'):
-                    bbox = block_obj.bbox
-                    if hasattr(bbox, 'uly'):
-                        bbox_y = bbox.uly
-                    elif isinstance(bbox, (list, tuple)) and len(bbox) >= 2:
-                        bbox_y = bbox[1]
-            
-            # Try location attribute
-            if bbox_y is None and hasattr(layout_item, 'location'):
-                loc = layout_item.location
-                if hasattr(loc, 'uly'):
-                    bbox_y = loc.uly
-                elif hasattr(loc, 'y'):
-                    bbox_y = loc.y
-    except (AttributeError, IndexError, TypeError) as e:
-        logger.debug(f"Could not extract bbox_y: {e}")
+    # Bounding box Y coordinate for vertical positioning
+    # Block format: (doc_id, image_id, page_num, annotation_id, reading_order, ..., layout_item)
+    bbox_y = get_bbox_y(block[-2]) if len(block) > 5 else None
     
+    # Fields that repeat across blocks are interned: one string object per distinct value
     block_data = {
-        "document_id": str(block[0]),
-        "image_id": str(block[1]),
-        "page_number": str(block[2]),
+        "document_id": intern(str(block[0])),
+        "image_id": intern(str(block[1])),
+        "page_number": intern(str(block[2])),
         "annotation_id": str(block[3]),
         "reading_order": str(reading_order),
         "reading_order_int": reading_order_int,  # For sorting
-        "bbox_y": bbox_y,  # Y coordinate for vertical positioning
-        "category_name": block[-2].name,
+        "category_name": intern(str(block[-2].name)),
         "text": str(block[-1])
     }
-    return block_data
+    return block_data, bbox_y
 
 
-def get_page_data(page) -> List[Dict]:
+def get_page_data(page) -> Tuple[List[Dict], List[Optional[float]]]:
     """
-    Extract all parsed blocks from a page.
+    Extract all parsed blocks from a page, with their bbox Y coordinates as a parallel list.
     """
     all_blocks = []
+    all_ys = []
     try:
         for block in page.chunks:
-            all_blocks.append(get_block_data(block))
+            block_data, bbox_y = get_block_data(block)
+            all_blocks.append(block_data)
+            all_ys.append(bbox_y)
     except Exception as e:
         logger.exception(f"Error parsing page {page.page_number}: {e}")
-    return all_blocks
+    return all_blocks, all_ys
 
 
 # ---------------------------
 # Document Traversal
 # ---------------------------
+# Below this many blocks a plain list.sort beats building NumPy key arrays
+_NUMPY_SORT_MIN_BLOCKS = 16
+
+
+def sort_page_blocks(
+    blocks: List[Dict], ys: List[Optional[float]], by_bbox: bool
+) -> Tuple[List[Dict], List[Optional[float]]]:
+    """
+    Stable sort of page blocks by (bbox_y, reading_order_int), or by reading_order_int alone.
+
+    ys holds each block's bbox Y (or None) and is reordered along with the
+    blocks. Missing keys sort last (999999). Large pages use np.lexsort /
+    np.argsort on the extracted keys instead of sorting in Python.
+    """
+    if len(blocks) < _NUMPY_SORT_MIN_BLOCKS:
+        if by_bbox:
+            order = sorted(range(len(blocks)), key=lambda i: (
+                999999 if ys[i] is None else ys[i],
+                blocks[i].get("reading_order_int", 999999)
+            ))
+        else:
+            order = sorted(range(len(blocks)), key=lambda i: blocks[i].get("reading_order_int", 999999))
+    else:
+        reading_orders = np.fromiter(
+            (b.get("reading_order_int", 999999) for b in blocks), dtype=np.int64, count=len(blocks)
+        )
+        if by_bbox:
+            y_keys = np.fromiter(
+                (999999 if y is None else y for y in ys), dtype=np.float64, count=len(ys)
+            )
+            # lexsort sorts by the last key first and is stable
+            order = np.lexsort((reading_orders, y_keys))
+        else:
+            order = np.argsort(reading_orders, kind="stable")
+    return [blocks[i] for i in order], [ys[i] for i in order]
+
+
+def reposition_tables(blocks: List[Dict], ys: List[Optional[float]], table_ids: set) -> List[Dict]:
+    """
+    Move each table with a known bbox_y right after the last block above it.
+
+    table_ids holds id() of the table blocks. If no block is above a table
+    it goes before the first block with a known position (or at the end when
+    there is none). Tables without bbox_y stay where they are.
+    """
+    movable = [id(b) in table_ids and y is not None for b, y in zip(blocks, ys)]
+    if not any(movable):
+        return blocks
+
+    base = [b for b, m in zip(blocks, movable) if not m]
+    tables = [b for b, m in zip(blocks, movable) if m]
+
+    base_y = np.fromiter(
+        (np.inf if y is None else y for y, m in zip(ys, movable) if not m),
+        dtype=np.float64,
+        count=len(base),
+    )
+    # Suffix minimum is non-decreasing, so "number of positions with some
+    # block above the table from there on" is a binary search
+    suffix_min = np.minimum.accumulate(base_y[::-1])[::-1]
+    table_y = np.fromiter((y for y, m in zip(ys, movable) if m), dtype=np.float64, count=len(tables))
+    targets = np.searchsorted(suffix_min, table_y, side="left")
+
+    known = np.flatnonzero(np.isfinite(base_y))
+    first_known = int(known[0]) if known.size else len(base)
+    targets[targets == 0] = first_known
+
+    # Single merge pass; tables sharing a slot keep top-to-bottom order
+    order = np.lexsort((table_y, targets))
+    merged = []
+    prev = 0
+    for i in order:
+        target = int(targets[i])
+        merged.extend(base[prev:target])
+        merged.append(tables[i])
+        prev = target
+    merged.extend(base[prev:])
+    return merged
+
+
+def get_page_blocks(page) -> List[Dict]:
+    """
+    Parse one page into ordered blocks, with tables injected as semantic text blocks.
+    """
+    page_chunks, page_ys = get_page_data(page)
+    
+    # Create table blocks and extract their bounding boxes
+    table_blocks = []
+    table_ys = []
+    if page.tables:
+        for idx, table in enumerate(page.tables):
+            table_text = table_html_to_semantic_text(table.html)
+            if table_text.strip():
+                table_block = {
+                    "document_id": page_chunks[0]["document_id"] if page_chunks else "",
+                    "image_id": "",
+                    "page_number": intern(str(page.page_number)),
+                    "annotation_id": f"table_{idx}",
+                    "reading_order": "",  # Will be assigned after sorting
+                    "reading_order_int": 0,  # Will be assigned after sorting
+                    "category_name": "table",
+                    "text": table_text
+                }
+                table_blocks.append(table_block)
+                # Table bounding box for positioning
+                table_ys.append(get_bbox_y(table))
+    
+    # Merge all blocks (text blocks + tables); ys stays index-aligned with the blocks
+    all_page_blocks = page_chunks + table_blocks
+    all_ys = page_ys + table_ys
+    
+    # Check if we have bbox_y for most blocks (to decide sorting strategy)
+    blocks_with_bbox = sum(1 for y in all_ys if y is not None)
+    total_blocks = len(all_page_blocks)
+    use_bbox_sorting = blocks_with_bbox >= max(2, total_blocks // 2)  # Use bbox if at least half have it
+    
+    if use_bbox_sorting:
+        # Sort ALL blocks by bbox_y (vertical position) - smaller Y = higher on page = earlier
+        # Items with no bbox_y go to the end, but try to preserve their relative order
+        # Secondary sort by original reading_order
+        all_page_blocks, _ = sort_page_blocks(all_page_blocks, all_ys, by_bbox=True)
+        
+        # Now assign sequential reading_order based on sorted position
+        for idx, block in enumerate(all_page_blocks):
+            block["reading_order_int"] = idx
+            block["reading_order"] = str(idx)
+    else:
+        # Fallback: preserve original reading_order and insert tables intelligently
+        # Sort by original reading_order_int first
+        all_page_blocks, all_ys = sort_page_blocks(all_page_blocks, all_ys, by_bbox=False)
+        
+        # If we have some bbox_y data, try to reposition tables
+        all_page_blocks = reposition_tables(all_page_blocks, all_ys, {id(t) for t in table_blocks})
+
+    return all_page_blocks
+
+
+# Analyzed pages buffered ahead of post-processing
+_PAGE_PREFETCH = 2
+_END_OF_DOC = object()
+
+
+def prefetch_pages(doc, device: str, maxsize: int = _PAGE_PREFETCH):
+    """
+    Iterate doc in a background thread so model inference on the next pages
+    overlaps with post-processing (block extraction, table HTML, sorting) of
+    the current one. Pages come out in order; errors (including CUDA OOM)
+    are re-raised in the consuming thread.
+    """
+    pages = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            # Autocast state is thread-local, so it is entered in the thread running inference
+            with inference_context(device):
+                for page in doc:
+                    if not put(page):
+                        return
+            put(_END_OF_DOC)
+        except BaseException as e:
+            put(e)
+
+    producer = threading.Thread(target=produce, name="page-analysis", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = pages.get()
+            if item is _END_OF_DOC:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def iter_page_blocks(doc, device: str = None):
+    """
+    Yield each page's ordered blocks (tables injected) as the page is analyzed.
+
+    With a device, analysis runs one or two pages ahead in a background thread.
+    """
+    try:
+        for page in (prefetch_pages(doc, device) if device else doc):
+            yield get_page_blocks(page)
+
+    except torch.cuda.OutOfMemoryError:
+        raise  # callers fall back to CPU
+    except Exception as e:
+        logger.exception(f"Document traversal failed: {e}")
+
+
 def fetch_data_from_doc(doc):
     """
     Fetch parsed text blocks and inject tables as semantic text blocks.
@@ -153,135 +458,182 @@ def fetch_data_from_doc(doc):
     continuous_chunks = []
     page_wise_chunks = []
 
-    try:
-        for page in doc:
-            page_chunks = get_page_data(page)
-            
-            # Get the last reading_order value from existing blocks to position tables
-            max_reading_order = 0
-            if page_chunks:
-                max_reading_order = max(
-                    (chunk.get("reading_order_int", 0) for chunk in page_chunks),
-                    default=0
-                )
-
-            # Create table blocks and extract their bounding boxes
-            table_blocks = []
-            if page.tables:
-                for idx, table in enumerate(page.tables):
-                    table_text = table_html_to_semantic_text(table.html)
-                    if table_text.strip():
-                        # Try to get table bounding box for positioning
-                        table_bbox_y = None
-                        try:
-                            # Try multiple ways to get table bbox
-                            if hasattr(table, 'bbox') and table.bbox:
-                                bbox = table.bbox
-                                if hasattr(bbox, 'uly'):
-                                    table_bbox_y = bbox.uly
-                                elif hasattr(bbox, 'upper_left'):
-                                    table_bbox_y = bbox.upper_left.y
-                                elif isinstance(bbox, (list, tuple)) and len(bbox) >= 2:
-                                    table_bbox_y = bbox[1]
-                            
-                            if table_bbox_y is None and hasattr(table, 'location'):
-                                loc = table.location
-                                if hasattr(loc, 'uly'):
-                                    table_bbox_y = loc.uly
-                                elif hasattr(loc, 'y'):
-                                    table_bbox_y = loc.y
-                            
-                            # Try accessing through table attributes
-                            if table_bbox_y is None and hasattr(table, 'block'):
-                                block = table.block
-                                if hasattr(block, 'bbox'):
-                                    bbox = block.bbox
-                                    if hasattr(bbox, 'uly'):
-                                        table_bbox_y = bbox.uly
-                        except (AttributeError, TypeError) as e:
-                            logger.debug(f"Could not extract table bbox_y: {e}")
-                        
-                        table_block = {
-                            "document_id": page_chunks[0]["document_id"] if page_chunks else "",
-                            "image_id": "",
-                            "page_number": str(page.page_number),
-                            "annotation_id": f"table_{idx}",
-                            "reading_order": "",  # Will be assigned after sorting
-                            "reading_order_int": 0,  # Will be assigned after sorting
-                            "bbox_y": table_bbox_y,  # Y coordinate for sorting
-                            "category_name": "table",
-                            "text": table_text
-                        }
-                        table_blocks.append(table_block)
-            
-            # Merge all blocks (text blocks + tables)
-            all_page_blocks = page_chunks + table_blocks
-            
-            # Check if we have bbox_y for most blocks (to decide sorting strategy)
-            blocks_with_bbox = sum(1 for b in all_page_blocks if b.get("bbox_y") is not None)
-            total_blocks = len(all_page_blocks)
-            use_bbox_sorting = blocks_with_bbox >= max(2, total_blocks // 2)  # Use bbox if at least half have it
-            
-            if use_bbox_sorting:
-                # Sort ALL blocks by bbox_y (vertical position) - smaller Y = higher on page = earlier
-                # Items with no bbox_y go to the end, but try to preserve their relative order
-                all_page_blocks.sort(key=lambda x: (
-                    x.get("bbox_y") if x.get("bbox_y") is not None else 999999,
-                    x.get("reading_order_int", 999999)  # Secondary sort by original reading_order
-                ))
-                
-                # Now assign sequential reading_order based on sorted position
-                for idx, block in enumerate(all_page_blocks):
-                    block["reading_order_int"] = idx
-                    block["reading_order"] = str(idx)
-            else:
-                # Fallback: preserve original reading_order and insert tables intelligently
-                # Sort by original reading_order_int first
-                all_page_blocks.sort(key=lambda x: x.get("reading_order_int", 999999))
-                
-                # If we have some bbox_y data, try to reposition tables
-                for table_block in table_blocks:
-                    table_bbox_y = table_block.get("bbox_y")
-                    if table_bbox_y is not None:
-                        # Find insertion point based on Y-coordinate
-                        insertion_idx = len(all_page_blocks)  # Default: end
-                        for i, block in enumerate(all_page_blocks):
-                            block_bbox_y = block.get("bbox_y")
-                            block_ro_int = block.get("reading_order_int", 999999)
-                            if block_bbox_y is not None and block_bbox_y < table_bbox_y:
-                                # This block is above the table, table should come after
-                                insertion_idx = max(insertion_idx, i + 1)
-                        
-                        # Remove table from end and insert at correct position
-                        if table_block in all_page_blocks:
-                            all_page_blocks.remove(table_block)
-                            all_page_blocks.insert(min(insertion_idx, len(all_page_blocks)), table_block)
-            
-            # Clean up temporary bbox_y field before returning
-            for block in all_page_blocks:
-                block.pop("bbox_y", None)
-
-            continuous_chunks.extend(all_page_blocks)
-            page_wise_chunks.append(all_page_blocks)
+    for all_page_blocks in iter_page_blocks(doc):
+        continuous_chunks.extend(all_page_blocks)
+        page_wise_chunks.append(all_page_blocks)
 
-    except Exception as e:
-        logger.exception(f"fetch_data_from_doc failed: {e}")
+    return continuous_chunks, page_wise_chunks
+
+
+# ---------------------------
+# Parallel Page Analysis
+# ---------------------------
+_worker_analyzer = None
+
+
+def _init_page_worker():
+    """
+    ProcessPoolExecutor initializer: each worker loads its own analyzer (models can't be pickled).
+    """
+    global _worker_analyzer
+    _worker_analyzer = init_analyzer()
+
+
+def _analyze_page_file(page_path: str) -> List[Dict]:
+    """
+    Analyze a single-page PDF in a worker process and return its blocks.
+    """
+    blocks = []
+    with inference_context(get_device()):
+        for page in load_doc(page_path, _worker_analyzer):
+            blocks.extend(get_page_blocks(page))
+    return blocks
+
+
+def pdf_document_id(filepath: str) -> str:
+    """
+    The document id the analyzer assigns to a PDF.
+
+    Read from deepdoctection's own PDF dataflow (first page only, no
+    inference) so it always matches what analyzer.analyze(path=filepath)
+    puts on the pages.
+    """
+    from deepdoctection.dataflow.serialize import SerializerPdfDoc
+
+    df = SerializerPdfDoc.load(filepath, max_datapoints=1)
+    df.reset_state()
+    for dp in df:
+        return intern(str(dp["document_id"]))
+    raise ValueError(f"No pages found in {filepath}")
+
+
+def iter_page_blocks_parallel(filepath: str, workers: int):
+    """
+    Same output as iter_page_blocks, but pages are analyzed in parallel.
+
+    The PDF is split into single-page files that are analyzed by a pool of
+    worker processes, each holding its own analyzer. Each split file keeps
+    the original file name (one subdirectory per page), and page numbers and
+    the document id are rewritten to those of the original file. Pages are
+    yielded in order as soon as they (and all earlier pages) are done.
+    """
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+    from pypdf import PdfReader, PdfWriter
+
+    doc_id = pdf_document_id(filepath)
+    file_name = os.path.basename(filepath)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        reader = PdfReader(filepath)
+        page_paths = []
+        for idx, pdf_page in enumerate(reader.pages):
+            writer = PdfWriter()
+            writer.add_page(pdf_page)
+            page_dir = os.path.join(tmp_dir, f"{idx + 1:05d}")
+            os.mkdir(page_dir)
+            page_path = os.path.join(page_dir, file_name)
+            with open(page_path, "wb") as f:
+                writer.write(f)
+            page_paths.append(page_path)
+
+        logger.info(f"Analyzing {len(page_paths)} pages with {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker) as executor:
+            for page_number, blocks in enumerate(executor.map(_analyze_page_file, page_paths), start=1):
+                for block in blocks:
+                    block["document_id"] = doc_id
+                    block["page_number"] = intern(str(page_number))
+                yield blocks
+
+
+def fetch_data_parallel(filepath: str, workers: int):
+    """
+    Same output as fetch_data_from_doc, but pages are analyzed in parallel.
+    """
+    continuous_chunks = []
+    page_wise_chunks = []
+
+    for blocks in iter_page_blocks_parallel(filepath, workers):
+        continuous_chunks.extend(blocks)
+        page_wise_chunks.append(blocks)
 
     return continuous_chunks, page_wise_chunks
 
-def get_doc_data(filepath: str, analyzer) -> Dict:
+
+BLOCK_FIELDS = ("document_id", "image_id", "page_number", "annotation_id", "reading_order", "category_name", "text")
+
+
+@dataclass
+class BlockColumns:
+    """
+    Column-oriented (struct-of-arrays) store of parsed blocks.
+
+    One list per field instead of a dict per block; block dicts are only
+    rebuilt on request via to_blocks().
+    """
+    document_id: List[str] = field(default_factory=list)
+    image_id: List[str] = field(default_factory=list)
+    page_number: List[str] = field(default_factory=list)
+    annotation_id: List[str] = field(default_factory=list)
+    reading_order: List[str] = field(default_factory=list)
+    category_name: List[str] = field(default_factory=list)
+    text: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_blocks(cls, blocks: List[Dict]) -> "BlockColumns":
+        columns = cls()
+        fields = [(getattr(columns, name).append, name) for name in BLOCK_FIELDS]
+        for block in blocks:
+            for append, name in fields:
+                append(block.get(name, ""))
+        return columns
+
+    def extend(self, other: "BlockColumns"):
+        for name in BLOCK_FIELDS:
+            getattr(self, name).extend(getattr(other, name))
+
+    def to_blocks(self) -> List[Dict]:
+        return [dict(zip(BLOCK_FIELDS, row)) for row in zip(*(getattr(self, name) for name in BLOCK_FIELDS))]
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+
+def get_doc_data(filepath: str, analyzer, workers: int = 1) -> Dict:
     """
     Load and parse full document.
+
+    With workers > 1, pages are analyzed in parallel processes (each loads
+    its own models, so memory grows with the worker count). Blocks are
+    returned as BlockColumns, for the whole document and per page.
     """
-    doc_iter = load_doc(filepath, analyzer)
+    def collect(pages):
+        # Each page's dicts are dropped as soon as they are converted to columns
+        page_columns = [BlockColumns.from_blocks(blocks) for blocks in pages]
+        continuous = BlockColumns()
+        for columns in page_columns:
+            continuous.extend(columns)
+        return continuous, page_columns
 
-    continuous_chunks, page_chunks = fetch_data_from_doc(doc_iter)
+    if workers > 1:
+        continuous_chunks, page_chunks = collect(iter_page_blocks_parallel(filepath, workers))
+    else:
+        try:
+            # Inference runs lazily while pages are iterated (in the prefetch thread)
+            doc_iter = load_doc(filepath, analyzer)
+            continuous_chunks, page_chunks = collect(iter_page_blocks(doc_iter, get_device()))
+        except torch.cuda.OutOfMemoryError:
+            logger.warning("CUDA out of memory during layout analysis; retrying on CPU")
+            torch.cuda.empty_cache()
+            analyzer = init_analyzer(device="cpu")
+            doc_iter = load_doc(filepath, analyzer)
+            continuous_chunks, page_chunks = collect(iter_page_blocks(doc_iter, "cpu"))
 
-    if not continuous_chunks:
+    if not len(continuous_chunks):
         return {}
 
     return {
-        "doc_id": continuous_chunks[0].get("document_id"),
+        "doc_id": continuous_chunks.document_id[0],
         "doc_path": filepath,
         "continuous_chunks": continuous_chunks,
         "page_chunks": page_chunks
@@ -296,85 +648,154 @@ class Chunk:
     Represents a contiguous layout-aware chunk.
     """
 
+    # No per-instance __dict__: documents produce hundreds of chunks
+    __slots__ = ("_parts", "page_numbers", "categories", "titles", "max_length", "doc_id", "_word_count")
+
     def __init__(self, max_length: int = 200):
-        self.text = ""
+        self._parts = []  # text pieces, joined on read instead of re-copying the string per block
         self.page_numbers = []
         self.categories = []
         self.titles = []
         self.max_length = max_length
         self.doc_id = None
+        self._word_count = 0  # running len(self.text.split()), updated per block
+
+    @property
+    def text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    @text.setter
+    def text(self, value: str):
+        self._parts = [value]
 
-    def accumulate(self, block: Dict) -> bool:
-        text = block["text"]
-        category = block["category_name"]
+    def __getstate__(self) -> Dict:
+        state = {name: getattr(self, name) for name in self.__slots__ if name != "_parts"}
+        state["text"] = self.text
+        return state
 
-        self.page_numbers.append(block["page_number"])
+    def __setstate__(self, state: Dict):
+        # Also accepts __dict__ state from pickles made before __slots__ / _word_count existed
+        for name, value in state.items():
+            setattr(self, name, value)
+        if "_word_count" not in state:
+            self._word_count = len(self.text.split())
+
+    def accumulate(self, text: str, category: str, page_number: str) -> bool:
+        self.page_numbers.append(page_number)
         self.categories.append(category)
 
         if category == "title":
             self.titles.append(text)
 
         if category in ("table", "text") or len(text) >= 50:
-            self.text += "\n" + text
+            self._parts.append("\n")
         else:
-            self.text += "\n\n" + text
+            self._parts.append("\n\n")
+        self._parts.append(text)
 
+        # Blocks are joined with newlines, so word counts simply add up
+        self._word_count += len(text.split())
         return True
 
-    def chunking_rules(self, block: Dict) -> bool:
-        word_count = len(self.text.split())
+    def chunking_rules(self, columns: BlockColumns, idx: int) -> bool:
+        word_count = self._word_count
+        text = columns.text[idx]
+        category = columns.category_name[idx]
+        page_number = columns.page_number[idx]
 
         if not self.categories:
-            self.doc_id = block["document_id"]
-            return self.accumulate(block)
+            self.doc_id = columns.document_id[idx]
+            return self.accumulate(text, category, page_number)
 
         if (
             word_count < self.max_length
             and "title" in self.categories[-2:]
         ):
-            return self.accumulate(block)
+            return self.accumulate(text, category, page_number)
 
         if word_count > self.max_length:
             return False
 
         if (
             word_count > (self.max_length // 4)
-            and block["category_name"] == "title"
+            and category == "title"
         ):
             return False
 
-        return self.accumulate(block)
+        return self.accumulate(text, category, page_number)
+
+
+class LayoutChunker:
+    """
+    Incremental layout_chunker: feed blocks page by page, then call finish().
+
+    feed() yields each chunk as soon as it is closed and finish() returns the
+    last open one (or None). The open chunk carries over between feeds, so the
+    result is the same as chunking all blocks in one go.
+    """
+
+    def __init__(self):
+        self._chunk = Chunk()
+
+    def feed(self, columns: BlockColumns) -> Iterator[Chunk]:
+        chunk = self._chunk
+        for idx in range(len(columns)):
+            accumulated = chunk.chunking_rules(columns, idx)
+            if not accumulated:
+                yield chunk
+                chunk = Chunk()
+                chunk.chunking_rules(columns, idx)
+        self._chunk = chunk
 
+    def finish(self) -> Optional[Chunk]:
+        chunk, self._chunk = self._chunk, Chunk()
+        return chunk if chunk.text.strip() else None
 
-def layout_chunker(all_blocks: List[Dict]) -> List[Chunk]:
+
+def iter_layout_chunks(columns) -> Iterator[Chunk]:
     """
-    Merge parsed blocks into layout-aware chunks.
+    Merge parsed blocks into layout-aware chunks, yielding them one at a time.
+
+    Accepts BlockColumns, or the list of block dicts produced by older runs.
     """
-    all_chunks = []
-    chunk = Chunk()
+    if not isinstance(columns, BlockColumns):
+        columns = BlockColumns.from_blocks(columns)
 
-    for block in all_blocks:
-        accumulated = chunk.chunking_rules(block)
-        if not accumulated:
-            all_chunks.append(chunk)
-            chunk = Chunk()
-            chunk.chunking_rules(block)
+    chunker = LayoutChunker()
+    yield from chunker.feed(columns)
+    last = chunker.finish()
+    if last is not None:
+        yield last
 
-    if chunk.text.strip():
-        all_chunks.append(chunk)
 
-    return all_chunks
+def layout_chunker(columns) -> List[Chunk]:
+    """
+    Merge parsed blocks into layout-aware chunks (list form of iter_layout_chunks).
+    """
+    return list(iter_layout_chunks(columns))
 
 
 # ---------------------------
 # Parsed Document Container
 # ---------------------------
 class ParsedDoc:
+    __slots__ = ("doc_id", "doc_path", "chunks")
+
     def __init__(self):
         self.doc_id = None
         self.doc_path = None
         self.chunks = []
 
+    def __getstate__(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state: Dict):
+        # Works for both slot state and __dict__ state from older pickles
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def parse(self, loaded_doc):
         self.doc_id = loaded_doc.get("doc_id")
         self.doc_path = loaded_doc.get("doc_path")
@@ -382,29 +803,226 @@ class ParsedDoc:
             loaded_doc.get("continuous_chunks", [])
         )
 
+    def parse_pages(self, doc_path: str, pages):
+        """
+        Chunk an iterable of per-page block lists without keeping the blocks.
+
+        Only the chunks are retained, so memory no longer grows with the
+        number of raw blocks in the document.
+        """
+        self.chunks = list(self.iter_parse_pages(doc_path, pages))
+
+    def iter_parse_pages(self, doc_path: str, pages) -> Iterator[Chunk]:
+        """
+        Like parse_pages, but yield chunks as they close instead of storing them.
+
+        doc_id is set once the first non-empty page has been seen; self.chunks
+        is left untouched so the caller decides where the chunks go.
+        """
+        self.doc_id = None
+        self.doc_path = doc_path
+        chunker = LayoutChunker()
+        for blocks in pages:
+            if not blocks:
+                continue
+            if self.doc_id is None:
+                self.doc_id = blocks[0]["document_id"]
+            yield from chunker.feed(BlockColumns.from_blocks(blocks))
+        last = chunker.finish()
+        if last is not None:
+            yield last
+
+
+# ---------------------------
+# Serialization
+# ---------------------------
+@contextmanager
+def _compressed_writer(f):
+    """
+    Wrap a binary file in a zstd stream writer, or gzip if zstandard is missing.
+    """
+    if zstd is not None:
+        with zstd.ZstdCompressor(level=3).stream_writer(f) as writer:
+            yield writer
+    else:
+        with gzip.GzipFile(fileobj=f, mode="wb") as writer:
+            yield writer
+
+
+def save_parsed_doc(parsed_doc: "ParsedDoc", output_path: str):
+    """
+    Pickle with the highest protocol, streamed through zstd (or gzip if zstandard is missing).
+    """
+    with open(output_path, "wb") as f, _compressed_writer(f) as writer:
+        pickle.dump(parsed_doc, writer, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def save_parsed_doc_stream(parsed_doc: "ParsedDoc", chunks: Iterable[Chunk], output_path: str) -> int:
+    """
+    Pickle chunks one by one as they are produced, then the ParsedDoc itself.
+
+    The ParsedDoc goes last (with an empty chunk list) because its doc_id is
+    only known once the chunks have been generated. Output is written to a
+    temporary file and moved into place only on success. Returns the number
+    of chunks written.
+    """
+    tmp_path = f"{output_path}.tmp"
+    count = 0
+    try:
+        with open(tmp_path, "wb") as f, _compressed_writer(f) as writer:
+            for chunk in chunks:
+                pickle.dump(chunk, writer, protocol=pickle.HIGHEST_PROTOCOL)
+                count += 1
+            if parsed_doc.doc_id is None:
+                raise RuntimeError("Failed to parse document")
+            chunk_list, parsed_doc.chunks = parsed_doc.chunks, []
+            try:
+                pickle.dump(parsed_doc, writer, protocol=pickle.HIGHEST_PROTOCOL)
+            finally:
+                parsed_doc.chunks = chunk_list
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+def _read_parsed_doc(reader) -> "ParsedDoc":
+    # Single ParsedDoc pickle, or the chunk-stream layout from save_parsed_doc_stream
+    obj = pickle.load(reader)
+    chunks = []
+    while not isinstance(obj, ParsedDoc):
+        chunks.append(obj)
+        obj = pickle.load(reader)
+    if chunks:
+        obj.chunks = chunks
+    return obj
+
+
+def load_parsed_doc(path: str) -> "ParsedDoc":
+    """
+    Load a parsed document saved by save_parsed_doc or save_parsed_doc_stream
+    (zstd, gzip or plain pickle).
+    """
+    with open(path, "rb") as f:
+        magic = f.read(4)
+        f.seek(0)
+        if magic.startswith(ZSTD_MAGIC):
+            if zstd is None:
+                raise RuntimeError("zstandard is required to read this file: pip install zstandard")
+            with zstd.ZstdDecompressor().stream_reader(f) as reader:
+                return _read_parsed_doc(reader)
+        if magic.startswith(GZIP_MAGIC):
+            with gzip.GzipFile(fileobj=f, mode="rb") as reader:
+                return _read_parsed_doc(reader)
+        return _read_parsed_doc(f)
+
 
 # ---------------------------
 # Main Processing Function
 # ---------------------------
-def process_document(pdf_path: str, output_dir: str):
-    analyzer = init_analyzer()
+def parse_document(filepath: str, analyzer, workers: int = 1) -> "ParsedDoc":
+    """
+    Analyze and chunk a document page by page (streaming counterpart of get_doc_data + parse).
+    """
+    parsed_doc = ParsedDoc()
+    if workers > 1:
+        parsed_doc.parse_pages(filepath, iter_page_blocks_parallel(filepath, workers))
+        return parsed_doc
+
+    try:
+        parsed_doc.parse_pages(filepath, iter_page_blocks(load_doc(filepath, analyzer), get_device()))
+    except torch.cuda.OutOfMemoryError:
+        logger.warning("CUDA out of memory during layout analysis; retrying on CPU")
+        torch.cuda.empty_cache()
+        analyzer = init_analyzer(device="cpu")
+        parsed_doc.parse_pages(filepath, iter_page_blocks(load_doc(filepath, analyzer), "cpu"))
+    return parsed_doc
 
-    loaded_doc = get_doc_data(pdf_path, analyzer)
-    if not loaded_doc:
-        raise RuntimeError("Failed to parse document")
 
+def _stream_document(filepath: str, analyzer, output_path: str, workers: int = 1) -> int:
+    """
+    Analyze and chunk a document, writing chunks to output_path as they close.
+
+    Streaming counterpart of parse_document + save_parsed_doc: only the open
+    chunk is held in memory. Returns the number of chunks written.
+    """
     parsed_doc = ParsedDoc()
-    parsed_doc.parse(loaded_doc)
+    if workers > 1:
+        pages = iter_page_blocks_parallel(filepath, workers)
+        return save_parsed_doc_stream(parsed_doc, parsed_doc.iter_parse_pages(filepath, pages), output_path)
+
+    try:
+        pages = iter_page_blocks(load_doc(filepath, analyzer), get_device())
+        return save_parsed_doc_stream(parsed_doc, parsed_doc.iter_parse_pages(filepath, pages), output_path)
+    except torch.cuda.OutOfMemoryError:
+        logger.warning("CUDA out of memory during layout analysis; retrying on CPU")
+        torch.cuda.empty_cache()
+        analyzer = init_analyzer(device="cpu")
+        pages = iter_page_blocks(load_doc(filepath, analyzer), "cpu")
+        return save_parsed_doc_stream(parsed_doc, parsed_doc.iter_parse_pages(filepath, pages), output_path)
+
+
+def process_document(pdf_path: str, output_dir: str, workers: int = 1, analyzer=None) -> str:
+    """
+    Parse a PDF and stream its chunks to <output_dir>/<name>.pkl; returns the output path.
+    """
+    # Parallel mode loads analyzers inside the worker processes instead
+    if analyzer is None and workers <= 1:
+        analyzer = init_analyzer()
 
     os.makedirs(output_dir, exist_ok=True)
     file_name = os.path.basename(pdf_path).replace(".pdf", ".pkl")
     output_path = os.path.join(output_dir, file_name)
 
-    with open(output_path, "wb") as f:
-        pickle.dump(parsed_doc, f)
+    chunk_count = _stream_document(pdf_path, analyzer, output_path, workers=workers)
+
+    logger.info(f"Saved parsed document ({chunk_count} chunks) to {output_path}")
+    return output_path
+
+
+def _process_document_in_worker(pdf_path: str, output_dir: str) -> str:
+    """
+    Process one PDF with the analyzer loaded by _init_page_worker; returns the PDF path.
+    """
+    process_document(pdf_path, output_dir, analyzer=_worker_analyzer)
+    return pdf_path
 
-    logger.info(f"Saved parsed document to {output_path}")
-    return parsed_doc
+
+def process_directory(pdf_dir: str, output_dir: str, doc_workers: int = None) -> Dict[str, str]:
+    """
+    Process every PDF in a directory, one document per worker process.
+
+    Each worker loads its analyzer once and reuses it for all documents it
+    handles. Returns {pdf_path: error message} for documents that failed.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    pdf_paths = sorted(
+        os.path.join(pdf_dir, name) for name in os.listdir(pdf_dir) if name.lower().endswith(".pdf")
+    )
+    if not pdf_paths:
+        logger.warning(f"No PDF files found in {pdf_dir}")
+        return {}
+
+    doc_workers = doc_workers or min(os.cpu_count() or 1, 4)
+    logger.info(f"Processing {len(pdf_paths)} PDFs with {doc_workers} worker processes")
+
+    failures = {}
+    with ProcessPoolExecutor(max_workers=doc_workers, initializer=_init_page_worker) as executor:
+        futures = {
+            executor.submit(_process_document_in_worker, pdf_path, output_dir): pdf_path
+            for pdf_path in pdf_paths
+        }
+        for future in as_completed(futures):
+            pdf_path = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Failed to process {pdf_path}: {e}")
+                failures[pdf_path] = str(e)
+    return failures
 
 
 # ---------------------------
@@ -416,9 +1034,28 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Layout-aware PDF text extraction using DeepDocDetection"
     )
-    parser.add_argument("--pdf", required=True, help="Path to PDF file")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--pdf", help="Path to PDF file")
+    source.add_argument("--pdf-dir", help="Directory of PDF files, processed in parallel (one document per process)")
     parser.add_argument("--output", default="./parsed_docs", help="Output directory")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Analyze pages in this many processes (each loads its own models; e.g. os.cpu_count())",
+    )
+    parser.add_argument(
+        "--doc-workers",
+        type=int,
+        default=None,
+        help="With --pdf-dir: number of documents processed at once (default: min(CPU count, 4))",
+    )
 
     args = parser.parse_args()
 
-    process_document(args.pdf, args.output)
+    if args.pdf_dir:
+        failed = process_directory(args.pdf_dir, args.output, doc_workers=args.doc_workers)
+        if failed:
+            raise SystemExit(f"{len(failed)} document(s) failed: {', '.join(failed)}")
+    else:
+        process_document(args.pdf, args.output, workers=args.workers)
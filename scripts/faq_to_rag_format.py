@@ -9,20 +9,27 @@ import csv
 import os
 import re
 from pathlib import Path
+from typing import Iterator
 
 # Base paths (script may be run from repo root or scripts/)
 REPO_ROOT = Path(__file__).resolve().parent.parent
 FAQS_DIR = REPO_ROOT / "data" / "FAQs"
 OUT_DIR = REPO_ROOT / "data" / "FAQs" / "processed"
 
+_RE_MULTINEWLINE = re.compile(r"\n\s*\n\s*\n+")
+_RE_SPACES = re.compile(r"[ \t]+")
+
 
 def _normalize_text(s: str) -> str:
     if s is None or (isinstance(s, float) and (s != s)):  # NaN
         return ""
     s = str(s).strip()
+    # Most cells are single-line with single spaces: nothing to collapse
+    if "\n" not in s and "  " not in s and "\t" not in s:
+        return s
     # Collapse multiple newlines to double; clean whitespace
-    s = re.sub(r"\n\s*\n\s*\n+", "\n\n", s)
-    s = re.sub(r"[ \t]+", " ", s)
+    s = _RE_MULTINEWLINE.sub("\n\n", s)
+    s = _RE_SPACES.sub(" ", s)
     return s.strip()
 
 
@@ -44,51 +51,61 @@ def _row_to_block(category: str, question: str, answer: str, source: str, extra:
     return "\n".join(lines)
 
 
-def load_csv(path: Path) -> list[dict]:
-    """Load CSV with headers; return list of dicts."""
-    rows = []
+def load_csv(path: Path) -> tuple[dict[str, int], list[list[str]]]:
+    """Load CSV; return (column name -> index, data rows as lists)."""
     with open(path, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rows.append({k.strip(): v for k, v in row.items() if k})
-    return rows
+        reader = csv.reader(f)
+        headers = next(reader, [])
+        # Blank lines are skipped, as csv.DictReader does
+        rows = [row for row in reader if row]
+    columns = {h.strip(): i for i, h in enumerate(headers) if h}
+    return columns, rows
+
 
+def _cell(row: list[str], index) -> str:
+    """Value at a resolved column index ("" if the column or the cell is missing)."""
+    if index is None or index >= len(row):
+        return ""
+    return row[index]
 
-def process_general_faq(path: Path) -> list[str]:
+
+def process_general_faq(path: Path) -> Iterator[str]:
     # Columns: Category, Question, Possible Answer, Source
-    rows = load_csv(path)
-    blocks = []
+    columns, rows = load_csv(path)
+    cat_i, q_i, a_i, src_i = (columns.get(name) for name in ("Category", "Question", "Possible Answer", "Source"))
     category = ""
     for row in rows:
-        cat = _normalize_text(row.get("Category", ""))
+        cat = _normalize_text(_cell(row, cat_i))
         if cat:
             category = cat
-        q = _normalize_text(row.get("Question", ""))
-        a = _normalize_text(row.get("Possible Answer", ""))
-        src = _normalize_text(row.get("Source", ""))
+        q = _normalize_text(_cell(row, q_i))
+        a = _normalize_text(_cell(row, a_i))
+        src = _normalize_text(_cell(row, src_i))
         if not q and not a:
             continue
         if not q:
             q = "(No question text)"
         if not a:
             a = "(No answer text)"
-        blocks.append(_row_to_block(category, q, a, src))
-    return blocks
+        yield _row_to_block(category, q, a, src)
 
 
-def process_onboarding_faq(path: Path) -> list[str]:
+def process_onboarding_faq(path: Path) -> Iterator[str]:
     # Columns: Category, Typical Questions, Chatbot Response, Action/Link, Escalation Rule
-    rows = load_csv(path)
-    blocks = []
+    columns, rows = load_csv(path)
+    cat_i, q_i, a_i, action_i, escalation_i = (
+        columns.get(name)
+        for name in ("Category", "Typical Questions", "Chatbot Response", "Action/Link", "Escalation Rule")
+    )
     category = ""
     for row in rows:
-        cat = _normalize_text(row.get("Category", ""))
+        cat = _normalize_text(_cell(row, cat_i))
         if cat:
             category = cat
-        q = _normalize_text(row.get("Typical Questions", ""))
-        a = _normalize_text(row.get("Chatbot Response", ""))
-        action = _normalize_text(row.get("Action/Link", ""))
-        escalation = _normalize_text(row.get("Escalation Rule", ""))
+        q = _normalize_text(_cell(row, q_i))
+        a = _normalize_text(_cell(row, a_i))
+        action = _normalize_text(_cell(row, action_i))
+        escalation = _normalize_text(_cell(row, escalation_i))
         extra_parts = []
         if action:
             extra_parts.append(f"*Action/Link:* {action}")
@@ -101,30 +118,30 @@ def process_onboarding_faq(path: Path) -> list[str]:
             q = "(No question text)"
         if not a:
             a = "(No answer text)"
-        blocks.append(_row_to_block(category, q, a, "", extra))
-    return blocks
+        yield _row_to_block(category, q, a, "", extra)
 
 
-def process_post_joining_faq(path: Path) -> list[str]:
+def process_post_joining_faq(path: Path) -> Iterator[str]:
     # Columns: Category, Typical Questions, Chatbot Response, Source
-    rows = load_csv(path)
-    blocks = []
+    columns, rows = load_csv(path)
+    cat_i, q_i, a_i, src_i = (
+        columns.get(name) for name in ("Category", "Typical Questions", "Chatbot Response", "Source")
+    )
     category = ""
     for row in rows:
-        cat = _normalize_text(row.get("Category", ""))
+        cat = _normalize_text(_cell(row, cat_i))
         if cat:
             category = cat
-        q = _normalize_text(row.get("Typical Questions", ""))
-        a = _normalize_text(row.get("Chatbot Response", ""))
-        src = _normalize_text(row.get("Source", ""))
+        q = _normalize_text(_cell(row, q_i))
+        a = _normalize_text(_cell(row, a_i))
+        src = _normalize_text(_cell(row, src_i))
         if not q and not a:
             continue
         if not q:
             q = "(No question text)"
         if not a:
             a = "(No answer text)"
-        blocks.append(_row_to_block(category, q, a, src))
-    return blocks
+        yield _row_to_block(category, q, a, src)
 
 
 def main():
@@ -136,27 +153,33 @@ def main():
         ("Post Joining FAQs-Table 1.csv", process_post_joining_faq, "Post_Joining_FAQs.md"),
     ]
 
-    all_blocks = []
-    for filename, processor, out_name in configs:
-        path = FAQS_DIR / filename
-        if not path.exists():
-            print(f"Skip (not found): {path}")
-            continue
-        blocks = processor(path)
-        body = "\n\n---\n\n".join(blocks)
-        out_path = OUT_DIR / out_name
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(f"# {out_name.replace('.md', '').replace('_', ' ')}\n\n")
-            f.write(body)
-        print(f"Wrote {len(blocks)} FAQs -> {out_path}")
-        all_blocks.extend(blocks)
-
-    # Optional: one combined file
+    separator = "\n\n---\n\n"
+    # Blocks are streamed to the per-file output and the optional combined file at once
     combined_path = OUT_DIR / "All_FAQs_Combined.md"
-    with open(combined_path, "w", encoding="utf-8") as f:
-        f.write("# All FAQs (General, Onboarding, Post Joining)\n\n")
-        f.write("\n\n---\n\n".join(all_blocks))
-    print(f"Wrote combined {len(all_blocks)} FAQs -> {combined_path}")
+    combined_count = 0
+    with open(combined_path, "w", encoding="utf-8") as combined:
+        combined.write("# All FAQs (General, Onboarding, Post Joining)\n\n")
+        for filename, processor, out_name in configs:
+            path = FAQS_DIR / filename
+            if not path.exists():
+                print(f"Skip (not found): {path}")
+                continue
+            out_path = OUT_DIR / out_name
+            count = 0
+            with open(out_path, "w", encoding="utf-8") as f:
+                f.write(f"# {out_name.replace('.md', '').replace('_', ' ')}\n\n")
+                for block in processor(path):
+                    if count:
+                        f.write(separator)
+                    if combined_count:
+                        combined.write(separator)
+                    f.write(block)
+                    combined.write(block)
+                    count += 1
+                    combined_count += 1
+            print(f"Wrote {count} FAQs -> {out_path}")
+
+    print(f"Wrote combined {combined_count} FAQs -> {combined_path}")
     print("\nNext: Upload the .md file(s) under data/FAQs/processed/ via your RAG pipeline (do not upload the raw CSVs).")
 
 
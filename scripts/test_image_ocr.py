@@ -2,17 +2,26 @@
 Test script for Image OCR with orientation detection
 
 Usage:
-    python scripts/test_image_ocr.py <path_to_image_file> [output_file.md]
+    python scripts/test_image_ocr.py <path_to_image_file> [output_file.md | .md.gz | .md.zst] [--verbose]
+    python scripts/test_image_ocr.py <image_directory> [output_dir]
     
 Example:
     python scripts/test_image_ocr.py "data/Sample Documents/Sample driving license 1.jpg"
     python scripts/test_image_ocr.py image.jpg output.md
+    python scripts/test_image_ocr.py "data/Sample Documents" ocr_reports/
 """
 import sys
 import os
+import io
+import gzip
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
-from io import StringIO
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
@@ -32,42 +41,107 @@ else:
 from app.core.config import get_settings
 settings = get_settings()
 
-# Create output buffer to capture all output
-output_buffer = StringIO()
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp'})
+
+
+def iter_images(root):
+    """Yield image files under root lazily (one os.walk pass, extensions matched case-insensitively)"""
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                yield Path(dirpath) / name
+
+# Spool every printed line to a temp file; it is copied into the markdown report at the end
+output_spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+
+BANNER = "=" * 80
+
+# Long messages (full text, chunk dumps) are cut short on the console unless --verbose;
+# the output file always gets them in full
+VERBOSE = '--verbose' in sys.argv
+CONSOLE_MAX_CHARS = 2048
 
 def print_and_save(*args, **kwargs):
-    """Print to console and save to buffer"""
-    message = ' '.join(str(arg) for arg in args)
-    print(*args, **kwargs)
-    output_buffer.write(message + '\n')
-
-# Check Python environment first
-print_and_save(f"🐍 Python: {sys.executable}")
-print_and_save(f"📁 Project Root: {project_root}")
-print_and_save()
-
-# Check required dependencies
-try:
-    from PIL import Image
-    print_and_save("✅ PIL/Pillow found")
-    print_and_save()
-except ImportError as e:
-    print_and_save(f"❌ Missing dependency: {str(e)}")
-    print_and_save()
-    print_and_save("💡 Install required packages:")
-    print_and_save("   pip install Pillow")
-    print_and_save()
-    sys.exit(1)
+    """Print to console and save to the output spool"""
+    message = ' '.join(map(str, args))
+    if not VERBOSE and len(message) > CONSOLE_MAX_CHARS:
+        print(f"{message[:CONSOLE_MAX_CHARS]}\n... [truncated on console; full text in the output file]", **kwargs)
+    else:
+        print(*args, **kwargs)
+    output_spool.write(message)
+    output_spool.write('\n')
+
+
+def reset_saved_output():
+    """Start a fresh output spool (one per image in batch mode)"""
+    global output_spool
+    output_spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
 
-import logging
-from app.services.rag.document_processor import DocumentProcessor
-from app.services.rag.text_enhancer import TextEnhancer
-from app.core.logging_config import setup_logging
 
-# Setup logging
-setup_logging()
+def print_section(title):
+    """Print and save a section header (title between two banner lines) in one call"""
+    print_and_save(f"{BANNER}\n{title}\n{BANNER}")
+
+
+def write_saved_output(f):
+    """Copy everything passed to print_and_save so far into an open file"""
+    output_spool.flush()
+    output_spool.seek(0)
+    shutil.copyfileobj(output_spool, f, 1 << 16)
+    output_spool.seek(0, os.SEEK_END)
+
+
+def open_report(output_path: Path):
+    """Open the markdown report for writing; .gz / .zst suffixes write it compressed"""
+    suffix = output_path.suffix.lower()
+    if suffix == '.gz':
+        return gzip.open(output_path, 'wt', compresslevel=3, encoding='utf-8')
+    if suffix == '.zst':
+        import zstandard as zstd
+        writer = zstd.ZstdCompressor(level=3).stream_writer(open(output_path, 'wb'))
+        return io.TextIOWrapper(writer, encoding='utf-8')
+    return open(output_path, 'w', encoding='utf-8')
+
+import logging
 logger = logging.getLogger(__name__)
 
+# Heavy imports (Pillow, RAG services) are deferred until the arguments are valid,
+# so the usage message prints without loading them
+Image = None
+DocumentProcessor = None
+TextEnhancer = None
+TESSEROCR_AVAILABLE = False
+
+
+def load_dependencies():
+    """Check the environment and import the modules the test needs"""
+    global Image, DocumentProcessor, TextEnhancer, TESSEROCR_AVAILABLE
+    
+    # Check Python environment first
+    print_and_save(f"🐍 Python: {sys.executable}")
+    print_and_save(f"📁 Project Root: {project_root}")
+    print_and_save()
+    
+    # Check required dependencies
+    try:
+        from PIL import Image
+        print_and_save("✅ PIL/Pillow found")
+        print_and_save()
+    except ImportError as e:
+        print_and_save(f"❌ Missing dependency: {str(e)}")
+        print_and_save()
+        print_and_save("💡 Install required packages:")
+        print_and_save("   pip install Pillow")
+        print_and_save()
+        sys.exit(1)
+    
+    from app.services.rag.document_processor import DocumentProcessor
+    from app.services.rag.text_enhancer import TextEnhancer
+    from app.services.rag.tesseract_engine import TESSEROCR_AVAILABLE
+    from app.core.logging_config import setup_logging
+    
+    # Setup logging
+    setup_logging()
 
 def test_image_ocr(image_path: str, output_file: str = None):
     """
@@ -77,40 +151,39 @@ def test_image_ocr(image_path: str, output_file: str = None):
         image_path: Path to the image file
         output_file: Optional path to save full output markdown file
     """
-    print_and_save("=" * 80)
-    print_and_save("🖼️  Image OCR Test Script")
-    print_and_save("=" * 80)
+    print_section("🖼️  Image OCR Test Script")
     print_and_save()
     
-    # Check if file exists
-    if not os.path.exists(image_path):
+    # Check if file exists (one stat call; size and name parts are reused below)
+    path = Path(image_path)
+    try:
+        file_size = path.stat().st_size
+    except FileNotFoundError:
         print_and_save(f"❌ Error: File not found: {image_path}")
         return
+    stem, suffix = path.stem, path.suffix
     
     # Check if it's an image file
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp']
-    file_ext = Path(image_path).suffix.lower()
-    if file_ext not in image_extensions:
+    file_ext = suffix.lower()
+    if file_ext not in IMAGE_EXTENSIONS:
         print_and_save(f"⚠️  Warning: File doesn't appear to be an image: {image_path}")
         response = input("Continue anyway? (y/n): ")
         if response.lower() != 'y':
             return
     
     print_and_save(f"📁 Image File: {image_path}")
-    file_size = os.path.getsize(image_path)
     print_and_save(f"📊 File Size: {file_size:,} bytes ({file_size / 1024:.2f} KB)")
     print_and_save(f"📄 File Extension: {file_ext}")
     print_and_save()
     
     try:
         # Load and analyze image (basic info only)
-        print_and_save("=" * 80)
-        print_and_save("📐 IMAGE ANALYSIS")
-        print_and_save("=" * 80)
+        print_section("📐 IMAGE ANALYSIS")
         
-        image = Image.open(image_path)
-        width, height = image.size
-        mode = image.mode
+        # Only the header is parsed; the pixels are never decoded here
+        with Image.open(image_path) as image:
+            width, height = image.size
+            mode = image.mode
         
         print_and_save(f"Dimensions: {width} x {height} pixels")
         print_and_save(f"Mode: {mode}")
@@ -118,21 +191,19 @@ def test_image_ocr(image_path: str, output_file: str = None):
         print_and_save()
         
         # Show configuration
-        print_and_save("=" * 80)
-        print_and_save("⚙️  CONFIGURATION")
-        print_and_save("=" * 80)
+        print_section("⚙️  CONFIGURATION")
         print_and_save(f"TEXT_ENHANCEMENT_ENABLED: {settings.TEXT_ENHANCEMENT_ENABLED}")
         print_and_save(f"TEXT_ENHANCEMENT_TEMPERATURE: {settings.TEXT_ENHANCEMENT_TEMPERATURE}")
         print_and_save(f"GROQ_API_KEY: {'Set' if settings.GROQ_API_KEY else 'Not set'}")
         print_and_save(f"GROQ_MODEL_NAME: {settings.GROQ_MODEL_NAME}")
         print_and_save(f"OCR_ENABLED: {settings.OCR_ENABLED}")
         print_and_save(f"OCR_LANGUAGE: {settings.OCR_LANGUAGE}")
+        print_and_save(f"OCR_CACHE_ENABLED: {settings.OCR_CACHE_ENABLED}")
+        print_and_save(f"OCR Engine: {'tesserocr (in-process)' if TESSEROCR_AVAILABLE else 'pytesseract (tesseract CLI per call)'}")
         print_and_save()
         
         # Initialize text enhancer (for LLM-based enhancement)
-        print_and_save("=" * 80)
-        print_and_save("🤖 INITIALIZING TEXT ENHANCER")
-        print_and_save("=" * 80)
+        print_section("🤖 INITIALIZING TEXT ENHANCER")
         print_and_save("🔄 Initializing TextEnhancer (LLM-based enhancement)...")
         try:
             text_enhancer = TextEnhancer()
@@ -157,9 +228,7 @@ def test_image_ocr(image_path: str, output_file: str = None):
             text_enhancer = None
         
         # Get raw OCR text first (for comparison) - using document processor
-        print_and_save("=" * 80)
-        print_and_save("📖 RAW OCR EXTRACTION (Before Enhancement)")
-        print_and_save("=" * 80)
+        print_section("📖 RAW OCR EXTRACTION (Before Enhancement)")
         print_and_save("📖 Extracting raw OCR text using DocumentProcessor (without LLM enhancement)...")
         
         try:
@@ -182,66 +251,72 @@ def test_image_ocr(image_path: str, output_file: str = None):
                 print_and_save()
         except Exception as e:
             print_and_save(f"⚠️  Error extracting raw OCR: {str(e)}")
+            raw_result = None
             raw_text = ""
             raw_text_length = 0
         
-        # Initialize document processor with text enhancer
-        print_and_save("=" * 80)
-        print_and_save("🔄 INITIALIZING DOCUMENT PROCESSOR (With Enhancement)")
-        print_and_save("=" * 80)
-        print_and_save("🔄 Initializing DocumentProcessor with TextEnhancer...")
-        processor = DocumentProcessor(text_enhancer=text_enhancer)
-        print_and_save("✅ DocumentProcessor initialized")
-        if text_enhancer and text_enhancer.enabled:
-            print_and_save("   (Text enhancer integrated for OCR text enhancement)")
-        print_and_save()
-        
-        # Process image with OCR and enhancement using DocumentProcessor
-        print_and_save("=" * 80)
-        print_and_save("📖 OCR PROCESSING (With LLM Enhancement)")
-        print_and_save("=" * 80)
-        print_and_save("📖 Processing image with OCR and LLM enhancement using DocumentProcessor...")
-        print_and_save(f"   Using image: {image_path}")
-        print_and_save()
-        
-        try:
-            result = processor.process_file(image_path)
-            print_and_save("✅ OCR processing with enhancement completed")
+        enhancement_enabled = bool(text_enhancer and text_enhancer.enabled)
+        if not enhancement_enabled and raw_result is not None:
+            # Nothing to enhance: the raw pass is the final result, no second processor needed
+            print_and_save("ℹ️  LLM enhancement disabled - using the raw OCR result as the final text")
             print_and_save()
-        except Exception as e:
-            print_and_save(f"❌ Error processing image: {str(e)}")
-            raise
-        
+            result = raw_result
+        else:
+            # Initialize document processor with text enhancer
+            print_section("🔄 INITIALIZING DOCUMENT PROCESSOR (With Enhancement)")
+            print_and_save("🔄 Initializing DocumentProcessor with TextEnhancer...")
+            processor = DocumentProcessor(text_enhancer=text_enhancer)
+            print_and_save("✅ DocumentProcessor initialized")
+            if enhancement_enabled:
+                print_and_save("   (Text enhancer integrated for OCR text enhancement)")
+            print_and_save()
+            
+            # Process image with OCR and enhancement using DocumentProcessor
+            print_section("📖 OCR PROCESSING (With LLM Enhancement)")
+            print_and_save("📖 Enhancing the raw OCR text with DocumentProcessor (OCR is not run again)...")
+            print_and_save(f"   Using image: {image_path}")
+            print_and_save()
+            
+            try:
+                if raw_result is None:
+                    # Raw extraction failed above; fall back to the full pipeline
+                    result = processor.process_file(image_path)
+                elif raw_result.get("use_deepdoctection"):
+                    # DeepDocDetection output is never LLM-enhanced, so the raw result is final
+                    result = raw_result
+                else:
+                    result = {**raw_result, "text": processor.enhance_text(raw_text, document_title=stem)}
+                print_and_save("✅ OCR processing with enhancement completed")
+                print_and_save()
+            except Exception as e:
+                print_and_save(f"❌ Error processing image: {str(e)}")
+                raise
+            
         # Extract results
         extracted_text = result.get("text", "")
         extracted_length = len(extracted_text)
         
         # Enhancement comparison
-        print_and_save("=" * 80)
-        print_and_save("✨ ENHANCEMENT COMPARISON")
-        print_and_save("=" * 80)
-        print_and_save(f"Raw OCR Length: {raw_text_length} characters")
-        print_and_save(f"Enhanced Length: {extracted_length} characters")
-        if raw_text_length > 0:
-            difference = extracted_length - raw_text_length
-            percentage = (difference / raw_text_length * 100) if raw_text_length > 0 else 0
-            print_and_save(f"Difference: {difference:+d} characters ({percentage:+.1f}%)")
-        print_and_save()
+        if enhancement_enabled:
+            print_section("✨ ENHANCEMENT COMPARISON")
+            print_and_save(f"Raw OCR Length: {raw_text_length} characters")
+            print_and_save(f"Enhanced Length: {extracted_length} characters")
+            if raw_text_length > 0:
+                difference = extracted_length - raw_text_length
+                percentage = (difference / raw_text_length * 100) if raw_text_length > 0 else 0
+                print_and_save(f"Difference: {difference:+d} characters ({percentage:+.1f}%)")
+            print_and_save()
         
         # Display results
-        print_and_save("=" * 80)
-        print_and_save("📊 OCR RESULTS")
-        print_and_save("=" * 80)
+        print_section("📊 OCR RESULTS")
         print_and_save(f"File Type: {result.get('file_ext', 'unknown')}")
         print_and_save(f"MIME Type: {result.get('mime_type', 'unknown')}")
         print_and_save(f"Extracted Text Length: {extracted_length} characters")
         print_and_save(f"Extracted Text Length: {extracted_length / 1024:.2f} KB")
         print_and_save()
         
-        print_and_save("=" * 80)
-        print_and_save("📝 FULL EXTRACTED TEXT")
-        print_and_save("=" * 80)
-        if text_enhancer and text_enhancer.enabled:
+        print_section("📝 FULL EXTRACTED TEXT")
+        if enhancement_enabled:
             print_and_save("(This text has been enhanced using LLM)")
         print_and_save("```")
         print_and_save(extracted_text)
@@ -249,34 +324,33 @@ def test_image_ocr(image_path: str, output_file: str = None):
         print_and_save()
         
         # Text statistics
-        lines = extracted_text.split('\n')
-        words = extracted_text.split()
+        # Count without building line/word lists (split('\n') always yields count + 1 lines)
+        line_count = extracted_text.count('\n') + 1
+        word_count = sum(1 for _ in re.finditer(r'\S+', extracted_text))
         print_and_save("📊 Text Statistics:")
         print_and_save(f"   Total Characters: {extracted_length}")
-        print_and_save(f"   Total Lines: {len(lines)}")
-        print_and_save(f"   Total Words: {len(words)}")
-        print_and_save(f"   Average Words per Line: {len(words) / len(lines):.1f}" if lines else "   Average Words per Line: 0")
-        print_and_save()
-        
-        # Before/After comparison
-        print_and_save("=" * 80)
-        print_and_save("📊 BEFORE/AFTER COMPARISON")
-        print_and_save("=" * 80)
+        print_and_save(f"   Total Lines: {line_count}")
+        print_and_save(f"   Total Words: {word_count}")
+        print_and_save(f"   Average Words per Line: {word_count / line_count:.1f}")
         print_and_save()
         
-        print_and_save("### Raw OCR Text (Before Enhancement):")
-        print_and_save("```")
-        print_and_save(raw_text if raw_text.strip() else "(No text extracted)")
-        print_and_save("```")
-        print_and_save()
-        
-        print_and_save("### Enhanced Text (After LLM Enhancement):")
-        print_and_save("```")
-        print_and_save(extracted_text if extracted_text.strip() else "(No text extracted)")
-        print_and_save("```")
-        print_and_save()
-        
-        if text_enhancer and text_enhancer.enabled:
+        # Before/After comparison (only meaningful when the text was enhanced)
+        if enhancement_enabled:
+            print_section("📊 BEFORE/AFTER COMPARISON")
+            print_and_save()
+            
+            print_and_save("### Raw OCR Text (Before Enhancement):")
+            print_and_save("```")
+            print_and_save(raw_text if raw_text.strip() else "(No text extracted)")
+            print_and_save("```")
+            print_and_save()
+            
+            print_and_save("### Enhanced Text (After LLM Enhancement):")
+            print_and_save("```")
+            print_and_save(extracted_text if extracted_text.strip() else "(No text extracted)")
+            print_and_save("```")
+            print_and_save()
+            
             print_and_save("### Enhancement Features Applied:")
             print_and_save("  ✓ Fixed OCR character recognition errors (rn→m, 0→O, etc.)")
             print_and_save("  ✓ Structured information into logical sections/fields")
@@ -284,9 +358,12 @@ def test_image_ocr(image_path: str, output_file: str = None):
             print_and_save("  ✓ Fixed spacing and formatting issues")
             print_and_save("  ✓ Preserved all numbers, dates, and identifiers")
             print_and_save()
+        else:
+            print_and_save("ℹ️  Before/after comparison skipped: LLM enhancement is disabled, so the text above is the raw OCR output")
+            print_and_save()
         
         # Check if processed image was saved by DocumentProcessor
-        processed_image_path = Path(settings.DOCUMENTS_STORAGE_PATH) / "processed_images" / f"{Path(image_path).stem}_processed{Path(image_path).suffix}"
+        processed_image_path = Path(settings.DOCUMENTS_STORAGE_PATH) / "processed_images" / f"{stem}_processed{suffix}"
         image_files_section = ""
         if processed_image_path.exists():
             # Try to get relative path, fallback to absolute if not under project root
@@ -305,7 +382,7 @@ def test_image_ocr(image_path: str, output_file: str = None):
         
         # Create markdown content with raw text included if available
         raw_text_section = ""
-        if raw_text.strip():
+        if enhancement_enabled and raw_text.strip():
             raw_text_section = f"""
 ## Raw OCR Text (Before Enhancement)
 
@@ -323,32 +400,31 @@ def test_image_ocr(image_path: str, output_file: str = None):
 **File Size:** {file_size:,} bytes ({file_size / 1024:.2f} KB)
 **Image Dimensions:** {width} x {height} pixels
 **Image Mode:** {mode}
-**LLM Enhancement:** {'Enabled' if text_enhancer and text_enhancer.enabled else 'Disabled'}
+**LLM Enhancement:** {'Enabled' if enhancement_enabled else 'Disabled'}
 
 {image_files_section}
 {raw_text_section}
 ---
 
-{output_buffer.getvalue()}
 """
         
         # Write to file
         if output_file:
             output_path = Path(output_file)
         else:
-            output_path = project_root / f"{Path(image_path).stem}_ocr_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+            output_path = project_root / f"{stem}_ocr_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
         
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
+        with open_report(output_path) as f:
             f.write(md_content)
+            write_saved_output(f)
+            f.write('\n')
         
         print_and_save()
         print_and_save(f"💾 Full output saved to: {output_path}")
         print_and_save()
         
-        print_and_save("=" * 80)
-        print_and_save("✅ TEST COMPLETED SUCCESSFULLY")
-        print_and_save("=" * 80)
+        print_section("✅ TEST COMPLETED SUCCESSFULLY")
         
     except ImportError as e:
         print_and_save(f"❌ Import Error: {str(e)}")
@@ -356,8 +432,8 @@ def test_image_ocr(image_path: str, output_file: str = None):
         print_and_save("💡 Troubleshooting:")
         print_and_save(f"   Current Python: {sys.executable}")
         print_and_save("   1. Make sure you're in the correct virtual environment")
-        print_and_save("   2. Install: pip install pytesseract Pillow")
-        print_and_save("   3. Make sure Tesseract OCR is installed on your system:")
+        print_and_save("   2. Install: pip install tesserocr Pillow (in-process OCR; pytesseract is the fallback)")
+        print_and_save("   3. Make sure Tesseract and its language data (incl. osd) are installed:")
         print_and_save("      - macOS: brew install tesseract")
         print_and_save("      - Ubuntu: sudo apt-get install tesseract-ocr")
         print_and_save("      - Windows: Download from https://github.com/UB-Mannheim/tesseract/wiki")
@@ -366,7 +442,8 @@ def test_image_ocr(image_path: str, output_file: str = None):
         # Save error to file
         error_output = project_root / "scripts" / f"ocr_test_error_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
         with open(error_output, 'w', encoding='utf-8') as f:
-            f.write(f"# Image OCR Test Error\n\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n---\n\n{output_buffer.getvalue()}")
+            f.write(f"# Image OCR Test Error\n\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n---\n\n")
+            write_saved_output(f)
         print_and_save(f"💾 Error log saved to: {error_output}")
         print_and_save()
         
@@ -379,44 +456,113 @@ def test_image_ocr(image_path: str, output_file: str = None):
         # Save error to file
         error_output = project_root / "scripts" / f"ocr_test_error_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
         with open(error_output, 'w', encoding='utf-8') as f:
-            f.write(f"# Image OCR Test Error\n\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n---\n\n{output_buffer.getvalue()}")
+            f.write(f"# Image OCR Test Error\n\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n---\n\n")
+            write_saved_output(f)
         print_and_save(f"💾 Error log saved to: {error_output}")
         print_and_save()
 
 
+def _run_one(image_path: str, output_file: str) -> bool:
+    """Batch worker: test one image with console output silenced; True if its report was written"""
+    # Forked workers inherit the parent's spool file, so each image gets its own
+    reset_saved_output()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        try:
+            if DocumentProcessor is None:
+                # Spawned (not forked) workers start without the parent's imports
+                load_dependencies()
+            test_image_ocr(image_path, output_file)
+        except SystemExit:
+            # The import-error paths exit; report it as a failed image instead
+            return False
+    return Path(output_file).exists()
+
+
+def test_image_directory(image_dir: str, output_dir: str = None, workers: int = None):
+    """
+    Test every image in a directory in parallel, one markdown report per image
+    
+    Args:
+        image_dir: Directory containing the images (searched recursively)
+        output_dir: Directory for the reports (default: scripts/ocr_batch_<timestamp>)
+        workers: Number of worker processes (default: CPU count)
+    """
+    image_paths = sorted(iter_images(image_dir))
+    if not image_paths:
+        print(f"❌ No image files found in: {image_dir}")
+        return
+    
+    if output_dir is None:
+        output_dir = project_root / "scripts" / f"ocr_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Each process runs its own OCR; keep tesseract from also spawning a thread per core
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    workers = workers or os.cpu_count() or 1
+    print(f"🖼️  Testing {len(image_paths)} images with {workers} worker processes")
+    print(f"📁 Reports: {output_dir}")
+    print()
+    
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            # Index prefix keeps reports apart when two subdirectories hold the same file name
+            executor.submit(_run_one, str(path), str(output_dir / f"{i:04d}_{path.stem}.md")): path
+            for i, path in enumerate(image_paths)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            path = futures[future]
+            try:
+                ok = future.result()
+            except Exception as e:
+                ok = False
+                print(f"❌ [{done}/{len(futures)}] {path}: {str(e)}")
+            else:
+                print(f"{'✅' if ok else '❌'} [{done}/{len(futures)}] {path}")
+            if not ok:
+                failed.append(path)
+    
+    print()
+    print(f"Done: {len(image_paths) - len(failed)} succeeded, {len(failed)} failed")
+
+
 def main():
     """Main function"""
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/test_image_ocr.py <path_to_image_file> [output_file.md]")
+    args = [arg for arg in sys.argv[1:] if arg != '--verbose']
+    if not args:
+        print("Usage: python scripts/test_image_ocr.py <path_to_image_file> [output_file.md | .md.gz | .md.zst] [--verbose]")
         print()
         print("Examples:")
         print('  python scripts/test_image_ocr.py "data/Sample Documents/Sample driving license 1.jpg"')
         print("  python scripts/test_image_ocr.py image.jpg output.md")
+        print('  python scripts/test_image_ocr.py "data/Sample Documents" ocr_reports/')
         print()
         print("Available image files in data/ directory:")
         
         # List available images
         data_dir = project_root / "data"
         if data_dir.exists():
-            image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff']
-            image_files = []
-            for ext in image_extensions:
-                image_files.extend(list(data_dir.rglob(f"*{ext}")))
-                image_files.extend(list(data_dir.rglob(f"*{ext.upper()}")))
+            # Stop walking once one more than the 15 shown has been found
+            image_files = list(islice(iter_images(data_dir), 16))
             
             if image_files:
                 for img_file in image_files[:15]:  # Show first 15
                     rel_path = img_file.relative_to(project_root)
                     print(f"  - {rel_path}")
                 if len(image_files) > 15:
-                    print(f"  ... and {len(image_files) - 15} more")
+                    print("  ... and more")
             else:
                 print("  (No image files found)")
         sys.exit(1)
     
-    image_path = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
-    test_image_ocr(image_path, output_file)
+    image_path = args[0]
+    output_file = args[1] if len(args) > 1 else None
+    load_dependencies()
+    if os.path.isdir(image_path):
+        test_image_directory(image_path, output_file)
+    else:
+        test_image_ocr(image_path, output_file)
 
 
 if __name__ == "__main__":
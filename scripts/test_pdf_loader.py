@@ -2,7 +2,7 @@
 Test script for PDF loader using LangChain PyPDFLoader
 
 Usage:
-    python scripts/test_pdf_loader.py <path_to_pdf_file>
+    python scripts/test_pdf_loader.py <path_to_pdf_file> [output_file.md | .md.gz | .md.zst] [--verbose]
     
 Example:
     python scripts/test_pdf_loader.py "data/documents/Attendance Policy.pdf"
@@ -10,54 +10,103 @@ Example:
 """
 import sys
 import os
+import io
+import gzip
+import shutil
+import tempfile
 from pathlib import Path
 from datetime import datetime
-from io import StringIO
+from itertools import islice
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-# Create output buffer to capture all output
-output_buffer = StringIO()
+# Spool every printed line to a temp file; it is copied into the markdown report at the end
+output_spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+
+BANNER = "=" * 80
+
+# Long messages (full text, chunk dumps) are cut short on the console unless --verbose;
+# the output file always gets them in full
+VERBOSE = '--verbose' in sys.argv
+CONSOLE_MAX_CHARS = 2048
 
 def print_and_save(*args, **kwargs):
-    """Print to console and save to buffer"""
-    message = ' '.join(str(arg) for arg in args)
-    print(*args, **kwargs)
-    output_buffer.write(message + '\n')
+    """Print to console and save to the output spool"""
+    message = ' '.join(map(str, args))
+    if not VERBOSE and len(message) > CONSOLE_MAX_CHARS:
+        print(f"{message[:CONSOLE_MAX_CHARS]}\n... [truncated on console; full text in the output file]", **kwargs)
+    else:
+        print(*args, **kwargs)
+    output_spool.write(message)
+    output_spool.write('\n')
 
-# Check Python environment first
-print_and_save(f"🐍 Python: {sys.executable}")
-print_and_save(f"📁 Project Root: {project_root}")
-print_and_save()
 
-# Try to import langchain_community directly to check if it's available
-try:
-    import langchain_community
-    print_and_save(f"✅ langchain-community found: {langchain_community.__version__}")
-    from langchain_community.document_loaders import PyPDFLoader
-    print_and_save("✅ PyPDFLoader import successful")
-    print_and_save()
-except ImportError as e:
-    print_and_save(f"❌ langchain-community import failed: {str(e)}")
-    print_and_save()
-    print_and_save("💡 Troubleshooting:")
-    print_and_save(f"   1. Current Python: {sys.executable}")
-    print_and_save("   2. Make sure you're in the correct virtual environment")
-    print_and_save("   3. Try: pip install langchain-community")
-    print_and_save("   4. Or: pip install -r requirements.txt")
-    print_and_save()
-    sys.exit(1)
+def print_section(title):
+    """Print and save a section header (title between two banner lines) in one call"""
+    print_and_save(f"{BANNER}\n{title}\n{BANNER}")
 
-import logging
-from app.services.rag.document_processor import DocumentProcessor
-from app.core.logging_config import setup_logging
 
-# Setup logging
-setup_logging()
+def write_saved_output(f):
+    """Copy everything passed to print_and_save so far into an open file"""
+    output_spool.flush()
+    output_spool.seek(0)
+    shutil.copyfileobj(output_spool, f, 1 << 16)
+    output_spool.seek(0, os.SEEK_END)
+
+
+def open_report(output_path: Path):
+    """Open the markdown report for writing; .gz / .zst suffixes write it compressed"""
+    suffix = output_path.suffix.lower()
+    if suffix == '.gz':
+        return gzip.open(output_path, 'wt', compresslevel=3, encoding='utf-8')
+    if suffix == '.zst':
+        import zstandard as zstd
+        writer = zstd.ZstdCompressor(level=3).stream_writer(open(output_path, 'wb'))
+        return io.TextIOWrapper(writer, encoding='utf-8')
+    return open(output_path, 'w', encoding='utf-8')
+
+import logging
 logger = logging.getLogger(__name__)
 
+# Heavy imports (langchain, RAG services) are deferred until the arguments are valid,
+# so the usage message prints without loading them
+DocumentProcessor = None
+
+
+def load_dependencies():
+    """Check the environment and import the RAG modules the test needs"""
+    global DocumentProcessor
+    
+    # Check Python environment first
+    print_and_save(f"🐍 Python: {sys.executable}")
+    print_and_save(f"📁 Project Root: {project_root}")
+    print_and_save()
+    
+    # Try to import langchain_community directly to check if it's available
+    try:
+        import langchain_community
+        print_and_save(f"✅ langchain-community found: {langchain_community.__version__}")
+        from langchain_community.document_loaders import PyPDFLoader
+        print_and_save("✅ PyPDFLoader import successful")
+        print_and_save()
+    except ImportError as e:
+        print_and_save(f"❌ langchain-community import failed: {str(e)}")
+        print_and_save()
+        print_and_save("💡 Troubleshooting:")
+        print_and_save(f"   1. Current Python: {sys.executable}")
+        print_and_save("   2. Make sure you're in the correct virtual environment")
+        print_and_save("   3. Try: pip install langchain-community")
+        print_and_save("   4. Or: pip install -r requirements.txt")
+        print_and_save()
+        sys.exit(1)
+    
+    from app.services.rag.document_processor import DocumentProcessor
+    from app.core.logging_config import setup_logging
+    
+    # Setup logging
+    setup_logging()
 
 def test_pdf_loader(pdf_path: str, output_file: str = None):
     """
@@ -67,24 +116,24 @@ def test_pdf_loader(pdf_path: str, output_file: str = None):
         pdf_path: Path to the PDF file
         output_file: Optional path to save full output markdown file
     """
-    print_and_save("=" * 80)
-    print_and_save("📄 PDF Loader Test Script")
-    print_and_save("=" * 80)
+    print_section("📄 PDF Loader Test Script")
     print_and_save()
     
-    # Check if file exists
-    if not os.path.exists(pdf_path):
+    # Check if file exists (one stat call; the size is reused below)
+    path = Path(pdf_path)
+    try:
+        file_size = path.stat().st_size
+    except FileNotFoundError:
         print_and_save(f"❌ Error: File not found: {pdf_path}")
         return
     
-    if not pdf_path.lower().endswith('.pdf'):
+    if path.suffix.lower() != '.pdf':
         print_and_save(f"⚠️  Warning: File doesn't have .pdf extension: {pdf_path}")
         response = input("Continue anyway? (y/n): ")
         if response.lower() != 'y':
             return
     
     print_and_save(f"📁 PDF File: {pdf_path}")
-    file_size = os.path.getsize(pdf_path)
     print_and_save(f"📊 File Size: {file_size:,} bytes ({file_size / 1024:.2f} KB)")
     print_and_save()
     
@@ -105,9 +154,7 @@ def test_pdf_loader(pdf_path: str, output_file: str = None):
         extracted_text = result.get("text", "")
         text_length = len(extracted_text)
         
-        print_and_save("=" * 80)
-        print_and_save("📊 EXTRACTION RESULTS")
-        print_and_save("=" * 80)
+        print_section("📊 EXTRACTION RESULTS")
         print_and_save(f"File Type: {result.get('file_ext', 'unknown')}")
         print_and_save(f"MIME Type: {result.get('mime_type', 'unknown')}")
         print_and_save(f"Extracted Text Length: {text_length:,} characters")
@@ -115,18 +162,14 @@ def test_pdf_loader(pdf_path: str, output_file: str = None):
         print_and_save()
         
         # Show FULL text (no truncation)
-        print_and_save("=" * 80)
-        print_and_save("📝 FULL EXTRACTED TEXT")
-        print_and_save("=" * 80)
+        print_section("📝 FULL EXTRACTED TEXT")
         print_and_save("```")
         print_and_save(extracted_text)
         print_and_save("```")
         print_and_save()
         
         # Test chunking
-        print_and_save("=" * 80)
-        print_and_save("✂️  CHUNKING TEST")
-        print_and_save("=" * 80)
+        print_section("✂️  CHUNKING TEST")
         print_and_save("Testing text chunking with LangChain RecursiveCharacterTextSplitter...")
         print_and_save()
         
@@ -150,31 +193,29 @@ def test_pdf_loader(pdf_path: str, output_file: str = None):
             print_and_save()
             
             # Show ALL chunks (no truncation)
-            print_and_save("=" * 80)
-            print_and_save("📄 ALL CHUNKS (FULL CONTENT)")
-            print_and_save("=" * 80)
+            print_section("📄 ALL CHUNKS (FULL CONTENT)")
             print_and_save()
             
             for i, chunk in enumerate(chunks):
-                print_and_save(f"## Chunk {i + 1} (Index: {chunk['chunk_index']})")
-                print_and_save(f"**Length:** {len(chunk['text'])} characters")
-                print_and_save(f"**Start:** {chunk.get('start', 'N/A')}, **End:** {chunk.get('end', 'N/A')}")
-                print_and_save()
-                print_and_save("```")
-                print_and_save(chunk["text"])
-                print_and_save("```")
-                print_and_save()
-                print_and_save("---")
-                print_and_save()
+                # One call per chunk; same lines as printing each field separately
+                print_and_save(
+                    f"## Chunk {i + 1} (Index: {chunk['chunk_index']})\n"
+                    f"**Length:** {len(chunk['text'])} characters\n"
+                    f"**Start:** {chunk.get('start', 'N/A')}, **End:** {chunk.get('end', 'N/A')}\n"
+                    "\n"
+                    "```\n"
+                    f"{chunk['text']}\n"
+                    "```\n"
+                    "\n"
+                    "---\n"
+                )
         
-        print_and_save("=" * 80)
-        print_and_save("✅ TEST COMPLETED SUCCESSFULLY")
-        print_and_save("=" * 80)
+        print_section("✅ TEST COMPLETED SUCCESSFULLY")
         
         # Save to markdown file
         if output_file is None:
             # Generate output filename based on PDF filename
-            pdf_name = Path(pdf_path).stem
+            pdf_name = path.stem
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_file = project_root / "scripts" / f"pdf_test_output_{pdf_name}_{timestamp}.md"
         
@@ -191,13 +232,14 @@ def test_pdf_loader(pdf_path: str, output_file: str = None):
 
 ---
 
-{output_buffer.getvalue()}
 """
         
         # Write to file
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
+        with open_report(output_path) as f:
             f.write(md_content)
+            write_saved_output(f)
+            f.write('\n')
         
         print_and_save()
         print_and_save(f"💾 Full output saved to: {output_path}")
@@ -220,7 +262,8 @@ def test_pdf_loader(pdf_path: str, output_file: str = None):
         # Save error to file
         error_output = project_root / "scripts" / f"pdf_test_error_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
         with open(error_output, 'w', encoding='utf-8') as f:
-            f.write(f"# PDF Loader Test Error\n\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n---\n\n{output_buffer.getvalue()}")
+            f.write(f"# PDF Loader Test Error\n\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n---\n\n")
+            write_saved_output(f)
         print_and_save(f"💾 Error log saved to: {error_output}")
         print_and_save()
         
@@ -231,10 +274,19 @@ def test_pdf_loader(pdf_path: str, output_file: str = None):
         print()
 
 
+def iter_pdfs(root):
+    """Yield PDF files under root lazily (one os.walk pass, case-insensitive extension)"""
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.lower().endswith('.pdf'):
+                yield Path(dirpath) / name
+
+
 def main():
     """Main function"""
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/test_pdf_loader.py <path_to_pdf_file> [output_file.md]")
+    args = [arg for arg in sys.argv[1:] if arg != '--verbose']
+    if not args:
+        print("Usage: python scripts/test_pdf_loader.py <path_to_pdf_file> [output_file.md | .md.gz | .md.zst] [--verbose]")
         print()
         print("Examples:")
         print('  python scripts/test_pdf_loader.py "data/documents/Attendance Policy.pdf"')
@@ -246,19 +298,21 @@ def main():
         # List available PDFs
         data_dir = project_root / "data"
         if data_dir.exists():
-            pdf_files = list(data_dir.rglob("*.pdf"))
+            # Stop walking once one more than the 10 shown has been found
+            pdf_files = list(islice(iter_pdfs(data_dir), 11))
             if pdf_files:
                 for pdf_file in pdf_files[:10]:  # Show first 10
                     rel_path = pdf_file.relative_to(project_root)
                     print(f"  - {rel_path}")
                 if len(pdf_files) > 10:
-                    print(f"  ... and {len(pdf_files) - 10} more")
+                    print("  ... and more")
             else:
                 print("  (No PDF files found)")
         sys.exit(1)
     
-    pdf_path = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
+    pdf_path = args[0]
+    output_file = args[1] if len(args) > 1 else None
+    load_dependencies()
     test_pdf_loader(pdf_path, output_file)
 
 